@@ -0,0 +1,162 @@
+"""
+This module provides running aggregates (count, sum, min, max, mean, variance) over
+calculation results, kept up to date one result at a time.
+
+Totalling a history by iterating it and calling `execute()` on every entry costs O(n)
+per question. `Aggregates` instead updates its statistics in O(1) as each calculation
+is appended (`History` and `PersistentHistory` both do this), so answering "what is the
+total so far?" is free no matter how long the session gets.
+
+**Accuracy:**
+- The sum is Kahan-compensated: the rounding error of every addition is carried in a
+  separate term and fed back into the next one, so adding many floats of very different
+  sizes does not drift the way a naive `total += result` does.
+- The mean and variance use Welford's algorithm, which updates them from each new value
+  without ever forming a (possibly huge) sum of squares, so the variance stays accurate
+  even when the values are large and close together.
+
+The updates only use `+ - * /` and comparisons, so exact number types (`Decimal`,
+`Fraction`; see `app.numeric`) keep their exactness.
+
+Once an infinite result (e.g. from `multiply 1e308 10`) has been added, the sum and mean
+are plainly `inf` from then on, and the variance is NaN.
+
+**Usage:**
+>>> aggregates = Aggregates()
+>>> aggregates.add('add', 15.0)
+>>> aggregates.add('divide', 5.0)
+>>> aggregates.overall.mean
+10.0
+>>> aggregates.by_operation['add'].count
+1
+"""
+
+import math
+from typing import Any, Dict, Iterator
+
+# Integers this large or larger cannot be converted to a float, which the mean needs.
+_FLOAT_INT_LIMIT = 2 ** 1023
+
+
+def _is_finite(value: Any) -> bool:
+    """Whether `value` is neither infinite nor NaN (an integer of any size is finite)."""
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return True
+
+
+class RunningStats:
+    """
+    Count, sum, min, max, mean and variance of the values added so far.
+
+    **Attributes:**
+    - `count`: How many values were added.
+    - `minimum`, `maximum`: The smallest and largest value (`None` before the first value).
+    - `mean`: The average (0 before the first value).
+    """
+
+    __slots__ = ('count', 'minimum', 'maximum', 'mean', '_sum', '_compensation', '_m2')
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.mean: Any = 0
+        # Kahan summation: the running sum and the low-order bits lost from it so far.
+        self._sum: Any = 0
+        self._compensation: Any = 0
+        # Welford: sum of squared differences from the current mean.
+        self._m2: Any = 0
+
+    def add(self, value: Any) -> None:
+        """Adds one value to the statistics, in O(1)."""
+        count = self.count = self.count + 1
+        if count == 1:
+            self.minimum = self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+
+        corrected = value - self._compensation
+        total = self._sum + corrected
+        if _is_finite(total):
+            self._compensation = (total - self._sum) - corrected
+            self._sum = total
+            delta = value - self.mean
+            self.mean += delta / count
+            self._m2 += delta * (value - self.mean)
+        else:
+            # An infinity (or NaN) would turn the compensation and Welford's terms into
+            # NaN, and the next finite value would then make the sum NaN as well. From
+            # here on the sum is plain addition, so it stays inf.
+            self._sum = total = self._sum + value
+            self._compensation = 0
+            self.mean = total / count
+            self._m2 = math.nan
+
+    @property
+    def total(self) -> Any:
+        """The (compensated) sum of the values."""
+        return self._sum
+
+    @property
+    def variance(self) -> Any:
+        """The population variance of the values (0 for fewer than two values)."""
+        return self._m2 / self.count if self.count > 1 else self._m2
+
+    @property
+    def sample_variance(self) -> Any:
+        """The sample variance of the values, dividing by `count - 1` (0 for fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else self._m2
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(count={self.count}, sum={self.total}, min={self.minimum}, "
+                f"max={self.maximum}, mean={self.mean}, variance={self.variance})")
+
+
+class Aggregates:
+    """
+    Running statistics of calculation results, overall and per operation type.
+
+    **Attributes:**
+    - `overall (RunningStats)`: Every result added.
+    - `by_operation (Dict[str, RunningStats])`: The results of each operation type, by name
+      (e.g. 'add'), in the order the operations were first seen.
+    - `skipped (int)`: Results that could not be aggregated: complex numbers, which have
+      no order, and integers too large to convert to a float for the mean.
+    """
+
+    __slots__ = ('overall', 'by_operation', 'skipped')
+
+    def __init__(self) -> None:
+        self.overall = RunningStats()
+        self.by_operation: Dict[str, RunningStats] = {}
+        self.skipped: int = 0
+
+    def add(self, operation: str, result: Any) -> None:
+        """Adds the result of one `operation` calculation, in O(1)."""
+        if isinstance(result, complex) or (type(result) is int and abs(result) >= _FLOAT_INT_LIMIT):
+            self.skipped += 1
+            return
+        stats = self.by_operation.get(operation)
+        if stats is None:
+            stats = self.by_operation[operation] = RunningStats()
+        stats.add(result)
+        self.overall.add(result)
+
+    def lines(self) -> Iterator[str]:
+        """Yields the lines of the REPL's `summary` command output."""
+        if not self.overall.count:
+            yield "No calculations performed yet."
+            return
+        yield f"Summary of {self.overall.count} calculations:"
+        for name, stats in [('all', self.overall), *self.by_operation.items()]:
+            yield (f"{name}: count={stats.count}, sum={stats.total}, mean={stats.mean}, "
+                   f"min={stats.minimum}, max={stats.maximum}, variance={stats.variance}")
+        if self.skipped:
+            yield f"({self.skipped} results not included: complex, or too large for a float)"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(count={self.overall.count}, operations={list(self.by_operation)})"
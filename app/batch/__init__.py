@@ -0,0 +1,160 @@
+"""
+This module runs the calculator non-interactively over a whole stream of
+`<operation> <num1> <num2>` lines, such as a file or a pipe.
+
+The REPL in `app.calculator` is built for a person typing one line at a time:
+it prints a prompt for every line and writes each result with its own `print`.
+For millions of lines that overhead dominates, so batch mode instead:
+- reads the input in large chunks of lines,
+- never prints prompts or help text,
+- collects the output for a whole chunk and writes it with a single call,
+- looks up each operation's fast-path kernel once and calls it directly,
+  without creating a Calculation object per line,
+- parses each distinct operand token once (see `ParseCache`), since the same
+  literals tend to come back line after line.
+
+Every non-blank input line produces exactly one output line: either the result,
+or `error: <message>` when the line could not be calculated.
+"""
+
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+from app.cache import ParseCache
+from app.calculation import CalculationFactory
+
+# How many characters of input to read per chunk (passed as the `readlines` size hint).
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# The same message the REPL prints for a badly formatted line.
+INVALID_FORMAT_MESSAGE = "Invalid input. Please follow the format: <operation> <num1> <num2>"
+
+
+class BatchStats(NamedTuple):
+    """
+    Summary of one batch run, used to report throughput when the run finishes.
+
+    **Fields:**
+    - `lines`: Number of non-blank input lines processed.
+    - `errors`: Number of those lines that produced an error instead of a result.
+    - `seconds`: Wall-clock time the run took.
+    """
+    lines: int
+    errors: int
+    seconds: float
+
+    @property
+    def lines_per_second(self) -> float:
+        """Throughput of the run (0.0 when the run took no measurable time)."""
+        return self.lines / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"Processed {self.lines} lines ({self.errors} errors) in {self.seconds:.3f}s "
+                f"({self.lines_per_second:,.0f} lines/s)")
+
+
+def run_batch(input_stream: TextIO, output_stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              backend: Optional[str] = None, parse_cache: Optional[ParseCache] = None) -> BatchStats:
+    """
+    Evaluates every `<operation> <num1> <num2>` line of `input_stream` and writes
+    one output line per input line to `output_stream`.
+
+    **Parameters:**
+    - `input_stream (TextIO)`: Where to read the calculations from.
+    - `output_stream (TextIO)`: Where to write the results.
+    - `chunk_size (int)`: Roughly how many characters to read (and write) at a time.
+    - `backend (Optional[str])`: The numeric backend to calculate with (see `app.numeric`),
+      e.g. 'decimal' for exact decimal results. `None` (the default) uses `float()`.
+    - `parse_cache (Optional[ParseCache])`: Cache the parsed operands here, e.g. to read
+      its statistics afterwards. It must parse the way `backend` does. By default a new
+      cache is used for the run.
+
+    **Returns:**
+    - `BatchStats`: How many lines were processed, how many failed, and how long it took.
+
+    **Example:**
+    >>> import io
+    >>> out = io.StringIO()
+    >>> run_batch(io.StringIO("add 1 2\\ndivide 1 0\\n"), out).errors
+    1
+    >>> out.getvalue()
+    '3.0\\nerror: Cannot divide by zero.\\n'
+    """
+    start = time.perf_counter()
+    parse: Callable[[str], Any] = float
+    settings: ContextManager = nullcontext()
+    if backend is not None:
+        # Imported here so the decimal and fractions modules are only loaded when asked for.
+        from app.numeric import get_backend
+        numeric_backend = get_backend(backend)
+        parse, settings = numeric_backend.convert, numeric_backend.activate()
+    if parse_cache is None:
+        parse_cache = ParseCache(parse)
+    with settings:
+        lines, errors = _run_chunks(input_stream, output_stream, chunk_size, parse_cache)
+    return BatchStats(lines, errors, time.perf_counter() - start)
+
+
+def _run_chunks(input_stream: TextIO, output_stream: TextIO, chunk_size: int,
+                parse_cache: ParseCache) -> Tuple[int, int]:
+    """The loop of `run_batch`; returns how many lines were processed and how many failed."""
+    lines = 0
+    errors = 0
+    # The parse cache, looked up inline: a hit is one dict lookup, without a method call.
+    # Its hits are counted here and added to its statistics at the end.
+    cached, parse_new, hits = parse_cache.entries.get, parse_cache.parse_new, 0
+    # Cache of operation token -> (kernel, number of operands), so each token is looked up only once.
+    kernels: Dict[str, Tuple[Callable[..., Any], int]] = {}
+
+    while True:
+        chunk = input_stream.readlines(chunk_size)
+        if not chunk:
+            break
+        output: List[str] = []
+        for line in chunk:
+            parts = line.split()
+            if not parts:
+                continue  # Blank lines produce no output.
+            lines += 1
+            # EAFP: try to calculate the line and turn any failure into an error line.
+            try:
+                if len(parts) < 3:
+                    raise ValueError(INVALID_FORMAT_MESSAGE)
+                operation = parts[0]
+                entry = kernels.get(operation)
+                if entry is None:
+                    entry = kernels[operation] = (
+                        CalculationFactory.get_kernel(operation),
+                        CalculationFactory.get_calculation_class(operation).arity,
+                    )
+                kernel, arity = entry
+                if len(parts) != arity + 1:
+                    raise ValueError(INVALID_FORMAT_MESSAGE)
+                try:
+                    num1 = cached(parts[1])
+                    if num1 is None:
+                        num1 = parse_new(parts[1])
+                    else:
+                        hits += 1
+                    num2 = cached(parts[2])
+                    if num2 is None:
+                        num2 = parse_new(parts[2])
+                    else:
+                        hits += 1
+                    # Only a few operations (like powmod) take a third operand.
+                    more = [parse_cache.parse(operand_str) for operand_str in parts[3:]] if arity > 2 else ()
+                except ValueError:
+                    raise ValueError(INVALID_FORMAT_MESSAGE) from None
+                output.append(f"{kernel(num1, num2, *more)}\n")
+            except ZeroDivisionError:
+                errors += 1
+                output.append("error: Cannot divide by zero.\n")
+            except Exception as e:
+                errors += 1
+                output.append(f"error: {e}\n")
+        # One write per chunk instead of one per line.
+        output_stream.write(''.join(output))
+
+    parse_cache.hits += hits
+    return lines, errors
@@ -0,0 +1,301 @@
+"""
+This module provides a compact binary input format for bulk calculations, and a
+converter from the `<operation> <num1> <num2>` text format.
+
+Batch mode spends most of its time turning text into numbers: splitting every line
+and calling `float()` twice. A binary file stores the numbers ready to use, so reading
+it involves no string handling at all.
+
+**File Layout:**
+- A 10-byte header: the magic bytes `CALCBIN1` and the length of the operation table.
+- The operation table: the operation names (e.g. `add`), UTF-8, one per line. An
+  operation's code is its position in this table.
+- Then one 17-byte record per calculation, with no padding:
+
+  ======  =======  ==============================
+  Offset  Type     Field
+  ======  =======  ==============================
+  0       uint8    operation code
+  1       float64  a (first operand)
+  9       float64  b (second operand)
+  ======  =======  ==============================
+
+**Reading Without Copying:**
+`records_view()` returns the records as a `memoryview` of the original buffer (for
+example a memory-mapped file), which is decoded with `struct.iter_unpack` or, when
+NumPy is installed, with `numpy.frombuffer(..., dtype=RECORD_DTYPE)` straight into
+columns that are evaluated a whole operation at a time.
+
+**Usage:**
+    python main.py --convert calculations.txt calculations.bin
+    python main.py --binary calculations.bin
+"""
+
+import array
+import math
+import struct
+import time
+from typing import Any, BinaryIO, Callable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from app.batch import INVALID_FORMAT_MESSAGE, BatchStats
+from app.cache import ParseCache
+from app.calculation import BATCH_ERRORS, BatchResult, CalculationFactory
+from app.parallel import error_message
+
+MAGIC = b'CALCBIN1'
+HEADER = struct.Struct('<8sH')
+RECORD = struct.Struct('<Bdd')
+RECORD_SIZE = RECORD.size
+
+# NumPy structured dtype description matching RECORD, for use with numpy.frombuffer.
+RECORD_DTYPE = {
+    'names': ['op', 'a', 'b'],
+    'formats': ['u1', '<f8', '<f8'],
+    'offsets': [0, 1, 9],
+    'itemsize': RECORD_SIZE,
+}
+
+# The op-code field is one unsigned byte.
+MAX_OPERATION_TYPES = 256
+
+# How many records to convert, or to evaluate, before writing them out in one call.
+WRITE_CHUNK_RECORDS = 1 << 16
+
+
+class ConversionStats(NamedTuple):
+    """
+    Summary of one text-to-binary conversion.
+
+    **Fields:**
+    - `records`: Number of records written.
+    - `errors`: `(line number, message)` for every non-blank line that could not be
+      converted (and was left out).
+    """
+    records: int
+    errors: List[Tuple[int, str]]
+
+
+# -----------------------------------------------------------------------------------
+# Writing
+# -----------------------------------------------------------------------------------
+
+def _operation_table() -> List[str]:
+    """The names of the registered two-operand calculation types, in registration order."""
+    names = [name for name, calculation_class in CalculationFactory.registered_types().items()
+             if calculation_class.arity == 2]
+    return names[:MAX_OPERATION_TYPES]
+
+
+def convert_text(input_stream: TextIO, output_stream: BinaryIO) -> ConversionStats:
+    """
+    Converts `<operation> <num1> <num2>` lines to the binary format.
+
+    The operation table holds every two-operand calculation type registered when the
+    conversion runs. Lines that are badly formatted or use an unknown operation are
+    left out and reported in the returned `ConversionStats`.
+
+    **Parameters:**
+    - `input_stream (TextIO)`: The text lines to convert.
+    - `output_stream (BinaryIO)`: Where to write the binary file.
+    """
+    names = _operation_table()
+    codes = {name: code for code, name in enumerate(names)}
+    table = '\n'.join(names).encode('utf-8')
+    output_stream.write(HEADER.pack(MAGIC, len(table)) + table)
+
+    pack = RECORD.pack
+    # Each distinct operand token is parsed once (see app.batch), looked up inline.
+    parse_cache = ParseCache(float)
+    cached, parse_new = parse_cache.entries.get, parse_cache.parse_new
+    records = 0
+    errors: List[Tuple[int, str]] = []
+    output: List[bytes] = []
+    for line_number, line in enumerate(input_stream, start=1):
+        parts = line.split()
+        if not parts:
+            continue
+        try:
+            operation, num1_str, num2_str = parts
+            a = cached(num1_str)
+            if a is None:
+                a = parse_new(num1_str)
+            b = cached(num2_str)
+            if b is None:
+                b = parse_new(num2_str)
+        except ValueError:
+            errors.append((line_number, INVALID_FORMAT_MESSAGE))
+            continue
+        code = codes.get(operation.lower())
+        if code is None:
+            errors.append((line_number, f"Unsupported calculation type: '{operation}'."))
+            continue
+        output.append(pack(code, a, b))
+        records += 1
+        if len(output) >= WRITE_CHUNK_RECORDS:
+            output_stream.write(b''.join(output))
+            output.clear()
+    output_stream.write(b''.join(output))
+    return ConversionStats(records, errors)
+
+
+# -----------------------------------------------------------------------------------
+# Reading
+# -----------------------------------------------------------------------------------
+
+def read_header(buffer: Any) -> Tuple[List[str], int]:
+    """
+    Reads the header of a binary calculation file.
+
+    **Returns:**
+    - The operation names (indexed by code), and the offset where the records start.
+
+    **Raises:**
+    - `ValueError`: If the buffer is not a binary calculation file.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Not a binary calculation file.")
+    magic, table_size = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a binary calculation file.")
+    table = bytes(buffer[HEADER.size:HEADER.size + table_size]).decode('utf-8')
+    return (table.split('\n') if table else []), HEADER.size + table_size
+
+
+def records_view(buffer: Any) -> Tuple[List[str], memoryview]:
+    """
+    Returns the operation names and a zero-copy `memoryview` of the records in `buffer`
+    (bytes, a bytearray, an mmap, ...).
+
+    **Raises:**
+    - `ValueError`: If the buffer is not a binary calculation file, or its last record is cut off.
+    """
+    names, offset = read_header(buffer)
+    view = memoryview(buffer)[offset:]
+    if len(view) % RECORD_SIZE:
+        raise ValueError("Binary calculation file is truncated.")
+    return names, view
+
+
+def iter_records(buffer: Any) -> Iterator[Tuple[str, float, float]]:
+    """Yields every record of `buffer` as an `(operation, a, b)` tuple, like `app.parallel` takes."""
+    names, view = records_view(buffer)
+    for code, a, b in RECORD.iter_unpack(view):
+        yield names[code], a, b
+
+
+# -----------------------------------------------------------------------------------
+# Evaluating
+# -----------------------------------------------------------------------------------
+
+def _unknown_operation(a: float, b: float) -> float:
+    """The kernel used for operation codes that are not registered (or not in the table)."""
+    raise ValueError("Unsupported calculation type.")
+
+
+def _load_numpy(use_numpy: Optional[bool]) -> Any:
+    """Returns the NumPy module to evaluate with, or None (see `evaluate_binary`)."""
+    if use_numpy is False:
+        return None
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - depends on whether NumPy is installed
+        if use_numpy:
+            raise
+        return None
+    return numpy
+
+
+def _kernel_table(names: List[str]) -> List[Callable[[float, float], Any]]:
+    """One kernel per possible code, so looking one up is a plain list index."""
+    kernels = []
+    for name in names:
+        try:
+            kernels.append(CalculationFactory.get_kernel(name, arity=2))
+        except ValueError:
+            kernels.append(_unknown_operation)
+    kernels.extend([_unknown_operation] * (MAX_OPERATION_TYPES - len(kernels)))
+    return kernels
+
+
+def _evaluate_view(numpy: Any, names: List[str], kernels: List[Callable[[float, float], Any]],
+                   view: memoryview) -> BatchResult:
+    """Evaluates the records in `view`, with NumPy if it is given."""
+    if numpy is not None:
+        return _evaluate_numpy(numpy, names, view)  # pragma: no cover
+    count = len(view) // RECORD_SIZE
+    results = array.array('d', bytes(8 * count))
+    errors = array.array('b', bytes(count))
+    nan = math.nan
+    for row, (code, a, b) in enumerate(RECORD.iter_unpack(view)):
+        try:
+            results[row] = kernels[code](a, b)
+        except BATCH_ERRORS:
+            results[row] = nan
+            errors[row] = 1
+    return BatchResult(results, errors)
+
+
+def evaluate_binary(buffer: Any, use_numpy: Optional[bool] = None) -> BatchResult:
+    """
+    Evaluates every record of a binary calculation file.
+
+    **Parameters:**
+    - `buffer`: The whole file's contents: bytes, or better an mmap of the file.
+    - `use_numpy (Optional[bool])`: Decode and evaluate with NumPy. By default NumPy is
+      used when it is installed.
+
+    **Returns:**
+    - `BatchResult`: One result per record, in file order, and the error mask (see
+      `CalculationFactory.evaluate_batch`).
+    """
+    names, view = records_view(buffer)
+    return _evaluate_view(_load_numpy(use_numpy), names, _kernel_table(names), view)
+
+
+def _evaluate_numpy(numpy, names: List[str], view: memoryview) -> BatchResult:  # pragma: no cover
+    """The NumPy version of evaluate_binary: one evaluate_batch call per operation code."""
+    records = numpy.frombuffer(view, dtype=numpy.dtype(RECORD_DTYPE))
+    codes = records['op']
+    results = numpy.full(len(records), numpy.nan)
+    errors = numpy.ones(len(records), dtype=bool)
+    registered = CalculationFactory.registered_types()
+    for code in numpy.unique(codes):
+        if code >= len(names) or names[code].lower() not in registered:
+            continue  # Unknown operation: the rows stay failed.
+        rows = codes == code
+        batch = CalculationFactory.evaluate_batch(names[code], records['a'][rows], records['b'][rows])
+        results[rows] = batch.results
+        errors[rows] = batch.errors
+    return BatchResult(results, errors)
+
+
+def run_binary(buffer: Any, output_stream: TextIO, use_numpy: Optional[bool] = None) -> BatchStats:
+    """
+    Evaluates a binary calculation file and writes the same output as `run_batch` would
+    for the equivalent text: one line per record, the result or `error: <message>`.
+
+    The records are evaluated and written `WRITE_CHUNK_RECORDS` at a time, so memory use
+    stays the same however large the (memory-mapped) file is.
+    """
+    start = time.perf_counter()
+    names, view = records_view(buffer)
+    numpy = _load_numpy(use_numpy)
+    kernels = _kernel_table(names)
+    chunk_size = WRITE_CHUNK_RECORDS * RECORD_SIZE
+    line_count = error_count = 0
+    for offset in range(0, len(view), chunk_size):
+        chunk = view[offset:offset + chunk_size]
+        batch = _evaluate_view(numpy, names, kernels, chunk)
+        lines: List[str] = []
+        for row, (result, failed) in enumerate(zip(batch.results.tolist(), batch.errors.tolist())):
+            if failed:
+                error_count += 1
+                code, a, b = RECORD.unpack_from(chunk, row * RECORD_SIZE)
+                name = names[code] if code < len(names) else f"#{code}"
+                lines.append(f"error: {error_message(name, a, b)}\n")
+            else:
+                lines.append(f"{result}\n")
+        # One write per chunk, like run_batch.
+        output_stream.write(''.join(lines))
+        line_count += len(lines)
+    return BatchStats(line_count, error_count, time.perf_counter() - start)
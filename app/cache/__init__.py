@@ -0,0 +1,200 @@
+"""
+This module provides bounded caches: `ResultCache` for calculation results, and
+`ParseCache` for the numbers parsed from operand tokens.
+
+Workloads often repeat the same `(operation, a, b)` calculation many times. Instead of
+recomputing the result every time, a `ResultCache` remembers recent results and hands
+them back with a single dictionary lookup.
+
+The cache is process-wide and opt-in. To turn it on, give `Calculation` a cache:
+
+    >>> from app.calculation import Calculation
+    >>> Calculation.result_cache = ResultCache(maxsize=10_000)
+
+and to turn it off again, set it back to `None`.
+
+A `ResultCache` can be used from several threads at once (the REPL's `--workers`, see
+`app.pool`, execute calculations on worker threads): every method takes the cache's lock.
+"""
+
+import _thread  # Lower level than threading, which the start-up path does not import.
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple
+
+# How many distinct operand tokens a ParseCache remembers by default.
+DEFAULT_PARSE_CACHE_SIZE = 4096
+
+
+class CacheInfo(NamedTuple):
+    """
+    A snapshot of a cache's statistics, in the same shape as `functools.lru_cache`'s
+    `cache_info()`.
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ResultCache:
+    """
+    A Least-Recently-Used (LRU) cache with a fixed maximum size.
+
+    **How It Works:**
+    - Entries live in an `OrderedDict`, ordered from least to most recently used.
+    - A hit moves the entry to the "most recent" end.
+    - When the cache is full, adding a new entry evicts the least recently used one,
+      so memory use stays bounded no matter how long the process runs.
+    - `hits` and `misses` count lookups, so we can tell whether the cache is paying off.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        **Parameters:**
+        - `maxsize (int)`: The most entries the cache will hold. Must be at least 1.
+
+        **Raises:**
+        - `ValueError`: If `maxsize` is smaller than 1.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Without it, a `move_to_end` racing with another thread's eviction raises KeyError.
+        self._lock = _thread.allocate_lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for `key`, or `default` if it is not cached.
+        Counts the lookup as a hit or a miss.
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Stores `value` under `key`, evicting the least recently used entry if the cache is full.
+        """
+        with self._lock:
+            entries = self._entries
+            entries[key] = value
+            entries.move_to_end(key)
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes every entry and resets the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Returns the current hit/miss counters and size as a `CacheInfo`."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+
+class ParseCache:
+    """
+    A bounded cache of operand token -> parsed number, e.g. `'2.5'` -> `2.5`.
+
+    Real input reuses a small vocabulary of literals (`0`, `1`, `100`, `0.5`, ...). A
+    token seen before is looked up instead of parsed again, and every occurrence shares
+    one number object instead of allocating a new one.
+
+    **Why Not a ResultCache?**
+    Parsing a float only takes about as long as a method call, so an LRU's bookkeeping
+    on every hit (`move_to_end`, a Python-level `get`) would cost more than it saves.
+    A hit here is a single plain `dict` lookup, which hot loops (like batch mode) can
+    even do inline, with `entries.get(token)` and `parse_new(token)` when that is `None`.
+
+    The price is a simpler eviction policy: when the cache is full, the token that was
+    added first is evicted (first in, first out), whether or not it is still in use.
+    Tokens that are in use keep coming back, so they are soon cached again.
+
+    **Statistics:**
+    `hits`, `misses` and `evictions` count what happened; `info()` returns them in the
+    same shape as `ResultCache.info()`. A token that fails to parse raises the parse
+    function's error, counts as a miss, and is not cached.
+    """
+
+    def __init__(self, parse: Callable[[str], Any] = float, maxsize: int = DEFAULT_PARSE_CACHE_SIZE) -> None:
+        """
+        **Parameters:**
+        - `parse (Callable[[str], Any])`: Turns one token into a number (`float`, or a
+          numeric backend's `convert`; see app.numeric).
+        - `maxsize (int)`: The most tokens the cache will hold. Must be at least 1.
+
+        **Raises:**
+        - `ValueError`: If `maxsize` is smaller than 1.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._parse = parse
+        # Token -> number, oldest first. Read it directly for the fastest lookups.
+        self.entries: Dict[str, Any] = {}
+
+    def parse(self, token: str) -> Any:
+        """
+        Returns the number `token` stands for, parsing it only if it is not cached.
+
+        **Raises:**
+        - Whatever the parse function raises for an invalid token (`ValueError` for `float`).
+        """
+        value = self.entries.get(token)
+        if value is None:
+            return self.parse_new(token)
+        self.hits += 1
+        return value
+
+    def parse_new(self, token: str) -> Any:
+        """
+        Parses a token that is not cached and caches it, evicting the oldest token if the
+        cache is full. For callers that looked it up in `entries` themselves.
+        """
+        self.misses += 1
+        value = self._parse(token)
+        entries = self.entries
+        if len(entries) >= self.maxsize:
+            del entries[next(iter(entries))]
+            self.evictions += 1
+        entries[token] = value
+        return value
+
+    def clear(self) -> None:
+        """Removes every entry and resets the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Returns the current hit/miss counters and size as a `CacheInfo`."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(hits={self.hits}, misses={self.misses}, "
+                f"evictions={self.evictions}, size={len(self.entries)}/{self.maxsize})")
@@ -10,11 +10,95 @@
 # This is super useful for making sure all our operation classes are consistent without writing the same code over and over.
 from abc import ABC, abstractmethod
 
+# array gives us compact, typed columns of floats for batch results, and NamedTuple
+# lets evaluate_batch hand back its two outputs (results and error mask) with readable names.
+import array
+import functools
+import operator
+import sys
+# _thread provides the same lock as threading.Lock, without importing threading at start-up.
+import _thread
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
 # Import the Operation class from the app.operation module. 
 # The Operation class is where our basic mathematical functions (e.g., addition, subtraction) are defined.
 # Rather than implementing arithmetic logic in one big class, we're breaking it out into separate classes. 
 # This makes our code cleaner and easier to change or add new operations later.
 from app.operations import Operation
+# The power kernel checks the same cost guardrails as Operation.power (see app.guardrails).
+from app.guardrails import check_power
+
+# ResultCache is the optional process-wide cache that Calculation.execute consults.
+from app.cache import ResultCache
+
+# The opt-in instrumentation; `_metrics.active` is None unless it has been switched on.
+from app import metrics as _metrics
+
+# Marker for "no result computed yet". We can't use None because None could be a real result.
+_NOT_COMPUTED = object()
+
+
+def _memo(calculation, result) -> tuple:
+    """
+    What `execute` remembers: `(result, a, b)`, plus the remaining operands for a
+    calculation with more than two. Comparing operands by identity (`is`) is cheaper
+    than clearing the memo on every assignment, which would slow down creating every
+    calculation to catch the rare one that changes.
+    """
+    if calculation.arity > 2:
+        return (result, calculation.a, calculation.b, calculation.operands[2:])
+    return (result, calculation.a, calculation.b)
+
+
+def _cache_execute(execute):
+    """
+    Wraps a Calculation subclass's `execute` method so its result is computed only once.
+
+    - The first call stores the result on the instance (`_result`), together with the
+      operands it was computed from; later calls (for example from `__str__` or when the
+      history is displayed) just return it, as long as those are still the operands.
+      Assigning a new operand (`a`, `b`, or `base`/`exponent` of a power) therefore
+      makes the next call compute again instead of returning a stale result.
+    - If `Calculation.result_cache` is set, the result is also looked up in and saved to
+      that process-wide cache, keyed on the calculation type and the operands (with their
+      types, so that e.g. `1` and `1.0` are cached separately).
+    - Exceptions are never cached: a calculation that failed will run again next time.
+    - When instrumentation is on (see `app.metrics`), computing the result is timed.
+    """
+    def compute(self):
+        """Computes the result, through the process-wide cache if there is one."""
+        cache = self.result_cache
+        if cache is None:
+            return execute(self)
+        key = (type(self), type(self.a), self.a, type(self.b), self.b)
+        if self.arity > 2:
+            # Calculations with more operands (like powmod) add the rest to the key.
+            key += tuple(item for operand in self.operands[2:] for item in (type(operand), operand))
+        result = cache.get(key, _NOT_COMPUTED)
+        if result is _NOT_COMPUTED:
+            result = execute(self)
+            cache.put(key, result)
+        return result
+
+    @functools.wraps(execute)
+    def cached_execute(self):
+        memo = self._result
+        if (memo is not _NOT_COMPUTED and memo[1] is self.a and memo[2] is self.b
+                and (len(memo) == 3 or memo[3] == self.operands[2:])):
+            return memo[0]
+        metrics = _metrics.active
+        if metrics is not None:
+            result = metrics.time('execute', type(self).__name__, compute, self)
+        elif self.result_cache is None:
+            # The common case, without the extra call to compute().
+            result = execute(self)
+        else:
+            result = compute(self)
+        self._result = _memo(self, result)
+        return result
+
+    cached_execute._caches_result = True
+    return cached_execute
 
 # -----------------------------------------------------------------------------------
 # Abstract Base Class: Calculation
@@ -34,8 +118,44 @@ class Calculation(ABC):
     - **Enforcing Consistency**: The abstract `execute` method enforces that all subclasses implement 
       their own specific version of the calculation logic, making sure that each type of calculation 
       has an `execute` method.
+
+    **Result Caching:**
+    - Every subclass's `execute` is wrapped (see `__init_subclass__`) so each instance
+      computes its result once, or again after one of its operands has been changed.
+    - Setting `Calculation.result_cache` to a `ResultCache` additionally shares results
+      between instances with the same type and operands.
+
+    **Memory Use:**
+    - The hierarchy uses `__slots__`, so a calculation holds only `a`, `b` and its cached
+      result, with no per-instance `__dict__` (56 bytes per object instead of 152-168).
     """
 
+    # __slots__ replaces the per-instance __dict__ with fixed storage for just these
+    # attributes, which makes every calculation object much smaller. Subclasses declare
+    # `__slots__ = ()` to keep that saving; subclasses that don't simply get a __dict__ again.
+    __slots__ = ('a', 'b', '_result')
+
+    # Optional process-wide cache of results, shared by all calculations. None means disabled.
+    result_cache: Optional[ResultCache] = None
+
+    # How many operands the calculation takes. Most take two (`a` and `b`); a subclass
+    # that needs more stores the rest in its own slots and lists them all in `operands`.
+    arity: int = 2
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        Runs automatically whenever a subclass of Calculation is defined, and wraps
+        the subclass's own `execute` method with result caching (see `_cache_execute`).
+        """
+        super().__init_subclass__(**kwargs)
+        execute = cls.__dict__.get('execute')
+        if (
+            execute is not None
+            and not getattr(execute, '__isabstractmethod__', False)
+            and not getattr(execute, '_caches_result', False)
+        ):
+            cls.execute = _cache_execute(execute)
+
     def __init__(self, a: float, b: float) -> None:
         """
         Initializes a Calculation instance with two operands (numbers involved in the calculation).
@@ -52,6 +172,9 @@ class Calculation(ABC):
         """
         self.a: float = a  # Stores the first operand as a floating-point number.
         self.b: float = b  # Stores the second operand as a floating-point number.
+        # Nothing computed yet. Set here rather than left empty, so execute() can read the
+        # slot directly: reading an empty slot raises AttributeError, which is slow to catch.
+        self._result = _NOT_COMPUTED
 
     @abstractmethod
     def execute(self) -> float:
@@ -71,6 +194,18 @@ class Calculation(ABC):
         """
         pass  # The actual implementation will be provided by the subclass. # pragma: no cover
 
+    @property
+    def operands(self) -> tuple:
+        """All of the calculation's operands, in order (`arity` of them)."""
+        return (self.a, self.b)
+
+    def set_result(self, result: Any) -> None:
+        """
+        Stores an already known result (e.g. one read back from a history), so `execute`
+        returns it instead of computing it again.
+        """
+        self._result = _memo(self, result)
+
     def __str__(self) -> str:
         """
         Provides a user-friendly string representation of the Calculation instance, 
@@ -80,7 +215,7 @@ class Calculation(ABC):
         **Returns:**
         - `str`: A string describing the calculation and its result.
         """
-        result = self.execute()  # Run the calculation to get the result.
+        result = self.execute()  # Get the result (computed only once per instance, see execute caching).
         operation_name = self.__class__.__name__.replace('Calculation', '')  # Derive operation name.
         return f"{self.__class__.__name__}: {self.a} {operation_name} {self.b} = {result}"
 
@@ -95,6 +230,52 @@ class Calculation(ABC):
         """
         return f"{self.__class__.__name__}(a={self.a}, b={self.b})"
 
+# -----------------------------------------------------------------------------------
+# Batch Result: BatchResult
+# -----------------------------------------------------------------------------------
+class BatchResult(NamedTuple):
+    """
+    The result of `CalculationFactory.evaluate_batch`: one column of results plus
+    one column flagging the rows that failed.
+
+    **Fields:**
+    - `results`: The result of each row. Failed rows hold `nan`. This is an
+      `array.array('d')`, or a NumPy `float64` array when NumPy arrays were passed in.
+    - `errors`: The error mask. A truthy entry means the row raised an error
+      (division or modulus by zero, 0^0, invalid operands). This is an
+      `array.array('b')`, or a NumPy `bool` array for NumPy input.
+    """
+    results: Any
+    errors: Any
+
+
+# Exceptions that mark a single row of a batch as failed instead of aborting the whole batch.
+BATCH_ERRORS = (ValueError, ZeroDivisionError, TypeError, OverflowError)
+
+# The entry point group that packages list their calculation types under (see
+# CalculationFactory.discover_plugins), e.g. in pyproject.toml:
+#
+#     [project.entry-points."calculator.operations"]
+#     cube = "my_operations.cube:CubeCalculation"
+PLUGIN_GROUP = 'calculator.operations'
+
+
+class Registry(NamedTuple):
+    """
+    One published state of `CalculationFactory`'s registrations.
+
+    Both maps are replaced together, as one attribute, so a lookup that reads the
+    registry once always finds a class and its kernel from the same change. Neither
+    dictionary is modified once it has been published.
+
+    **Fields:**
+    - `calculations`: Lowercase calculation type -> Calculation subclass.
+    - `kernels`: The same types -> their fast-path kernel (see `get_kernel`).
+    """
+    calculations: Dict[str, type]
+    kernels: Dict[str, Callable[..., Any]]
+
+
 # -----------------------------------------------------------------------------------
 # Factory Class: CalculationFactory
 # -----------------------------------------------------------------------------------
@@ -111,11 +292,45 @@ class CalculationFactory:
     - **Open/Closed Principle (OCP)**: We can add new calculation types without changing 
       the existing codebase. We simply register new calculation classes, making our 
       code extensible and flexible to future modifications.
+
+    **Plugins:**
+    Calculation types can also come from other installed packages, through entry points
+    (see `PLUGIN_GROUP`), or be declared with `register_lazy`. Either way only the name
+    and where to find the class are recorded: the plugin's module is imported the first
+    time its type is used, so start-up time does not grow with the number of plugins.
+
+    **Thread Safety:**
+    The registry is copy-on-write: registering or unregistering builds new dictionaries
+    (under a lock shared by all writers) and publishes them together as one new `Registry`,
+    with a single assignment. Lookups never take the lock and never see a half-made
+    change: they read `_registry` once and use whichever complete snapshot was current,
+    and a dictionary that is being iterated never changes size. After `freeze()` the
+    registry cannot change at all, which is the mode to serve in.
     """
 
-    # _calculations is a dictionary that holds a mapping of calculation types 
-    # (like "add" or "subtract") to their respective classes.
-    _calculations = {}
+    # _registry holds the registered calculation types (like "add" or "subtract"), mapped
+    # to their classes, and the precompiled "fast path" dispatch table, which maps the same
+    # lowercase types straight to a function of (a, b) that computes the result, so hot
+    # loops can skip creating a Calculation object altogether (see get_kernel).
+    _registry: Registry = Registry({}, {})
+
+    # The numeric backend (see app.numeric) that create_calculation converts operands with
+    # when the caller does not pass one. None means operands are used exactly as given.
+    backend = None
+
+    # _plugins maps the calculation types that are known but not loaded yet to where their
+    # class is, as "module:attribute" (see register_lazy). Loading one registers its class.
+    _plugins: Dict[str, str] = {}
+
+    # Whether the installed packages' entry points have been read into _plugins yet. That
+    # only happens the first time a type is not found, so normal start-up never pays for it.
+    _plugins_discovered: bool = False
+
+    # Serializes the writers of the registries above (readers never take it).
+    _lock = _thread.allocate_lock()
+
+    # Set by freeze(): the registries can no longer change.
+    frozen: bool = False
 
     @classmethod
     def register_calculation(cls, calculation_type: str):
@@ -138,16 +353,61 @@ class CalculationFactory:
         def decorator(subclass):
             # Convert calculation_type to lowercase to ensure consistency.
             calculation_type_lower = calculation_type.lower()
-            # Check if the calculation type has already been registered to avoid duplication.
-            if calculation_type_lower in cls._calculations:
-                raise ValueError(f"Calculation type '{calculation_type}' is already registered.")
-            # Register the subclass in the _calculations dictionary.
-            cls._calculations[calculation_type_lower] = subclass
+            with cls._lock:
+                cls._check_not_frozen()
+                # Check if the calculation type has already been registered to avoid duplication.
+                if calculation_type_lower in cls._registry.calculations:
+                    raise ValueError(f"Calculation type '{calculation_type}' is already registered.")
+                cls._publish(calculation_type_lower, subclass)
             return subclass  # Return the subclass for chaining or additional use.
         return decorator  # Return the decorator function.
 
     @classmethod
-    def create_calculation(cls, calculation_type: str, a: float, b: float) -> Calculation:
+    def _publish(cls, calculation_type_lower: str, subclass: Optional[type]) -> None:
+        """
+        Registers `subclass` under `calculation_type_lower` (or removes the type, for `None`)
+        by building a new `Registry` and swapping it in. The caller holds `_lock`.
+        """
+        calculations = dict(cls._registry.calculations)
+        kernels = dict(cls._registry.kernels)
+        if subclass is None:
+            calculations.pop(calculation_type_lower, None)
+            kernels.pop(calculation_type_lower, None)
+        else:
+            calculations[calculation_type_lower] = subclass
+            kernels[calculation_type_lower] = _kernel_for(subclass)
+        cls._registry = Registry(calculations, kernels)
+        if subclass is not None and calculation_type_lower in cls._plugins:
+            # A registered class takes over from a lazy registration of the same name.
+            cls._plugins = {name: target for name, target in cls._plugins.items() if name != calculation_type_lower}
+
+    @classmethod
+    def _check_not_frozen(cls) -> None:
+        """Raises RuntimeError if the registries have been frozen."""
+        if cls.frozen:
+            raise RuntimeError("CalculationFactory is frozen: calculation types can no longer be changed.")
+
+    @classmethod
+    def freeze(cls) -> None:
+        """
+        Makes the set of calculation types final, e.g. once a server has started: every
+        known plugin is loaded now, and registering or unregistering a type afterwards
+        raises `RuntimeError`. Looking a type up is then nothing more than a dictionary
+        access, with no plugin search on a miss.
+
+        **Raises:**
+        - `ValueError`: If a plugin cannot be loaded.
+        """
+        if not cls._plugins_discovered:
+            cls.discover_plugins()
+        for name in list(cls._plugins):
+            cls._load_plugin(name)
+        with cls._lock:
+            cls.frozen = True
+
+    @classmethod
+    def create_calculation(cls, calculation_type: str, a: float, b: float, *operands: float,
+                           backend=None) -> Calculation:
         """
         Factory method that creates instances of Calculation subclasses based on 
         a specified calculation type.
@@ -156,6 +416,11 @@ class CalculationFactory:
         - `calculation_type (str)`: The type of calculation ('add', 'subtract', 'multiply', 'divide').
         - `a (float)`: The first operand.
         - `b (float)`: The second operand.
+        - `*operands (float)`: Any further operands, for calculations that take more than two
+          (like 'powmod', which takes base, exponent and modulus).
+        - `backend`: A numeric backend (or its name, e.g. 'decimal') to convert both operands
+          with first; see `app.numeric`. Defaults to the factory's `backend` (set with
+          `set_backend`). Operands may then also be strings, like the user typed them.
         
         **Returns:**
         - `Calculation`: An instance of the appropriate Calculation subclass.
@@ -167,14 +432,399 @@ class CalculationFactory:
           clear error message listing valid options, helping prevent errors and 
           ensuring the user knows the supported types.
         """
+        metrics = _metrics.active
+        if metrics is None:
+            return cls._create_calculation(calculation_type, a, b, operands, backend)
+        name = calculation_type.lower()
+        if name not in cls._registry.calculations and name not in cls._plugins:
+            # Count every unknown type under one name, however many different ones are typed.
+            name = 'unsupported'
+        return metrics.time('create', name, cls._create_calculation, calculation_type, a, b, operands, backend)
+
+    @classmethod
+    def _create_calculation(cls, calculation_type: str, a: float, b: float, operands: tuple,
+                            backend) -> Calculation:
+        """The work of `create_calculation`, without the instrumentation."""
+        calculation_class = cls.get_calculation_class(calculation_type)
+        if len(operands) + 2 != calculation_class.arity:
+            raise ValueError(
+                f"Calculation type '{calculation_type}' takes {calculation_class.arity} operands, "
+                f"got {len(operands) + 2}."
+            )
+        if backend is None:
+            backend = cls.backend
+        if backend is not None:
+            if isinstance(backend, str):
+                backend = _get_backend(backend)
+            a = backend.convert(a)
+            b = backend.convert(b)
+            operands = tuple(backend.convert(operand) for operand in operands)
+        # Create and return an instance of the requested calculation class with the provided operands.
+        return calculation_class(a, b, *operands)
+
+    @classmethod
+    def set_backend(cls, backend) -> None:
+        """
+        Sets the numeric backend `create_calculation` uses by default: a backend from
+        `app.numeric`, its name (e.g. 'fraction'), or `None` to use operands as given.
+
+        **Raises:**
+        - `ValueError`: If there is no backend with that name.
+        """
+        cls.backend = _get_backend(backend) if isinstance(backend, str) else backend
+
+    @classmethod
+    def unregister_calculation(cls, calculation_type: str) -> None:
+        """
+        Removes a registered calculation type (and its kernel), e.g. to undo a registration
+        made for a test or to replace an implementation.
+
+        **Raises:**
+        - `ValueError`: If the type is not registered.
+        """
         calculation_type_lower = calculation_type.lower()
-        calculation_class = cls._calculations.get(calculation_type_lower)
+        with cls._lock:
+            cls._check_not_frozen()
+            if calculation_type_lower in cls._plugins:
+                cls._plugins = {name: target for name, target in cls._plugins.items()
+                                if name != calculation_type_lower}
+                return
+            if calculation_type_lower not in cls._registry.calculations:
+                raise ValueError(f"Calculation type '{calculation_type}' is not registered.")
+            cls._publish(calculation_type_lower, None)
+
+    @classmethod
+    def register_lazy(cls, calculation_type: str, target: str) -> None:
+        """
+        Registers a calculation type by name only. The class is imported from `target`
+        the first time the type is used.
+
+        **Parameters:**
+        - `calculation_type (str)`: The type's identifier (e.g. 'cube').
+        - `target (str)`: Where the Calculation subclass is, as "module:attribute"
+          (e.g. 'my_operations.cube:CubeCalculation').
+
+        **Raises:**
+        - `ValueError`: If the type is already registered.
+        """
+        calculation_type_lower = calculation_type.lower()
+        with cls._lock:
+            cls._check_not_frozen()
+            if calculation_type_lower in cls._registry.calculations or calculation_type_lower in cls._plugins:
+                raise ValueError(f"Calculation type '{calculation_type}' is already registered.")
+            cls._plugins = {**cls._plugins, calculation_type_lower: target}
+
+    @classmethod
+    def discover_plugins(cls, group: str = PLUGIN_GROUP) -> list:
+        """
+        Records the calculation types that installed packages declare as entry points in
+        `group`, without importing them (see `register_lazy`). Types that are already
+        registered keep their current implementation.
+
+        This runs by itself the first time an unknown type is looked up; calling it
+        explicitly picks up packages installed since.
+
+        **Returns:**
+        - `list`: The names of the newly recorded types.
+        """
+        # Imported here: reading package metadata is only needed once a plugin is looked for.
+        from importlib.metadata import entry_points
+
+        found = entry_points(group=group)
+        with cls._lock:
+            cls._check_not_frozen()
+            plugins = dict(cls._plugins)
+            discovered = []
+            for entry_point in found:
+                name = entry_point.name.lower()
+                if name not in cls._registry.calculations and name not in plugins:
+                    plugins[name] = entry_point.value
+                    discovered.append(name)
+            cls._plugins = plugins
+            cls._plugins_discovered = True
+        return discovered
+
+    @classmethod
+    def _load_plugin(cls, calculation_type_lower: str) -> Optional[type]:
+        """
+        Imports and registers the plugin recorded for a calculation type, if there is one.
+
+        **Returns:**
+        - The Calculation subclass, or `None` if no plugin provides the type.
+
+        **Raises:**
+        - `ValueError`: If the plugin cannot be imported or is not a Calculation subclass.
+        """
+        if cls.frozen:
+            # Every plugin was loaded by freeze().
+            return None
+        if not cls._plugins_discovered:
+            cls.discover_plugins()
+        target = cls._plugins.get(calculation_type_lower)
+        if target is None:
+            return None
+        # Imported here: only needed when a plugin is actually loaded.
+        import pkgutil
+
+        try:
+            calculation_class = pkgutil.resolve_name(target)
+        except (ImportError, AttributeError, ValueError) as e:
+            raise ValueError(f"Cannot load calculation type '{calculation_type_lower}' from '{target}': {e}") from None
+        if not (isinstance(calculation_class, type) and issubclass(calculation_class, Calculation)):
+            raise ValueError(f"Plugin '{target}' for '{calculation_type_lower}' is not a Calculation subclass.")
+        # The import happens outside the lock, since the plugin's module may register the
+        # class itself, with the decorator. Several threads may get here at once; the
+        # first one to take the lock registers the class.
+        with cls._lock:
+            if cls._registry.calculations.get(calculation_type_lower) is not calculation_class:
+                cls._check_not_frozen()
+                cls._publish(calculation_type_lower, calculation_class)
+        return calculation_class
+
+    @classmethod
+    def get_kernel(cls, calculation_type: str, arity: Optional[int] = None) -> Callable[[Any, Any], Any]:
+        """
+        Returns the fast-path kernel for a calculation type: a plain function `kernel(a, b)`
+        that returns the same result as `create_calculation(type, a, b).execute()`.
+        (Kernels of calculations with more operands take all of them, e.g. `kernel(a, b, m)`.)
+
+        Callers that only ever pass a fixed number of operands (two, for the column-wise
+        batch paths) say so with `arity`, so a type taking a different number is rejected
+        up front instead of failing on every row.
+
+        **Why Use a Kernel?**
+        - Creating a Calculation object, looking its class up and dispatching to `execute`
+          costs more than the arithmetic itself. Looking the kernel up once and then
+          calling it in a loop skips all of that.
+        - Kernels skip the operand type checks of the `Operation` methods, so they are
+          meant for callers that already have numbers (e.g. parsed with `float()`). The
+          checks that define the operation's errors (zero divisor, 0^0) are kept.
+        - Kernels do not use the result cache.
+
+        **Example:**
+        >>> add = CalculationFactory.get_kernel('add')
+        >>> [add(x, 1.0) for x in (1.0, 2.0)]
+        [2.0, 3.0]
+
+        **Raises:**
+        - `ValueError`: If the type is not registered, or does not take `arity` operands.
+        """
+        kernel = cls._registry.kernels.get(calculation_type)
+        if kernel is None or arity is not None:
+            # Not found as given: check the type with the normal lookup (which raises a
+            # helpful error for unknown types, and may load a plugin), then retry
+            # case-insensitively.
+            calculation_class = cls.get_calculation_class(calculation_type)
+            if arity is not None and calculation_class.arity != arity:
+                raise ValueError(f"Calculation type '{calculation_type}' takes {calculation_class.arity} "
+                                 f"operands, got {arity}.")
+            registry = cls._registry
+            calculation_type_lower = calculation_type.lower()
+            if registry.calculations.get(calculation_type_lower) is calculation_class:
+                kernel = registry.kernels[calculation_type_lower]
+            else:
+                # Unregistered or replaced since the class was looked up: stay consistent
+                # with the class that was found.
+                kernel = _kernel_for(calculation_class)
+        return kernel
+
+    @classmethod
+    def registry(cls) -> Registry:
+        """
+        Returns the current `Registry` snapshot. Every change to the registered types
+        publishes a new one, so a cache of anything derived from the registry (like
+        compiled expressions) can keep the snapshot it was built from and compare it
+        with `is` to tell whether it is still current. Its dictionaries must not be modified.
+        """
+        return cls._registry
+
+    @classmethod
+    def registered_types(cls) -> Dict[str, type]:
+        """
+        Returns the registered calculation types, lowercase name -> Calculation subclass,
+        in registration order, as the caller's own dictionary. Plugins that have not been
+        loaded yet are not included.
+        """
+        return dict(cls._registry.calculations)
+
+    @classmethod
+    def get_calculation_class(cls, calculation_type: str) -> type:
+        """
+        Looks up the Calculation subclass registered under `calculation_type` (in any
+        case), loading it from its plugin if it is not loaded yet. Callers that need a
+        type's `arity` or want to create calculations themselves use this rather than
+        reading the registry.
+
+        **Raises:**
+        - `ValueError`: If the type is not registered. The message lists the available types.
+        """
+        # The hot path: one dictionary access, for a type given in lowercase already.
+        calculations = cls._registry.calculations
+        calculation_class = calculations.get(calculation_type)
+        if calculation_class is not None:
+            return calculation_class
+        calculation_type_lower = calculation_type.lower()
+        calculation_class = calculations.get(calculation_type_lower)
+        if not calculation_class:
+            # Not loaded yet: it may come from a plugin.
+            calculation_class = cls._load_plugin(calculation_type_lower)
         # If the type is unsupported, raise an error with the available types.
         if not calculation_class:
-            available_types = ', '.join(cls._calculations.keys())
+            available_types = ', '.join([*cls._registry.calculations, *cls._plugins])
             raise ValueError(f"Unsupported calculation type: '{calculation_type}'. Available types: {available_types}")
-        # Create and return an instance of the requested calculation class with the provided operands.
-        return calculation_class(a, b)
+        return calculation_class
+
+    @classmethod
+    def evaluate_batch(cls, calculation_type: str, a_values: Iterable[float], b_values: Iterable[float]) -> BatchResult:
+        """
+        Evaluates one operation over whole columns of operands in a single pass.
+
+        Instead of creating one Calculation object per pair, the operation type is
+        looked up once and its kernel (see `get_kernel`) is applied to every row directly.
+        Rows that fail are recorded in the error mask rather than raising, so one bad
+        row does not abort the batch.
+
+        **Parameters:**
+        - `calculation_type (str)`: The registered type of calculation (e.g. 'divide').
+        - `a_values`: The first operands. Any sequence, `array.array` or NumPy array.
+        - `b_values`: The second operands, the same length as `a_values`.
+
+        **Returns:**
+        - `BatchResult`: The results column and the error mask (see `BatchResult`).
+
+        **Raises:**
+        - `ValueError`: If the type is unsupported or does not take two operands (like
+          `powmod`), or the columns differ in length.
+
+        **Example:**
+        >>> CalculationFactory.evaluate_batch('divide', [10.0, 1.0], [2.0, 0.0])
+        BatchResult(results=array('d', [5.0, nan]), errors=array('b', [0, 1]))
+        """
+        # Resolve the kernel once for the whole column.
+        kernel = cls.get_kernel(calculation_type, arity=2)
+        if len(a_values) != len(b_values):
+            raise ValueError(f"Operand columns differ in length: {len(a_values)} != {len(b_values)}")
+
+        # NumPy is optional: if it has not been imported, no NumPy arrays can exist,
+        # so we only take the vectorized path when the caller actually passed some in.
+        # The ufunc is chosen by the class's own kernel, so a subclass that overrides
+        # `execute` (and so has no kernel of its own) is never vectorized by mistake.
+        numpy = sys.modules.get('numpy')
+        if (
+            numpy is not None
+            and kernel in _NUMPY_UFUNCS
+            and (isinstance(a_values, numpy.ndarray) or isinstance(b_values, numpy.ndarray))
+        ):
+            return _evaluate_batch_numpy(numpy, _NUMPY_UFUNCS[kernel], a_values, b_values)  # pragma: no cover
+
+        count = len(a_values)
+        results = array.array('d', bytes(8 * count))
+        errors = array.array('b', bytes(count))
+        for index, (a, b) in enumerate(zip(a_values, b_values)):
+            try:
+                results[index] = kernel(a, b)
+            except BATCH_ERRORS:
+                # Complex results (e.g. a negative base to a fractional power) cannot be
+                # stored in a float column either, so they land here as a TypeError too.
+                results[index] = float('nan')
+                errors[index] = 1
+        return BatchResult(results, errors)
+
+
+def _defined_in(calculation_class: type, attribute: str) -> type:
+    """Returns the class in `calculation_class`'s MRO that defines `attribute`."""
+    return next(klass for klass in calculation_class.__mro__ if attribute in klass.__dict__)
+
+
+def _kernel_for(calculation_class: type) -> Callable[[Any, Any], Any]:
+    """
+    Returns the fast-path kernel of a Calculation subclass: its `kernel` attribute, unless
+    `execute` is overridden below the class that defines it (a subclass of AddCalculation
+    with its own `execute` must not inherit `operator.add`), otherwise a function that
+    creates and executes the calculation.
+    """
+    kernel = getattr(calculation_class, 'kernel', None)
+    if kernel is not None and issubclass(_defined_in(calculation_class, 'kernel'),
+                                         _defined_in(calculation_class, 'execute')):
+        return kernel
+
+    def execute_kernel(*operands):
+        return calculation_class(*operands).execute()
+    return execute_kernel
+
+
+# NumPy is not in requirements.txt, so CI never runs this; the NumPy tests in
+# tests/test_calculation.py do wherever it is installed.
+def _evaluate_batch_numpy(numpy, ufunc_name: str, a_values, b_values) -> BatchResult:  # pragma: no cover
+    """
+    NumPy implementation of `CalculationFactory.evaluate_batch`, computing the whole
+    column with one ufunc call and building the error mask with the same rules the
+    kernels enforce.
+    """
+    a = numpy.asarray(a_values, dtype=numpy.float64)
+    b = numpy.asarray(b_values, dtype=numpy.float64)
+    ufunc = getattr(numpy, ufunc_name)
+    with numpy.errstate(all='ignore'):
+        results = ufunc(a, b)
+
+    if ufunc_name in ('true_divide', 'mod'):
+        errors = b == 0
+    elif ufunc_name == 'power':
+        operands_finite = numpy.isfinite(a) & numpy.isfinite(b)
+        # 0^0 is undefined, a NaN from finite operands means a complex result,
+        # and an infinity from finite operands is an overflow.
+        errors = ((a == 0) & (b == 0)) | (operands_finite & ~numpy.isfinite(results))
+    else:
+        errors = numpy.zeros(a.shape, dtype=bool)
+    results[errors] = numpy.nan
+    return BatchResult(results, errors)
+
+def _get_backend(name: str):
+    """Looks up a numeric backend by name."""
+    # Imported here so the decimal and fractions modules are only loaded when a backend is used.
+    from app.numeric import get_backend
+    return get_backend(name)
+
+# -----------------------------------------------------------------------------------
+# Fast-Path Kernels
+# -----------------------------------------------------------------------------------
+
+# Plain functions of (a, b) used as the `kernel` of the calculations below (see
+# CalculationFactory.get_kernel). Addition, subtraction and multiplication need no checks
+# at all and use the `operator` module's C functions directly; the others keep only the
+# value checks, and raise the same errors as the calculation's `execute`.
+
+def _divide_kernel(a, b):
+    if b == 0:
+        raise ZeroDivisionError("Cannot divide by zero.")
+    return a / b
+
+
+def _power_kernel(base, exponent):
+    if base == 0 and exponent == 0:
+        raise ValueError("0^0 is undefined.")
+    if type(base) is not float and type(exponent) is not float:
+        check_power(base, exponent)
+    return base ** exponent
+
+
+def _modulus_kernel(a, b):
+    if b == 0:
+        raise ValueError("Modulus by zero is not allowed.")
+    return a % b
+
+
+# Maps the kernels above to the NumPy ufunc that computes the same thing element-wise.
+_NUMPY_UFUNCS = {
+    operator.add: 'add',
+    operator.sub: 'subtract',
+    operator.mul: 'multiply',
+    _divide_kernel: 'true_divide',
+    _power_kernel: 'power',
+    # numpy.mod follows Python's % and takes the sign of the divisor (unlike numpy.fmod).
+    _modulus_kernel: 'mod',
+}
+
 
 # -----------------------------------------------------------------------------------
 # Concrete Calculation Classes
@@ -196,6 +846,15 @@ class AddCalculation(Calculation):
     - **Clear Responsibility**: Each class has a clear, single purpose, making the code easier to read.
     """
 
+    # Name of the Operation this calculation performs (the guardrails look for 'power').
+    operation_name = 'addition'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    kernel = staticmethod(operator.add)
+
+    # No new instance attributes, so no __dict__ either (see Calculation.__slots__).
+    __slots__ = ()
+
     def execute(self) -> float:
         # Calls the addition method from the Operation module to perform the addition.
         return Operation.addition(self.a, self.b)
@@ -210,6 +869,15 @@ class SubtractCalculation(Calculation):
     the implementation separate from other operations.
     """
 
+    # Name of the Operation this calculation performs (the guardrails look for 'power').
+    operation_name = 'subtraction'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    kernel = staticmethod(operator.sub)
+
+    # No new instance attributes, so no __dict__ either (see Calculation.__slots__).
+    __slots__ = ()
+
     def execute(self) -> float:
         # Calls the subtraction method from the Operation module to perform the subtraction.
         return Operation.subtraction(self.a, self.b)
@@ -224,6 +892,15 @@ class MultiplyCalculation(Calculation):
     concerns, making it easy to adjust the multiplication logic without affecting other calculations.
     """
 
+    # Name of the Operation this calculation performs (the guardrails look for 'power').
+    operation_name = 'multiplication'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    kernel = staticmethod(operator.mul)
+
+    # No new instance attributes, so no __dict__ either (see Calculation.__slots__).
+    __slots__ = ()
+
     def execute(self) -> float:
         # Calls the multiplication method from the Operation module to perform the multiplication.
         return Operation.multiplication(self.a, self.b)
@@ -239,6 +916,15 @@ class DivideCalculation(Calculation):
     checks if the second operand is zero before performing the operation.
     """
 
+    # Name of the Operation this calculation performs (the guardrails look for 'power').
+    operation_name = 'division'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    kernel = staticmethod(_divide_kernel)
+
+    # No new instance attributes, so no __dict__ either (see Calculation.__slots__).
+    __slots__ = ()
+
     def execute(self) -> float:
         # Before performing division, check if `b` is zero to avoid ZeroDivisionError.
         if self.b == 0:
@@ -254,19 +940,34 @@ class PowerCalculation(Calculation):
     This class uses 'base' and 'exponent' terminology instead of generic 'a' and 'b'
     to make the operation more semantically clear.
     """
-    
-    def __init__(self, base: float, exponent: float) -> None:
-        """
-        Initializes a PowerCalculation with base and exponent.
-        
-        Parameters:
-        - base (float): The base number
-        - exponent (float): The power to raise the base to
-        """
-        self.base = base
-        self.exponent = exponent
-        # Still call parent init for compatibility
-        super().__init__(base, exponent)
+
+    # Name of the Operation this calculation performs (the guardrails look for 'power').
+    operation_name = 'power'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    kernel = staticmethod(_power_kernel)
+
+    # No new instance attributes, so no __dict__ either (see Calculation.__slots__).
+    # The operands are stored once, as `a` and `b`; `base` and `exponent` are aliases for them.
+    __slots__ = ()
+
+    @property
+    def base(self) -> float:
+        """The base number (the same value as `a`)."""
+        return self.a
+
+    @base.setter
+    def base(self, value: float) -> None:
+        self.a = value
+
+    @property
+    def exponent(self) -> float:
+        """The power to raise the base to (the same value as `b`)."""
+        return self.b
+
+    @exponent.setter
+    def exponent(self, value: float) -> None:
+        self.b = value
     
     def execute(self) -> float:
         return Operation.power(self.base, self.exponent)
@@ -290,7 +991,70 @@ class ModulusCalculation(Calculation):
     which is useful for many mathematical and programming applications.
     """
 
+    # Name of the Operation this calculation performs (the guardrails look for 'power').
+    operation_name = 'modulus'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    kernel = staticmethod(_modulus_kernel)
+
+    # No new instance attributes, so no __dict__ either (see Calculation.__slots__).
+    __slots__ = ()
+
     def execute(self) -> float:
         if self.b == 0:
             raise ValueError("Modulus by zero is not allowed.")
-        return Operation.modulus(self.a, self.b) # pragma: no cover
\ No newline at end of file
+        return Operation.modulus(self.a, self.b) # pragma: no cover
+
+
+@CalculationFactory.register_calculation('powmod')
+class PowModCalculation(Calculation):
+    """
+    PowModCalculation raises a base to a power modulo a third number, `(base ** exponent) % modulus`,
+    as one fused operation on whole numbers.
+
+    **Why a Separate Calculation Instead of Power Then Modulus?**
+    - `power` builds the full result first: for large exponents that is a huge integer,
+      or an overflow with floats, which `modulus` then reduces. The fused version uses
+      Python's three-argument `pow`, which keeps every intermediate value below the modulus.
+    - It is the one calculation with three operands: the modulus is kept in its own slot
+      `m`, and `arity`/`operands` tell the factory, the REPL and the history about it.
+    """
+
+    # Name of the Operation method this calculation uses.
+    operation_name = 'powmod'
+
+    # Fast-path function computing the result without creating an object (see get_kernel).
+    # Operation.powmod is used as is, since its whole-number conversion is what makes it work.
+    kernel = staticmethod(Operation.powmod)
+
+    # Base, exponent and modulus.
+    arity = 3
+
+    # The modulus needs one more slot on top of Calculation's `a` and `b`.
+    __slots__ = ('m',)
+
+    def __init__(self, base: float, exponent: float, modulus: float) -> None:
+        """
+        Initializes a PowModCalculation.
+
+        Parameters:
+        - base (float): The base number (stored as `a`)
+        - exponent (float): The power to raise the base to (stored as `b`)
+        - modulus (float): The number to take the remainder by (stored as `m`)
+        """
+        super().__init__(base, exponent)
+        self.m: float = modulus
+
+    @property
+    def operands(self) -> tuple:
+        return (self.a, self.b, self.m)
+
+    def execute(self) -> int:
+        return Operation.powmod(self.a, self.b, self.m)
+
+    def __str__(self) -> str:
+        result = self.execute()
+        return f"{self.__class__.__name__}: {self.a} ^ {self.b} mod {self.m} = {result}"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(base={self.a}, exponent={self.b}, modulus={self.m})"
@@ -15,17 +15,34 @@ Throughout the code, comments explain where and why these paradigms are used,
 providing a comprehensive learning experience for us, students.
 """
 
+import operator
 import sys
-import readline  # Enables command history and editing features
-from typing import List
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+from app import metrics
+from app.cache import ParseCache
 from app.calculation import Calculation, CalculationFactory
+from app.command import CommandError, parse_command
+from app.history import History
 
 
-def display_help() -> None:
+def enable_line_editing() -> None:
     """
-    Displays the help message with usage instructions and supported operations.
+    Enables command history and line editing (arrow keys, Ctrl+R, ...) for `input()`.
+
+    Importing `readline` is all it takes, but the import is slow and probes the terminal,
+    so it is only done when an interactive session on a real terminal actually starts,
+    not whenever this module is imported.
     """
-    help_message = """
+    try:
+        import readline  # noqa: F401 - importing it is enough to hook it into input()
+    except ImportError:  # pragma: no cover - readline is not available on Windows
+        pass
+
+
+# The help text, shared by the REPL and the calculation server (app.server).
+HELP_MESSAGE = """
 Calculator REPL Help
 --------------------
 Usage:
@@ -38,10 +55,24 @@ Usage:
         divide    : Divides the first number by the second.
         power     : Raises the first number to the power of the second.
         modulus   : Computes the modulus of the first number by the second. 
+        powmod    : Takes three numbers: (number1 ^ number2) mod number3, for whole numbers.
 
 Special Commands:
     help      : Display this help message.
     history   : Show the history of calculations.
+    history <N> | history tail [<N>] | history --from <N> [--to <M>]
+              : Show only the first N, the last N (10 by default) or entries N to M.
+    summary   : Show the count, sum, mean, min, max and variance of the results,
+                overall and per operation.
+    find [<operation>] [result<op><number>]... [last <N>] [since <N>[s|m|h|d]]
+              : Search the history, e.g. 'find divide result>1e6' or 'find power last 100'.
+    stats [on|off|reset]
+              : Show call counts, errors and latencies, or switch collecting them on/off.
+    eval <expression>
+              : Evaluate a formula using + - * / % ^ and parentheses.
+    jobs      : With --workers, list the calculations still running.
+    cancel [<N>]
+              : With --workers, give up on calculation N, or on all running ones.
     exit      : Exit the calculator.
 
 Examples:
@@ -51,44 +82,313 @@ Examples:
     divide 20 4
     power 2 3
     modulus 10 3
+    powmod 4 13 497
+    eval (10 + 5) * 2 ^ 3 % 7
+    """
+
+
+def display_help() -> None:
     """
-    print(help_message)
+    Displays the help message with usage instructions and supported operations.
+    """
+    print(HELP_MESSAGE)
+
 
+# How many history entries are rendered, and written with a single call, at a time.
+HISTORY_PAGE_SIZE = 1000
 
-def display_history(history: List[Calculation]) -> None:
+# How many entries `history tail` shows when no number is given.
+HISTORY_TAIL_SIZE = 10
+
+HISTORY_USAGE = "Usage: history [<N> | tail [<N>] | --from <N> [--to <M>]]"
+
+
+def display_history(history: Sequence[Calculation], start: int = 0, stop: Optional[int] = None) -> None:
     """
     Displays the history of calculations performed during the session.
 
+    The output is written one page (`HISTORY_PAGE_SIZE` entries) at a time, with a
+    single write per page, so even a history of millions of entries streams out
+    quickly instead of being printed line by line.
+
+    Parameters:
+        history (Sequence[Calculation]): The past calculations, either a `History` or a plain list.
+        start (int): Index (0 = oldest) of the first entry to show.
+        stop (Optional[int]): Index after the last entry to show; `None` means up to the newest.
+    """
+    write = sys.stdout.write
+    for page in history_pages(history, start, stop, HISTORY_PAGE_SIZE):
+        write(page)
+
+
+def history_pages(history: Sequence[Calculation], start: int = 0, stop: Optional[int] = None,
+                  page_size: int = HISTORY_PAGE_SIZE) -> Iterator[str]:
+    """
+    Yields the output of the `history` command one page of text at a time.
+
+    Only one page of Calculation objects exists at a time: each page is sliced out of
+    the history as it is needed. Stored results are displayed as they are, without
+    recomputing anything.
+
+    Parameters:
+        history (Sequence[Calculation]): The past calculations, either a `History` or a plain list.
+        start (int), stop (Optional[int]): The entries to show, as in `display_history`.
+        page_size (int): How many entries to render per page.
+    """
+    length = len(history)
+    if not length:
+        yield "No calculations performed yet.\n"
+        return
+    stop = length if stop is None else min(stop, length)
+    if start >= stop:
+        yield f"No calculations in that range (the history has {length}).\n"
+        return
+    header = "Calculation History:\n"
+    for page_start in range(start, stop, page_size):
+        page = history[page_start:min(page_start + page_size, stop)]
+        yield header + "".join([f"{number}. {calculation}\n"
+                                for number, calculation in enumerate(page, start=page_start + 1)])
+        header = ""
+
+
+def history_range(arguments: str, length: int) -> Tuple[int, int]:
+    """
+    Works out which entries the `history` command should show.
+
+    - `history` shows everything,
+    - `history 100` shows the first 100 entries,
+    - `history tail` shows the last `HISTORY_TAIL_SIZE` entries (`history tail 50`: the last 50),
+    - `history --from N --to M` shows entries N to M, numbered as in the full listing.
+
+    Parameters:
+        arguments (str): What follows `history` on the command line.
+        length (int): How many entries the history has.
+
+    Returns:
+        Tuple[int, int]: The `start` and `stop` indexes for `display_history`.
+
+    Raises:
+        ValueError: If the arguments are not valid (the message is `HISTORY_USAGE`).
+    """
+    words = arguments.split()
+    # EAFP: any word that is not where it belongs, or not a number, is a usage error.
+    try:
+        if not words:
+            return 0, length
+        if words[0] == "tail" and len(words) <= 2:
+            count = int(words[1]) if len(words) == 2 else HISTORY_TAIL_SIZE
+            if count < 1:
+                raise ValueError
+            return max(0, length - count), length
+        if len(words) == 1:
+            count = int(words[0])
+            if count < 1:
+                raise ValueError
+            return 0, min(count, length)
+        options = dict(zip(words[::2], words[1::2]))
+        if len(words) % 2 or len(options) != len(words) // 2 or not set(options) <= {"--from", "--to"}:
+            raise ValueError
+        first = int(options.get("--from", 1))
+        last = int(options.get("--to", max(length, first)))
+        if first < 1 or last < first:
+            raise ValueError
+        return first - 1, min(last, length)
+    except ValueError:
+        raise ValueError(HISTORY_USAGE) from None
+
+
+def find_lines(history, arguments: str) -> Iterator[str]:
+    """
+    Yields the lines of the `find` command's output: the history entries matching the
+    query in `arguments` (see app.query), numbered as in the `history` command.
+
+    Parameters:
+        history: A `History` or `PersistentHistory`.
+        arguments (str): The query, e.g. "divide result>1e6 last 10".
+    """
+    # Imported here so the query parser is only loaded once someone searches.
+    from app.query import parse_query
+
+    try:
+        query = parse_query(arguments)
+    except ValueError as e:
+        yield str(e)
+        return
+    indexes = history.search(query)
+    if not indexes:
+        yield "No matching calculations."
+        return
+    yield f"Found {len(indexes)} calculations:"
+    for index in indexes:
+        yield f"{index + 1}. {history[index]}"
+
+
+def evaluate_expression(source: str) -> None:
+    """
+    Evaluates a multi-operand formula for the `eval` command and prints the result.
+
+    Parameters:
+        source (str): The formula, e.g. "(10 + 5) * 2 ^ 3".
+    """
+    # Imported here so the expression engine is only loaded once someone uses it.
+    from app.expression import ExpressionError, evaluate
+
+    # EAFP: try to evaluate the formula and explain what went wrong if we can't.
+    try:
+        result = evaluate(source)
+    except ExpressionError as e:
+        print(f"Invalid expression: {e}\n")
+    except ZeroDivisionError:
+        print("Cannot divide by zero.\n")
+    except Exception as e:
+        print(f"An error occurred during calculation: {e}\n")
+    else:
+        print(f"Result: {source.strip()} = {result}\n")
+
+
+# The commands the REPL times separately in its `repl` statistics; every other line counts
+# as a "calculation".
+TIMED_COMMANDS = frozenset(("help", "history", "summary", "find", "eval", "stats", "jobs", "cancel"))
+
+
+def stats_command(argument: str = "", parse_cache: Optional[ParseCache] = None) -> str:
+    """
+    Runs the `stats` command and returns what to print.
+
     Parameters:
-        history (List[Calculation]): A list of Calculation objects representing past calculations.
+        argument (str): "" to show the statistics, or "on", "off" or "reset".
+        parse_cache (Optional[ParseCache]): The session's operand cache, whose statistics
+            are shown too (they are always collected).
     """
-    if not history:
-        print("No calculations performed yet.")
+    argument = argument.strip().lower()
+    if argument == "on":
+        metrics.enable()
+        return "Collecting statistics."
+    if argument == "off":
+        metrics.disable()
+        return "Stopped collecting statistics."
+    active = metrics.active
+    if argument == "reset":
+        if active is not None:
+            active.reset()
+        return "Statistics reset."
+    if argument:
+        return "Usage: stats [on|off|reset]"
+    if active is None:
+        shown = "Statistics are not being collected. Type 'stats on' to start."
     else:
-        print("Calculation History:")
-        for idx, calculation in enumerate(history, start=1):
-            print(f"{idx}. {calculation}")
+        shown = active.format()
+    if parse_cache is not None:
+        shown += (f"\nOperand cache: {parse_cache.hits} hits, {parse_cache.misses} misses, "
+                  f"{parse_cache.evictions} evictions, {len(parse_cache)}/{parse_cache.maxsize} entries")
+    return shown
+
+
+def cancel_command(pool, argument: str = "") -> str:
+    """
+    Runs the `cancel` command and returns what to print.
+
+    Parameters:
+        pool (Optional[CalculationPool]): The worker pool, or `None` without `--workers`.
+        argument (str): "" to cancel every running calculation, or a ticket number.
+    """
+    if pool is None:
+        return "Nothing to cancel: calculations only run in the background with --workers."
+    argument = argument.strip()
+    # EAFP: a ticket number, or the usage.
+    try:
+        ticket = int(argument) if argument else None
+    except ValueError:
+        return "Usage: cancel [<N>]"
+    if not pool.cancel(ticket):
+        return "Nothing to cancel." if ticket is None else f"No calculation {ticket} is running."
+    return ""
 
 
-def calculator() -> None:
+def calculator(max_history: Optional[int] = None, history_file: Optional[str] = None,
+               backend: Optional[str] = None, stats: bool = False,
+               workers: Optional[int] = None, timeout: Optional[float] = None) -> None:
     """
     Professional REPL calculator that performs addition, subtraction,
     multiplication, and division using Calculation classes.
 
     This function demonstrates both LBYL and EAFP programming paradigms.
+
+    Parameters:
+        max_history (Optional[int]): Keep only this many of the most recent calculations
+            in the history. `None` (the default) keeps all of them.
+        history_file (Optional[str]): Record the history in this file instead of in memory,
+            so it is kept between sessions. `max_history` does not apply to it. The file
+            stores every number as a float.
+        backend (Optional[str]): The numeric backend to calculate with ('float', 'int',
+            'decimal' or 'fraction'; see app.numeric). `None` (the default) parses operands
+            with `float()` as always.
+        stats (bool): Start collecting statistics (see the `stats` command) right away.
+        workers (Optional[int]): Run calculations on this many worker threads, and
+            expensive powers in a worker process (see app.pool), so the prompt comes back at
+            once and results are printed with their ticket number when they are ready.
+            `None` (the default) calculates in line.
+        timeout (Optional[float]): With `workers`, give up on a calculation after this
+            many seconds.
     """
-    # Initialize an empty list to keep track of calculation history
-    history: List[Calculation] = []
+    # The operand parser and the way calculations are executed depend on the backend.
+    parse: Callable[[str], Any] = float
+    execute: Callable[[Calculation], Any] = operator.methodcaller("execute")
+    number_type: type = float
+    if backend is not None:
+        # Imported here so the decimal and fractions modules are only loaded when asked for.
+        from app.numeric import get_backend
+        numeric_backend = get_backend(backend)
+        parse, execute, number_type = numeric_backend.convert, numeric_backend.execute, numeric_backend.number_type
+    # Operands repeat a lot (0, 1, 100, ...): each distinct token is only parsed once.
+    operand_cache = ParseCache(parse)
+    parse = operand_cache.parse
+
+    history: Sequence[Calculation]
+    if history_file is not None:
+        # Imported here so the on-disk history is only loaded when it is actually used.
+        from app.persistence import PersistentHistory
+        history = PersistentHistory(history_file, autoflush=True)
+    else:
+        # Initialize an empty, compact History to keep track of calculation history
+        history = History(maxlen=max_history, number_type=number_type)
+
+    if stats:
+        metrics.enable()
+
+    pool = None
+    if workers is not None:
+        # Imported here so the threading (and multiprocessing) machinery is only loaded
+        # when it is used.
+        from app.pool import CalculationPool
+        pool = CalculationPool(history, workers, timeout, execute=execute)
+    # Hold this while reading the history, which the workers may be appending to.
+    history_lock = pool.lock if pool is not None else nullcontext()
+
+    # LBYL: only set up line editing when a person is typing at a terminal.
+    if sys.stdin.isatty():
+        enable_line_editing()
 
     # Welcome message to the user
     print("Welcome to the Professional Calculator REPL!")
     print("Type 'help' for instructions or 'exit' to quit.\n")
 
+    # The command being timed for the statistics, and when it started.
+    timed_command: Optional[str] = None
+    started = 0
+
     # Continuously prompt the user for input until they decide to exit
     while True:
         try:
+            # Handling the previous line ends when we are back at the prompt.
+            active_metrics = metrics.active
+            if timed_command is not None and active_metrics is not None:
+                active_metrics.record("repl", timed_command, time.perf_counter_ns() - started)
+            timed_command = None
+
             # Prompt the user to enter an operation and two numbers
             user_input: str = input(">> ").strip()
+            started = time.perf_counter_ns()
 
             # LBYL (Look Before You Leap)
             # -----------------------------------
@@ -98,50 +398,91 @@ def calculator() -> None:
                 # Input is empty, so we skip processing and prompt again.
                 continue # pragma: no cover
 
-            # Handle special commands
-            command = user_input.lower()
+            # EAFP (Easier to Ask Forgiveness than Permission)
+            # -----------------------------------
+            # Instead of checking if the input is correctly formatted (which can be complex),
+            # we let the tokenizer parse the whole line in one pass (see app.command) and
+            # handle the error it raises, which says exactly where the problem is.
+            try:
+                parsed = parse_command(user_input, parse)
+            except CommandError as e:
+                timed_command = "calculation"
+                print("Invalid input. Please follow the format: <operation> <num1> <num2>")
+                print(e.pointer(user_input))
+                print("Type 'help' for more information.\n")
+                continue  # Prompt the user again
+            command, argument = parsed.name, parsed.argument
+            timed_command = command if command in TIMED_COMMANDS else "calculation"
 
-            # LBYL is used here to check if the user input matches any special commands.
+            # LBYL is used here to check if the user input is one of the special commands.
             if command == "help":
                 display_help()
                 continue
             elif command == "history":
-                display_history(history)
+                # EAFP: show the requested entries, or explain how to ask for them.
+                with history_lock:
+                    try:
+                        start, stop = history_range(argument.lower(), len(history))
+                    except ValueError as e:
+                        print(f"{e}\n")
+                    else:
+                        display_history(history, start, stop)
+                continue
+            elif command == "summary":
+                with history_lock:
+                    for line in history.aggregates.lines():
+                        print(line)
+                print()
                 continue
             elif command == "exit":
+                if pool is not None:
+                    # Let the calculations already started finish (Ctrl+C gives up on them).
+                    pool.wait()
+                    pool.shutdown()
                 print("Exiting calculator. Goodbye!\n")
                 sys.exit(0)  # Exit the program gracefully
-
-            # EAFP (Easier to Ask Forgiveness than Permission)
-            # -----------------------------------
-            # Instead of checking if the input is correctly formatted (which can be complex),
-            # we attempt to parse it and handle any exceptions that arise.
-            try:
-                # Attempt to split the user input into operation and operands
-                operation, num1_str, num2_str = user_input.split()
-                # Convert the operand strings to floats
-                num1: float = float(num1_str)
-                num2: float = float(num2_str)
-            except ValueError:
-                # If splitting or conversion fails, we catch the exception.
-                # This approach trusts the user input and handles exceptions if something goes wrong.
-                # This is characteristic of EAFP.
-                print("Invalid input. Please follow the format: <operation> <num1> <num2>")
-                print("Type 'help' for more information.\n")
-                continue  # Prompt the user again
+            elif command == "find":
+                with history_lock:
+                    for line in find_lines(history, argument):
+                        print(line)
+                print()
+                continue
+            elif command == "jobs":
+                running = pool.jobs() if pool is not None else []
+                for line in running or ["No calculations running."]:
+                    print(line)
+                print()
+                continue
+            elif command == "cancel":
+                message = cancel_command(pool, argument)
+                if message:
+                    print(message + "\n")
+                continue
+            elif command == "eval":
+                evaluate_expression(argument)
+                continue
+            elif command == "stats":
+                print(stats_command(argument, operand_cache) + "\n")
+                continue
 
             # Attempt to create a Calculation instance using the factory
             try:
-                calculation = CalculationFactory.create_calculation(operation, num1, num2)
+                # (a few operations, like powmod, take a third operand)
+                calculation = CalculationFactory.create_calculation(command, *parsed.operands)
             except ValueError as ve:
-                # Handle unsupported operations
+                # Handle unsupported operations and the wrong number of operands
                 print(ve)
                 print("Type 'help' to see the list of supported operations.\n")
                 continue  # Prompt the user again
 
+            if pool is not None:
+                # A worker calculates it, and prints the result when it is ready.
+                pool.submit(calculation)
+                continue
+
             # Attempt to execute the calculation
             try:
-                result = calculation.execute()
+                result = execute(calculation)
             except ZeroDivisionError:
                 # Handle division by zero specifically
                 print("Cannot divide by zero.")
@@ -157,18 +498,27 @@ def calculator() -> None:
             result_str: str = f"{calculation}"
             print(f"Result: {result_str}\n")
 
-            # Append the calculation object to history
-            history.append(calculation)
+            # Append the calculation to history
+            try:
+                history.append(calculation)
+            except ValueError as e:
+                # EAFP: e.g. the history file cannot store a three-operand powmod.
+                print(f"Not added to the history: {e}\n")
 
         except KeyboardInterrupt:
             # EAFP example for handling unexpected interruption
             # Instead of checking if the user pressed Ctrl+C before each input,
             # we handle the KeyboardInterrupt exception.
+            if pool is not None:
+                pool.shutdown()
             print("\nKeyboard interrupt detected. Exiting calculator. Goodbye!")
             sys.exit(0)
         except EOFError:
             # EAFP example for handling EOF (Ctrl+D)
             # Similar to KeyboardInterrupt, we handle the EOFError exception.
+            if pool is not None:
+                pool.wait()
+                pool.shutdown()
             print("\nEOF detected. Exiting calculator. Goodbye!")
             sys.exit(0)
 
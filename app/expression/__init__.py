@@ -0,0 +1,351 @@
+"""
+This module evaluates arithmetic formulas with any number of operands, such as
+`(a + b) * c ^ 2 % m`, built from the calculator's own operations.
+
+**How It Works:**
+1. **Parsing**: the source text is turned into a tree of nodes. Each operator becomes a
+   `CalculationNode` naming the calculation type it stands for (`+` is `add`, `^` is
+   `power`, ...), so formulas use exactly the same operations as the REPL.
+2. **Compiling**: the tree is turned, once, into a chain of small Python closures that
+   call the operations' fast-path kernels (`CalculationFactory.get_kernel`) directly.
+   Sub-expressions made only of numbers are computed at compile time ("constant folding").
+3. **Caching**: compiled expressions are cached by their source text, so evaluating the
+   same formula again with new variable values costs only the closure calls. The kernels
+   are bound at compile time, so an expression compiled before the registered
+   calculations changed (a plugin loaded, a type registered again) is compiled anew.
+
+**Operators**, from lowest to highest precedence:
+- `+`, `-` (left to right)
+- `*`, `/`, `%` (left to right)
+- unary `-` and `+`
+- `^` (power, right to left, so `2 ^ 3 ^ 2` is `2 ^ 9`; `-2 ^ 2` is `-(2 ^ 2)`)
+
+**Example:**
+>>> expression = compile_expression('(a + b) * c ^ 2 % m')
+>>> expression.evaluate(a=1, b=2, c=3, m=5)
+2.0
+"""
+
+import operator
+import re
+from typing import Callable, FrozenSet, List, Mapping, NamedTuple, Optional, Union
+
+from app.cache import ResultCache
+from app.calculation import CalculationFactory, Registry
+
+# Maps each binary operator to the calculation type it stands for.
+BINARY_OPERATORS = {
+    '+': 'add',
+    '-': 'subtract',
+    '*': 'multiply',
+    '/': 'divide',
+    '%': 'modulus',
+    '^': 'power',
+}
+
+# How many compiled expressions to keep in the cache.
+DEFAULT_CACHE_SIZE = 256
+
+
+class ExpressionError(ValueError):
+    """
+    Raised when an expression cannot be parsed or evaluated.
+
+    **Attributes:**
+    - `position`: Where in the source the problem is (0-based), or `None` if not applicable.
+    """
+
+    def __init__(self, message: str, position: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.position = position
+
+
+# -----------------------------------------------------------------------------------
+# Expression Tree
+# -----------------------------------------------------------------------------------
+
+class NumberNode(NamedTuple):
+    """A numeric literal."""
+    value: float
+
+    def evaluate(self, bindings: Mapping[str, float]) -> float:
+        return self.value
+
+
+class VariableNode(NamedTuple):
+    """A variable, whose value is supplied when the expression is evaluated."""
+    name: str
+
+    def evaluate(self, bindings: Mapping[str, float]) -> float:
+        try:
+            return bindings[self.name]
+        except KeyError:
+            raise ExpressionError(f"Unbound variable: '{self.name}'") from None
+
+
+class NegateNode(NamedTuple):
+    """Unary minus."""
+    operand: "Node"
+
+    def evaluate(self, bindings: Mapping[str, float]) -> float:
+        return -self.operand.evaluate(bindings)
+
+
+class CalculationNode(NamedTuple):
+    """
+    A binary operator, standing for the Calculation registered as `calculation_type`.
+    Evaluating the tree directly creates and executes one Calculation per node, which is
+    useful as a reference; `compile_expression` produces the fast version.
+    """
+    calculation_type: str
+    left: "Node"
+    right: "Node"
+
+    def evaluate(self, bindings: Mapping[str, float]) -> float:
+        calculation = CalculationFactory.create_calculation(
+            self.calculation_type, self.left.evaluate(bindings), self.right.evaluate(bindings)
+        )
+        return calculation.execute()
+
+
+Node = Union[NumberNode, VariableNode, NegateNode, CalculationNode]
+
+
+# -----------------------------------------------------------------------------------
+# Parsing
+# -----------------------------------------------------------------------------------
+
+# One token: a number, a name, or any other single non-space character.
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\S))')
+
+
+class _Parser:
+    """
+    A recursive-descent parser with one method per precedence level. Operator tokens
+    are recognized by their text alone, since names and numbers can never look like one.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        # (kind, text, position) tuples, kind being 'number', 'name' or 'op'.
+        self.tokens: List[tuple] = []
+        position = 0
+        while True:
+            match = _TOKEN.match(source, position)
+            if match is None:
+                break  # Only trailing whitespace is left.
+            number, name, symbol = match.groups()
+            if number:
+                self.tokens.append(('number', number, match.start(1)))
+            elif name:
+                self.tokens.append(('name', name, match.start(2)))
+            else:
+                self.tokens.append(('op', symbol, match.start(3)))
+            position = match.end()
+        self.tokens.append(('end', '', len(source)))
+        self.index = 0
+
+    def peek(self) -> tuple:
+        return self.tokens[self.index]
+
+    def take(self) -> tuple:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, token: tuple) -> ExpressionError:
+        kind, text, position = token
+        if kind == 'end':
+            return ExpressionError("Unexpected end of expression", position)
+        return ExpressionError(f"Unexpected '{text}' at position {position}", position)
+
+    def parse(self) -> Node:
+        node = self.sum()
+        if self.peek()[0] != 'end':
+            raise self.error(self.peek())
+        return node
+
+    def sum(self) -> Node:
+        node = self.product()
+        while self.peek()[1] in ('+', '-'):
+            symbol = self.take()[1]
+            node = CalculationNode(BINARY_OPERATORS[symbol], node, self.product())
+        return node
+
+    def product(self) -> Node:
+        node = self.unary()
+        while self.peek()[1] in ('*', '/', '%'):
+            symbol = self.take()[1]
+            node = CalculationNode(BINARY_OPERATORS[symbol], node, self.unary())
+        return node
+
+    def unary(self) -> Node:
+        token = self.peek()
+        if token[1] in ('-', '+'):
+            self.take()
+            operand = self.unary()
+            return NegateNode(operand) if token[1] == '-' else operand
+        return self.power()
+
+    def power(self) -> Node:
+        node = self.atom()
+        if self.peek()[1] == '^':
+            self.take()
+            # Right-associative: the exponent may itself be a power (or a negated one).
+            node = CalculationNode(BINARY_OPERATORS['^'], node, self.unary())
+        return node
+
+    def atom(self) -> Node:
+        token = self.take()
+        kind, text, _ = token
+        if kind == 'number':
+            return NumberNode(float(text))
+        if kind == 'name':
+            return VariableNode(text)
+        if text == '(':
+            node = self.sum()
+            closing = self.take()
+            if closing[1] != ')':
+                raise self.error(closing)
+            return node
+        raise self.error(token)
+
+
+def parse(source: str) -> Node:
+    """
+    Parses `source` into an expression tree.
+
+    **Raises:**
+    - `ExpressionError`: If the source is not a valid expression; the message and the
+      `position` attribute say where the problem is.
+    """
+    return _Parser(source).parse()
+
+
+# -----------------------------------------------------------------------------------
+# Compiling
+# -----------------------------------------------------------------------------------
+
+Compiled = Callable[[Mapping[str, float]], float]
+
+
+def _compile(node: Node) -> Union[Compiled, NumberNode]:
+    """
+    Compiles `node` into a closure `f(bindings) -> value`, or, if the node only involves
+    numbers, into the `NumberNode` of its (already computed) value.
+    """
+    if isinstance(node, NumberNode):
+        return node
+    if isinstance(node, VariableNode):
+        return operator.itemgetter(node.name)
+    if isinstance(node, NegateNode):
+        operand = _compile(node.operand)
+        if isinstance(operand, NumberNode):
+            return NumberNode(-operand.value)
+        return lambda bindings: -operand(bindings)
+
+    kernel = CalculationFactory.get_kernel(node.calculation_type, arity=2)
+    left = _compile(node.left)
+    right = _compile(node.right)
+    left_constant = isinstance(left, NumberNode)
+    right_constant = isinstance(right, NumberNode)
+    if left_constant and right_constant:
+        a, b = left.value, right.value
+        try:
+            return NumberNode(kernel(a, b))
+        except Exception:
+            # e.g. "1 / 0": leave it for evaluation time, so the error is raised
+            # when (and every time) the expression is evaluated.
+            return lambda bindings: kernel(a, b)
+    # Specialize on constant operands so numbers are baked into the closure.
+    if left_constant:
+        a = left.value
+        return lambda bindings: kernel(a, right(bindings))
+    if right_constant:
+        b = right.value
+        return lambda bindings: kernel(left(bindings), b)
+    return lambda bindings: kernel(left(bindings), right(bindings))
+
+
+def _variables(node: Node) -> FrozenSet[str]:
+    """Returns the names of all variables used in `node`."""
+    if isinstance(node, VariableNode):
+        return frozenset((node.name,))
+    if isinstance(node, NegateNode):
+        return _variables(node.operand)
+    if isinstance(node, CalculationNode):
+        return _variables(node.left) | _variables(node.right)
+    return frozenset()
+
+
+class Expression:
+    """
+    A parsed and compiled expression, ready to be evaluated many times.
+
+    **Attributes:**
+    - `source`: The original text.
+    - `tree`: The parsed expression tree.
+    - `variables`: The names of the variables the expression needs.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source: str = source
+        # The registry this expression is compiled against. The registry is copy-on-write,
+        # so any change to it publishes a new snapshot.
+        self.registry: Registry = CalculationFactory.registry()
+        self.tree: Node = parse(source)
+        self.variables: FrozenSet[str] = _variables(self.tree)
+        compiled = _compile(self.tree)
+        if isinstance(compiled, NumberNode):
+            value = compiled.value
+            compiled = lambda bindings: value  # noqa: E731
+        self._compiled: Compiled = compiled
+
+    def evaluate(self, bindings: Optional[Mapping[str, float]] = None, **kwargs: float) -> float:
+        """
+        Evaluates the expression with the given variable values, passed as a mapping,
+        as keyword arguments, or both.
+
+        **Raises:**
+        - `ExpressionError`: If a variable the expression needs has no value.
+        - The operations' usual errors, e.g. `ZeroDivisionError` for a division by zero.
+        """
+        if bindings is None:
+            bindings = kwargs
+        elif kwargs:
+            bindings = {**bindings, **kwargs}
+        try:
+            return self._compiled(bindings)
+        except KeyError as e:
+            raise ExpressionError(f"Unbound variable: '{e.args[0]}'") from None
+
+    __call__ = evaluate
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.source!r})"
+
+
+# Compiled expressions by source text; an LRU cache so memory stays bounded.
+_cache = ResultCache(maxsize=DEFAULT_CACHE_SIZE)
+
+
+def compile_expression(source: str) -> Expression:
+    """
+    Returns the compiled `Expression` for `source`, reusing the cached one if the same
+    text has been compiled before (and the registered calculations have not changed since).
+    """
+    expression = _cache.get(source)
+    if expression is None or expression.registry is not CalculationFactory.registry():
+        expression = Expression(source)
+        _cache.put(source, expression)
+    return expression
+
+
+def evaluate(source: str, bindings: Optional[Mapping[str, float]] = None, **kwargs: float) -> float:
+    """Compiles (or reuses) the expression `source` and evaluates it with the given variables."""
+    return compile_expression(source).evaluate(bindings, **kwargs)
+
+
+def cache_info():
+    """Returns hit/miss statistics of the compiled-expression cache."""
+    return _cache.info()
@@ -0,0 +1,145 @@
+"""
+This module guards against `power` calculations that are too expensive to compute.
+
+`float ** float` takes the same time whatever the operands are (and overflows beyond
+about 1e308), but an exact result grows without bound: `10 ** 1_000_000` with integers
+(`--backend int`), or a `Fraction` to a large whole power, is a number with a million
+digits, and computing it keeps a core busy for as long as that takes. A single request
+like that can stall a whole session.
+
+**Estimating the Cost:**
+Before computing, `estimate_power_bits` estimates the size in bits of the exact result
+from the operands alone, as `|exponent|` times the size of the base (its numerator and
+denominator together, for a fraction). That takes a couple of logarithms, and
+the time a power takes grows with the size of its result, so the estimate is also a
+cost estimate.
+
+**Limits (`PowerLimits`):**
+- Above `max_bits`, the calculation is rejected with a `ValueError` before it starts
+  (`Operation.power` and the batch kernel both check).
+- Above `slow_bits`, the calculation is still computed, but front ends that can run
+  calculations in the background send it to a slow lane (see `app.pool`), so a few
+  expensive calculations cannot occupy every worker.
+
+The limits are process-wide; a deployment sets them once with `configure()` (or
+`python main.py --max-power-bits N --slow-power-bits N`).
+
+**Metrics:**
+When instrumentation is on (see `app.metrics`), every rejection and every calculation
+sent to the slow lane is counted under the `guard` stage, as `power rejected` and
+`power slow lane`, timed by how long the estimate took.
+
+**Usage:**
+>>> round(estimate_power_bits(10, 1_000_000))
+3321928
+>>> check_power(10, 1_000_000)
+Traceback (most recent call last):
+    ...
+ValueError: Power result too large: about 3,321,928 bits (the limit is 2,097,152).
+"""
+
+import math
+import time
+from numbers import Integral, Rational
+from typing import Any, NamedTuple, Optional
+
+from app import metrics
+
+
+class PowerLimits(NamedTuple):
+    """
+    How large (in bits) the exact result of a `power` may get.
+
+    **Fields:**
+    - `slow_bits`: Results estimated above this go to the slow lane (about 40,000 digits,
+      a millisecond or two, by default).
+    - `max_bits`: Results estimated above this are rejected (about 630,000 digits, a tenth
+      of a second or so, by default).
+    """
+    slow_bits: float = 1 << 17
+    max_bits: float = 1 << 21
+
+
+# The limits in force. Replaced as a whole by configure(), so readers never see half an update.
+limits = PowerLimits()
+
+
+def configure(slow_bits: Optional[float] = None, max_bits: Optional[float] = None) -> PowerLimits:
+    """
+    Changes the limits for the whole process and returns the new ones. A limit that is
+    not given keeps its current value, except that lowering `max_bits` alone below the
+    current `slow_bits` lowers that too.
+
+    **Raises:**
+    - `ValueError`: If a limit is negative, or `slow_bits` is above `max_bits`.
+    """
+    global limits
+    if max_bits is None:
+        max_bits = limits.max_bits
+    if slow_bits is None:
+        slow_bits = min(limits.slow_bits, max_bits)
+    if slow_bits < 0 or max_bits < 0:
+        raise ValueError("Power limits cannot be negative.")
+    if slow_bits > max_bits:
+        raise ValueError("The slow-lane limit cannot be above the maximum.")
+    limits = PowerLimits(slow_bits, max_bits)
+    return limits
+
+
+def estimate_power_bits(base: Any, exponent: Any) -> float:
+    """
+    Estimates the size in bits of the exact result of `base ** exponent`, without
+    computing it (see the module docstring).
+
+    **Returns:**
+    - `float`: The estimated bits; 0.0 when the result is not exact (a float, or a
+      Decimal, whose size is bounded by its context) and so cheap whatever its size.
+    """
+    # Floats first: they are by far the most common operands.
+    if isinstance(base, float) or isinstance(exponent, float):
+        return 0.0
+    if not isinstance(base, Rational) or not isinstance(exponent, Rational) or exponent.denominator != 1:
+        return 0.0
+    if isinstance(base, Integral) and exponent < 0:
+        return 0.0  # int ** negative int is computed as a float.
+    numerator, denominator = abs(base.numerator), base.denominator
+    if numerator <= 1 and denominator == 1:
+        return 0.0  # 0, 1 (and -1) to any power stay that small.
+    # math.log2 works on integers of any size (a denominator of 1 adds nothing).
+    size = math.log2(numerator) + math.log2(denominator)
+    try:
+        return float(abs(exponent.numerator)) * size
+    except OverflowError:
+        return math.inf  # Far beyond any limit.
+
+
+def check_power(base: Any, exponent: Any) -> None:
+    """
+    Raises a ValueError if `base ** exponent` is estimated above `limits.max_bits`.
+    """
+    current = limits
+    started = time.perf_counter_ns()
+    bits = estimate_power_bits(base, exponent)
+    if bits > current.max_bits:
+        active = metrics.active
+        if active is not None:
+            active.record('guard', 'power rejected', time.perf_counter_ns() - started)
+        raise ValueError(f"Power result too large: about {bits:,.0f} bits (the limit is {current.max_bits:,.0f}).")
+
+
+def needs_slow_lane(calculation: Any) -> bool:
+    """
+    Returns whether a calculation should go to the slow lane: a `power` whose result is
+    estimated above `limits.slow_bits` (but not above `max_bits`, which is rejected anyway).
+    """
+    if getattr(calculation, 'operation_name', None) != 'power':
+        return False
+    current = limits
+    started = time.perf_counter_ns()
+    bits = estimate_power_bits(calculation.a, calculation.b)
+    if not current.slow_bits < bits <= current.max_bits:
+        return False
+    active = metrics.active
+    if active is not None:
+        active.record('guard', 'power slow lane', time.perf_counter_ns() - started)
+    return True
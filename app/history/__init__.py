@@ -0,0 +1,261 @@
+"""
+This module provides `History`, a compact store for the calculations performed in a session.
+
+A plain `List[Calculation]` keeps one full Python object per calculation, each with its
+own attribute dictionary. For long sessions that adds up quickly. `History` instead
+keeps the data in parallel columns:
+
+- `array.array('B')` holding a small operation code per calculation,
+- `array.array('d')` columns for the two operands, the result and the time it was appended.
+
+Each calculation then costs 33 bytes instead of a few hundred. `Calculation` objects
+are only created again ("materialized") when an entry is actually read, and they come
+back with their result already filled in, so reading the history never recomputes anything.
+
+`History` can also be bounded: with `maxlen` set it acts as a ring buffer that keeps
+only the most recent `maxlen` calculations.
+
+The float columns would round exact numbers (big integers, `Decimal`, `Fraction`; see
+`app.numeric`), so a history for another number type keeps its operands and results
+in plain lists instead, trading the compact storage for exactness.
+
+The few calculations with more than two operands (like `powmod`) keep their extra
+operands in a small dictionary next to the columns. So do the few entries with a value
+that is not a float, which a float column would round or refuse: the exact integer
+result of a `powmod`, a complex result (`power -8 0.5`), an integer too large for a
+float. Their values are kept as they are, with NaN in the columns.
+
+Every append also updates the history's running `aggregates` (count, sum, min, max,
+mean, variance; see `app.aggregates`), overall and per operation type, in O(1).
+
+`search()` finds calculations by operation type, result range and time through the
+indexes of `app.query`, which are built on the first search and kept up to date after that.
+"""
+
+import array
+import math
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
+
+from app.aggregates import Aggregates
+from app.calculation import Calculation, CalculationFactory
+
+if TYPE_CHECKING:  # pragma: no cover - the search indexes are only imported by the first search
+    from app.query import HistoryIndex, Query
+
+# The op-code column stores one unsigned byte per entry, so at most 256 operation types.
+MAX_OPERATION_TYPES = 256
+
+
+def registered_name(calculation_class: type) -> str:
+    """
+    Returns the name `calculation_class` is registered under in CalculationFactory
+    (e.g. 'add'), or its class name if it is not registered. The histories record
+    their entries' operations under this name (see also `app.persistence`).
+    """
+    for name, registered_class in CalculationFactory.registered_types().items():
+        if registered_class is calculation_class:
+            return name
+    return calculation_class.__name__
+
+
+class History:
+    """
+    A columnar, optionally bounded history of calculations.
+
+    **Usage:**
+    >>> history = History(maxlen=1000)
+    >>> history.append(CalculationFactory.create_calculation('add', 1.0, 2.0))
+    >>> history[0]
+    AddCalculation(a=1.0, b=2.0)
+    >>> history[0].execute()
+    3.0
+
+    It supports `len()`, indexing (including negative indexes), slicing (which returns
+    a list of Calculation objects) and iteration, so it can be used anywhere the old
+    list of calculations was used, such as `display_history`.
+
+    `history.aggregates` holds running statistics of every result appended since the
+    history was created or cleared, including entries a bounded history has since dropped.
+    """
+
+    def __init__(self, maxlen: Optional[int] = None, number_type: type = float) -> None:
+        """
+        **Parameters:**
+        - `maxlen (Optional[int])`: The maximum number of calculations to keep. When the
+          history is full, appending drops the oldest entry. `None` means unbounded.
+        - `number_type (type)`: The type of the operands and results. Anything other than
+          `float` is stored exactly, as Python objects.
+
+        **Raises:**
+        - `ValueError`: If `maxlen` is smaller than 1.
+        """
+        if maxlen is not None and maxlen < 1:
+            raise ValueError("maxlen must be at least 1.")
+        self.maxlen: Optional[int] = maxlen
+        self.number_type: type = number_type
+        self._op_codes = array.array('B')
+        # Lists support the same append and item assignment as arrays, so the rest of the
+        # class works with either kind of column.
+        column = (lambda: array.array('d')) if number_type is float else list
+        self._a = column()
+        self._b = column()
+        self._results = column()
+        self._times = array.array('d')
+        # Index of the oldest entry inside the columns; only moves once a bounded history is full.
+        self._start: int = 0
+        # How many calculations were ever appended; the next one gets this serial number.
+        self._serial: int = 0
+        # Operation code <-> Calculation class lookups.
+        self._classes: List[type] = []
+        self._codes: Dict[type, int] = {}
+        # Operation code -> the name its statistics are kept under in `aggregates`.
+        self._names: List[str] = []
+        # Column position -> operands beyond `a` and `b`, for calculations with an arity above 2.
+        self._extra: Dict[int, tuple] = {}
+        # Column position -> (a, b, result), for entries the float columns cannot hold.
+        self._objects: Dict[int, tuple] = {}
+        self.aggregates: Aggregates = Aggregates()
+        # Search indexes (see app.query), built by the first search.
+        self._index: Optional["HistoryIndex"] = None
+
+    def _code_for(self, calculation_class: type) -> int:
+        """Returns the operation code for `calculation_class`, assigning a new one the first time."""
+        code = self._codes.get(calculation_class)
+        if code is None:
+            if len(self._classes) >= MAX_OPERATION_TYPES:
+                raise ValueError(f"History supports at most {MAX_OPERATION_TYPES} operation types.")
+            code = len(self._classes)
+            self._classes.append(calculation_class)
+            self._codes[calculation_class] = code
+            self._names.append(registered_name(calculation_class))
+        return code
+
+    def append(self, calculation: Calculation, timestamp: Optional[float] = None) -> None:
+        """
+        Adds a calculation to the end of the history. Its result is stored with it
+        (using the result the calculation has already computed).
+
+        **Parameters:**
+        - `calculation (Calculation)`: The calculation to record.
+        - `timestamp (Optional[float])`: When it happened; defaults to now.
+
+        Everything is checked before any column changes, so an append that fails leaves
+        the history as it was.
+        """
+        code = self._code_for(type(calculation))
+        result = calculation.execute()
+        if timestamp is None:
+            timestamp = time.time()
+        a, b, stored = calculation.a, calculation.b, result
+        spilled = None
+        if self.number_type is float and not (type(a) is float and type(b) is float and type(result) is float):
+            # Anything but a float would come back changed (1 as 1.0, a big integer rounded)
+            # or not fit at all (a complex number), so it is kept as it is.
+            spilled = (a, b, result)
+            a = b = stored = math.nan
+        if self.maxlen is not None and len(self._op_codes) == self.maxlen:
+            # Full ring buffer: overwrite the oldest entry and move the start forward.
+            position = self._start
+            self._op_codes[position] = code
+            self._a[position] = a
+            self._b[position] = b
+            self._results[position] = stored
+            self._times[position] = timestamp
+            self._start = (position + 1) % self.maxlen
+        else:
+            position = len(self._op_codes)
+            self._op_codes.append(code)
+            self._a.append(a)
+            self._b.append(b)
+            self._results.append(stored)
+            self._times.append(timestamp)
+        if calculation.arity > 2:
+            self._extra[position] = calculation.operands[2:]
+        elif self._extra:
+            # The entry being overwritten may have had extra operands.
+            self._extra.pop(position, None)
+        if spilled is not None:
+            self._objects[position] = spilled
+        elif self._objects:
+            self._objects.pop(position, None)
+        self.aggregates.add(self._names[code], result)
+        if self._index is not None:
+            self._index.add(self._serial, self._names[code], result, timestamp)
+            self._index.prune(self._serial + 1 - len(self._op_codes))
+        self._serial += 1
+
+    def clear(self) -> None:
+        """Removes every calculation from the history."""
+        self.__init__(self.maxlen, self.number_type)
+
+    def _materialize(self, position: int) -> Calculation:
+        """Builds the Calculation stored at column `position`, with its result pre-filled."""
+        if position in self._objects:
+            a, b, result = self._objects[position]
+        else:
+            a, b, result = self._a[position], self._b[position], self._results[position]
+        calculation = self._classes[self._op_codes[position]](a, b, *self._extra.get(position, ()))
+        calculation.set_result(result)
+        return calculation
+
+    def _result(self, position: int) -> Any:
+        """Returns the result stored at column `position`."""
+        if position in self._objects:
+            return self._objects[position][2]
+        return self._results[position]
+
+    def search(self, query: "Query") -> List[int]:
+        """
+        Returns the indexes (0 = oldest) of the calculations matching `query`, oldest first.
+
+        **Example:**
+        >>> [history[i] for i in history.search(Query(operation='divide', min_result=1e6))]
+        """
+        first = self._serial - len(self)
+        if self._index is None:
+            from app.query import HistoryIndex
+            self._index = HistoryIndex()
+            for index in range(len(self)):
+                position = self._position(index)
+                self._index.add(first + index, self._names[self._op_codes[position]],
+                                self._result(position), self._times[position])
+        serials = self._index.search(query, first, self._serial,
+                                     lambda serial: self._times[self._position(serial - first)])
+        return [serial - first for serial in serials]
+
+    def timestamp(self, index: int) -> float:
+        """Returns when the calculation at `index` was appended (seconds since the epoch)."""
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("History index out of range.")
+        return self._times[self._position(index)]
+
+    def _position(self, index: int) -> int:
+        """Converts a logical index (0 = oldest) into a position in the columns."""
+        if self._start:
+            return (self._start + index) % self.maxlen
+        return index
+
+    def __len__(self) -> int:
+        return len(self._op_codes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Calculation, List[Calculation]]:
+        if isinstance(index, slice):
+            return [self._materialize(self._position(i)) for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("History index out of range.")
+        return self._materialize(self._position(index))
+
+    def __iter__(self) -> Iterator[Calculation]:
+        # Calculations are created one at a time as the caller asks for them.
+        for index in range(len(self)):
+            yield self._materialize(self._position(index))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(len={len(self)}, maxlen={self.maxlen})"
@@ -0,0 +1,235 @@
+"""
+This module provides opt-in instrumentation: call counts, error counts and latency
+histograms for the calculator's hot paths.
+
+When instrumentation is enabled (`enable()`, the REPL's `stats on` command or
+`python main.py --stats`), these are timed, per operation:
+
+- `create`: `CalculationFactory.create_calculation`, by calculation type ('add', ...).
+- `execute`: `Calculation.execute` when it actually computes a result, by class name.
+- `repl`: the REPL's handling of one input line, by command ('calculation', 'help', ...).
+
+When it is disabled (the default), the only cost on those paths is checking that the
+module's `active` attribute is `None`.
+
+**Latency Histograms:**
+Each latency is counted in a power-of-two bucket: bucket `i` holds latencies of at
+least `2**(i-1)` and less than `2**i` nanoseconds. Finding the bucket is a single
+`int.bit_length()`, so recording costs next to nothing, and percentiles can be read
+off the buckets with at most 2x error, which is plenty to see where time goes.
+
+**Usage:**
+>>> metrics = enable()
+>>> CalculationFactory.create_calculation('divide', 1.0, 0.0).execute()
+Traceback (most recent call last):
+    ...
+ZeroDivisionError: Cannot divide by zero.
+>>> metrics.snapshot()[1].errors
+{'ZeroDivisionError': 1}
+>>> disable()
+"""
+
+# The lock comes from _thread, like app.calculation's, so importing this module never imports threading.
+import _thread
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Number of histogram buckets. The last one also holds everything slower (over ~18 minutes).
+BUCKET_COUNT = 41
+
+
+class OperationSnapshot(NamedTuple):
+    """
+    A frozen copy of the statistics of one operation in one stage.
+
+    **Fields:**
+    - `stage`, `name`: What was timed, e.g. ('create', 'add').
+    - `calls`: How many times it ran (including the calls that raised).
+    - `errors`: Exception class name -> how many calls raised it.
+    - `total_ns`, `min_ns`, `max_ns`: Total, fastest and slowest latency in nanoseconds.
+    - `buckets`: The latency histogram (see the module docstring).
+    """
+    stage: str
+    name: str
+    calls: int
+    errors: Dict[str, int]
+    total_ns: int
+    min_ns: int
+    max_ns: int
+    buckets: Tuple[int, ...]
+
+    @property
+    def mean_ns(self) -> float:
+        """Average latency (0.0 before the first call)."""
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    def percentile_ns(self, percent: float) -> int:
+        """
+        Returns an upper bound for the `percent`-th percentile latency (e.g. 99 for p99):
+        the upper edge of the histogram bucket it falls in, but never more than `max_ns`.
+        """
+        wanted = self.calls * percent / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                if index == BUCKET_COUNT - 1:
+                    break  # The last bucket has no upper edge.
+                return min(1 << index, self.max_ns)
+        return self.max_ns
+
+
+class _OperationStats:
+    """The mutable counters behind an OperationSnapshot."""
+
+    __slots__ = ('calls', 'errors', 'total_ns', 'min_ns', 'max_ns', 'buckets')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKET_COUNT
+
+
+class Metrics:
+    """
+    Collects the statistics of every (stage, name) pair it is asked to record.
+
+    Recording takes a lock: with `--workers` (see `app.pool`) calculations are executed,
+    and so recorded, on several threads at once, and an unlocked `+=` could lose counts.
+    An uncontended lock costs far less than the call being timed.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[Tuple[str, str], _OperationStats] = {}
+        self._lock = _thread.allocate_lock()
+
+    def record(self, stage: str, name: str, elapsed_ns: int, error: Optional[str] = None) -> None:
+        """
+        Records one call.
+
+        **Parameters:**
+        - `stage (str)`, `name (str)`: What was timed.
+        - `elapsed_ns (int)`: How long it took, in nanoseconds.
+        - `error (Optional[str])`: The name of the exception it raised, if any.
+        """
+        with self._lock:
+            stats = self._stats.get((stage, name))
+            if stats is None:
+                stats = self._stats[(stage, name)] = _OperationStats()
+                stats.min_ns = elapsed_ns
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            if elapsed_ns < stats.min_ns:
+                stats.min_ns = elapsed_ns
+            if elapsed_ns > stats.max_ns:
+                stats.max_ns = elapsed_ns
+            stats.buckets[min(elapsed_ns.bit_length(), BUCKET_COUNT - 1)] += 1
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def time(self, stage: str, name: str, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Calls `function(*args)`, records how long it took (and the exception, if it raised
+        one, which is then re-raised), and returns its result.
+        """
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args)
+        except Exception as e:
+            self.record(stage, name, time.perf_counter_ns() - start, type(e).__name__)
+            raise
+        self.record(stage, name, time.perf_counter_ns() - start)
+        return result
+
+    def reset(self) -> None:
+        """Forgets everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> List[OperationSnapshot]:
+        """Returns a copy of the current statistics, sorted by stage and name."""
+        with self._lock:
+            return [
+                OperationSnapshot(stage, name, stats.calls, dict(stats.errors), stats.total_ns,
+                                  stats.min_ns, stats.max_ns, tuple(stats.buckets))
+                for (stage, name), stats in sorted(self._stats.items())
+            ]
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Returns the statistics as plain dictionaries and lists, ready for `json.dump`:
+        `{stage: {name: {calls, errors, total_ns, min_ns, max_ns, mean_ns, p50_ns, p99_ns,
+        buckets}}}`, where `buckets` maps each non-empty bucket's upper bound (in ns) to its count.
+        """
+        exported: Dict[str, Any] = {}
+        for snapshot in self.snapshot():
+            exported.setdefault(snapshot.stage, {})[snapshot.name] = {
+                'calls': snapshot.calls,
+                'errors': snapshot.errors,
+                'total_ns': snapshot.total_ns,
+                'min_ns': snapshot.min_ns,
+                'max_ns': snapshot.max_ns,
+                'mean_ns': snapshot.mean_ns,
+                'p50_ns': snapshot.percentile_ns(50),
+                'p99_ns': snapshot.percentile_ns(99),
+                'buckets': {str(1 << index): count for index, count in enumerate(snapshot.buckets) if count},
+            }
+        return exported
+
+    def format(self) -> str:
+        """Formats the statistics as the table shown by the REPL's `stats` command."""
+        snapshots = self.snapshot()
+        if not snapshots:
+            return "No statistics recorded yet."
+        lines = [f"{'stage':<8} {'operation':<22} {'calls':>8} {'errors':>7} "
+                 f"{'mean':>10} {'p50':>10} {'p99':>10} {'max':>10}"]
+        for snapshot in snapshots:
+            lines.append(
+                f"{snapshot.stage:<8} {snapshot.name:<22} {snapshot.calls:>8} {sum(snapshot.errors.values()):>7} "
+                f"{_format_ns(snapshot.mean_ns):>10} {_format_ns(snapshot.percentile_ns(50)):>10} "
+                f"{_format_ns(snapshot.percentile_ns(99)):>10} {_format_ns(snapshot.max_ns):>10}"
+            )
+            for error, count in sorted(snapshot.errors.items()):
+                lines.append(f"{'':<8}   {error}: {count}")
+        return '\n'.join(lines)
+
+
+def _format_ns(nanoseconds: float) -> str:
+    """Formats a latency with a readable unit, e.g. '850ns', '1.2µs', '3.4ms'."""
+    if nanoseconds < 1_000:
+        return f"{nanoseconds:.0f}ns"
+    if nanoseconds < 1_000_000:
+        return f"{nanoseconds / 1_000:.1f}µs"
+    if nanoseconds < 1_000_000_000:
+        return f"{nanoseconds / 1_000_000:.1f}ms"
+    return f"{nanoseconds / 1_000_000_000:.2f}s"
+
+
+# -----------------------------------------------------------------------------------
+# Switching Instrumentation On and Off
+# -----------------------------------------------------------------------------------
+
+# The Metrics currently being recorded into, or None when instrumentation is off.
+# The instrumented code reads this attribute on every call, so it is a plain module
+# attribute rather than anything more expensive to look up.
+active: Optional[Metrics] = None
+
+
+def enable(metrics: Optional[Metrics] = None) -> Metrics:
+    """
+    Turns instrumentation on, recording into `metrics` (a new Metrics by default),
+    and returns it. If it is already on, the current Metrics is kept and returned.
+    """
+    global active
+    if metrics is not None or active is None:
+        active = metrics if metrics is not None else Metrics()
+    return active
+
+
+def disable() -> None:
+    """Turns instrumentation off. What was recorded stays in the Metrics object."""
+    global active
+    active = None
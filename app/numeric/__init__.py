@@ -0,0 +1,171 @@
+"""
+This module provides the numeric backends: the kinds of number the calculator can
+calculate with.
+
+By default every operand is parsed with `float()`. Floats are fast, but they only hold
+about 16 significant digits, so large integers and decimal amounts like `0.1` are
+rounded before the calculation even starts. A backend decides how operands are
+converted, and so which number type the whole calculation runs on:
+
+  ==========  ====================  ==================================================
+  Name        Number type           Good for
+  ==========  ====================  ==================================================
+  `float`     `float`               Speed. The default.
+  `int`       `int`                 Exact integers of any size. Division still gives a
+                                    float (`7 / 2` is `3.5`).
+  `decimal`   `decimal.Decimal`     Money and other decimal amounts, rounded to the
+                                    precision of a configurable `decimal.Context`.
+  `fraction`  `fractions.Fraction`  Exact rational results, including division.
+  ==========  ====================  ==================================================
+
+**Usage:**
+>>> backend = get_backend('fraction')
+>>> calculation = CalculationFactory.create_calculation('divide', '1', '3', backend=backend)
+>>> backend.execute(calculation)
+Fraction(1, 3)
+
+The `Operation` methods and the Calculation classes accept any of these number types.
+Mixing types within one calculation follows Python's own rules (e.g. `Decimal` and
+`float` do not mix), which is why the backend converts both operands.
+"""
+
+import decimal
+import fractions
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Optional, Union
+
+
+class NumericBackend:
+    """
+    A numeric backend: a name, the number type it calculates with, and how to convert
+    operands (numbers or text typed by the user) to that type.
+
+    **Why a Class?**
+    - Every backend answers the same three questions (`convert`, `activate`, `execute`),
+      so the calculator can use any of them without knowing which one it has.
+    - Backends that need more (the `int` checks, the Decimal context) override just
+      the method that differs.
+    """
+
+    def __init__(self, name: str, number_type: type) -> None:
+        """
+        **Parameters:**
+        - `name (str)`: The name the backend is selected by (e.g. on the command line).
+        - `number_type (type)`: The type operands are converted to. By default `convert`
+          simply calls it, which works for `float` and `Fraction`.
+        """
+        self.name: str = name
+        self.number_type: type = number_type
+
+    def convert(self, value: Any) -> Any:
+        """
+        Converts a number or a string to this backend's number type.
+
+        **Raises:**
+        - `ValueError`: If `value` is not a valid number for this backend.
+        """
+        try:
+            return self.number_type(value)
+        except OverflowError as e:
+            # e.g. Fraction('inf'): there is no such number, so it is an invalid value.
+            raise ValueError(str(e)) from None
+
+    def activate(self) -> ContextManager:
+        """
+        Returns a context manager inside which arithmetic follows this backend's settings.
+        Only the Decimal backend has any; for the others it does nothing.
+        """
+        return nullcontext()
+
+    def execute(self, calculation) -> Any:
+        """Executes `calculation` with this backend's settings active and returns its result."""
+        with self.activate():
+            return calculation.execute()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r})"
+
+
+class IntegerBackend(NumericBackend):
+    """Exact integers of any size. Operands with a fractional part are rejected, not truncated."""
+
+    def __init__(self, name: str = 'int') -> None:
+        super().__init__(name, int)
+
+    def convert(self, value: Any) -> int:
+        integer = super().convert(value)
+        if integer != value and not isinstance(value, str):
+            raise ValueError(f"{value!r} is not an integer.")
+        return integer
+
+
+class DecimalBackend(NumericBackend):
+    """
+    Decimal arithmetic using a `decimal.Context`, which sets the precision (significant
+    digits) and rounding mode. Operands are rounded to the context when converted, and
+    results when calculated with `execute()` (or inside `activate()`).
+    """
+
+    def __init__(self, name: str = 'decimal', context: Optional[decimal.Context] = None) -> None:
+        """
+        **Parameters:**
+        - `context (Optional[decimal.Context])`: The precision and rounding to use.
+          Defaults to a copy of the `decimal` module's default context (28 digits).
+        """
+        super().__init__(name, decimal.Decimal)
+        self.context: decimal.Context = context if context is not None else decimal.Context()
+
+    def convert(self, value: Any) -> decimal.Decimal:
+        try:
+            return self.context.create_decimal(value)
+        except (decimal.InvalidOperation, TypeError):
+            # Decimal reports bad text as a decimal error; callers expect a ValueError,
+            # just like float() raises.
+            raise ValueError(f"could not convert to Decimal: {value!r}") from None
+
+    def activate(self) -> ContextManager:
+        return decimal.localcontext(self.context)
+
+
+# -----------------------------------------------------------------------------------
+# Backend Registry
+# -----------------------------------------------------------------------------------
+
+# The available backends by name, in the same spirit as CalculationFactory's registry.
+BACKENDS: Dict[str, NumericBackend] = {}
+
+
+def register_backend(backend: NumericBackend) -> NumericBackend:
+    """
+    Makes `backend` selectable by its name.
+
+    **Raises:**
+    - `ValueError`: If a backend with the same name is already registered.
+    """
+    name = backend.name.lower()
+    if name in BACKENDS:
+        raise ValueError(f"Numeric backend '{backend.name}' is already registered.")
+    BACKENDS[name] = backend
+    return backend
+
+
+def get_backend(backend: Union[str, NumericBackend]) -> NumericBackend:
+    """
+    Returns the backend registered under the name `backend` (or `backend` itself if it
+    already is a NumericBackend).
+
+    **Raises:**
+    - `ValueError`: If there is no backend with that name. The message lists the available ones.
+    """
+    if isinstance(backend, NumericBackend):
+        return backend
+    found = BACKENDS.get(backend.lower())
+    if found is None:
+        raise ValueError(f"Unsupported numeric backend: '{backend}'. Available backends: {', '.join(BACKENDS)}")
+    return found
+
+
+FLOAT = register_backend(NumericBackend('float', float))
+INTEGER = register_backend(IntegerBackend())
+DECIMAL = register_backend(DecimalBackend())
+FRACTION = register_backend(NumericBackend('fraction', fractions.Fraction))
@@ -1,5 +1,20 @@
 # operations.py
 
+# The abstract base classes of the numeric types. The type checks below accept the real
+# numbers of every backend (see app.numeric): int, float, fractions.Fraction (all
+# numbers.Real) and decimal.Decimal (a Number, but outside the Complex/Real tower),
+# without importing decimal. Complex numbers are still rejected.
+from numbers import Complex, Number, Real
+
+# The cost guardrails: a power whose exact result would be too large is rejected up front.
+from app.guardrails import check_power
+
+
+def _is_real(value) -> bool:
+    """Whether `value` is a real number: any `numbers.Real`, or a `Decimal`, but not a complex."""
+    return isinstance(value, Real) or (isinstance(value, Number) and not isinstance(value, Complex))
+
+
 class Operation:
     """
     The Operation class encapsulates basic arithmetic operations as static methods.
@@ -145,7 +160,8 @@ class Operation:
         - `float`: The result of `base` raised to the power of `exponent`.
 
         **Raises:**
-        - ValueError: If base is 0 and exponent is 0 (undefined)
+        - ValueError: If base is 0 and exponent is 0 (undefined), or the exact result
+          would be too large to compute (see app.guardrails)
         - TypeError: If inputs are not numeric types
 
         **Example:**
@@ -157,12 +173,15 @@ class Operation:
           without requiring an instance of the class. This reduces overhead and makes 
           the methods easily reusable in other parts of the program.
          """
-        if not isinstance(base, (int, float)) or not isinstance(exponent, (int, float)):
+        if not _is_real(base) or not _is_real(exponent):
          raise TypeError("Both base and exponent must be numeric types.")
     
         # Check for 0^0 which is mathematically undefined
         if base == 0.0 and exponent == 0.0:
          raise ValueError("0^0 is undefined.")
+        # Floats cost the same whatever their size; exact results are estimated first.
+        if type(base) is not float and type(exponent) is not float:
+            check_power(base, exponent)
         return base ** exponent
 
 
@@ -186,8 +205,58 @@ class Operation:
          >>> Operation.modulus(10.0, 3.0)
          1.0
          """
-        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        if not _is_real(a) or not _is_real(b):
           raise TypeError("Both operands must be numeric types.")
         if b == 0:
           raise ValueError("Modulus by zero is not allowed.")
-        return a % b
\ No newline at end of file
+        return a % b
+
+
+    @staticmethod
+    def powmod(base: int, exponent: int, modulus: int) -> int:
+        """
+        Raises base to the power of exponent, modulo modulus: `(base ** exponent) % modulus`,
+        computed without ever building the huge intermediate power.
+
+        **Parameters:**
+        - `base (int)`: The base number.
+        - `exponent (int)`: The exponent/power. A negative exponent uses the modular inverse of `base`.
+        - `modulus (int)`: The number to take the remainder by.
+
+        **Returns:**
+        - `int`: The remainder of `base` raised to `exponent`, divided by `modulus`.
+
+        **Raises:**
+        - ValueError: If `modulus` is zero, or the exponent is negative and `base` has no
+          inverse modulo `modulus`.
+        - TypeError: If an operand is not a whole number.
+
+        **Example:**
+        >>> Operation.powmod(4, 13, 497)
+        445
+
+        **Why Not `power` Followed by `modulus`?**
+        - `power(2, 10_000)` is a 3,000-digit number (or an overflow for floats) that
+          `modulus` then throws almost all of away. Python's three-argument `pow` reduces
+          after every step of the exponentiation, so the numbers never grow beyond the
+          modulus and the work grows with the number of digits of the exponent, not its size.
+        - Three-argument `pow` only works on integers, so whole-number floats (which is
+          what the REPL parses) are converted first, and anything else is rejected.
+        """
+        base, exponent, modulus = _as_integer(base), _as_integer(exponent), _as_integer(modulus)
+        if modulus == 0:
+            raise ValueError("Modulus by zero is not allowed.")
+        return pow(base, exponent, modulus)
+
+
+def _as_integer(value) -> int:
+    """Returns `value` as an int if it is a whole number (like `4` or `4.0`), else raises TypeError."""
+    if type(value) is int:
+        return value
+    try:
+        integer = int(value)
+    except (TypeError, ValueError, OverflowError):
+        integer = None
+    if integer is None or integer != value:
+        raise TypeError("powmod operands must be whole numbers.")
+    return integer
@@ -0,0 +1,185 @@
+"""
+This module evaluates large streams of calculations on several CPU cores at once.
+
+Python runs one thread of Python code at a time, so the REPL and batch mode only ever
+use one core. `evaluate_parallel` splits a stream of `(operation, a, b)` records into
+chunks and hands the chunks to a pool of worker *processes*, each with its own
+interpreter, so the work runs truly in parallel.
+
+**How It Works:**
+- The input is read lazily, a chunk at a time, and only a few chunks per worker are
+  in flight at once, so even an endless stream never has to fit in memory.
+- Each worker evaluates its chunk column by column with `CalculationFactory.evaluate_batch`.
+- The factory's registrations are sent to every worker when it starts, so operations
+  registered at runtime (not just the built-in ones) work in the workers too.
+- Results come back one `ChunkResult` per chunk, either in input order (`ordered=True`)
+  or as soon as each chunk finishes (`ordered=False`).
+"""
+
+import array
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.calculation import CalculationFactory
+
+# A single calculation to perform: (operation name, a, b).
+CalculationRecord = Tuple[str, float, float]
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class ChunkResult(NamedTuple):
+    """
+    The outcome of evaluating one chunk of records.
+
+    **Fields:**
+    - `index`: The chunk number (0 for the first chunk of the input, 1 for the next, ...).
+    - `start`: The row number of the chunk's first record within the whole input.
+    - `results`: One result per record, as an `array.array('d')`; failed rows hold `nan`.
+    - `errors`: `(row, message)` for every record that failed, where `row` is the
+      record's row number within the whole input.
+    """
+    index: int
+    start: int
+    results: array.array
+    errors: List[Tuple[int, str]]
+
+
+def error_message(operation: str, a: float, b: float) -> str:
+    """
+    Re-runs one failed record on its own to find out why it failed, for the error
+    reports of the batch evaluators (here and in `app.binary`).
+    """
+    try:
+        CalculationFactory.create_calculation(operation, a, b).execute()
+    except ZeroDivisionError:
+        return "Cannot divide by zero."
+    except Exception as e:
+        return str(e)
+    return "Calculation failed."  # pragma: no cover - only reachable if the row now succeeds
+
+
+def evaluate_chunk(index: int, start: int, records: List[CalculationRecord]) -> ChunkResult:
+    """
+    Evaluates one chunk of records. This is the function that runs inside the workers,
+    but it can be called directly as well.
+
+    Records are grouped by operation so each group is evaluated in one
+    `evaluate_batch` pass, then the results are put back in input order.
+    """
+    results = array.array('d', bytes(8 * len(records)))
+    errors: List[Tuple[int, str]] = []
+
+    groups: Dict[str, List[int]] = {}
+    for row, record in enumerate(records):
+        groups.setdefault(record[0], []).append(row)
+
+    for operation, rows in groups.items():
+        try:
+            batch = CalculationFactory.evaluate_batch(
+                operation, [records[row][1] for row in rows], [records[row][2] for row in rows]
+            )
+        except ValueError as e:
+            # Unsupported operation: every row of this group fails the same way.
+            for row in rows:
+                results[row] = float('nan')
+                errors.append((start + row, str(e)))
+            continue
+        for row, result, failed in zip(rows, batch.results, batch.errors):
+            results[row] = result
+            if failed:
+                _, a, b = records[row]
+                errors.append((start + row, error_message(operation, a, b)))
+
+    errors.sort()
+    return ChunkResult(index, start, results, errors)
+
+
+def _init_worker(registrations: Dict[str, type]) -> None:
+    """
+    Runs once in every worker process: registers any calculation types the parent
+    process has that the worker does not (e.g. ones registered at runtime).
+    """
+    registered = CalculationFactory.registered_types()
+    for name, calculation_class in registrations.items():
+        if name not in registered:
+            CalculationFactory.register_calculation(name)(calculation_class)
+
+
+def _chunked(records: Iterable[CalculationRecord], chunk_size: int) -> Iterator[List[CalculationRecord]]:
+    """Splits `records` into lists of at most `chunk_size` records, reading lazily."""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_parallel(
+    records: Iterable[CalculationRecord],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    ordered: bool = True,
+    executor: Optional[Executor] = None,
+) -> Iterator[ChunkResult]:
+    """
+    Evaluates a stream of `(operation, a, b)` records across several processes.
+
+    **Parameters:**
+    - `records`: Any iterable of `(operation, a, b)` tuples; it is consumed lazily.
+    - `chunk_size (int)`: How many records to send to a worker at a time. Bigger chunks
+      mean less communication overhead; smaller chunks spread the work more evenly.
+    - `max_workers (Optional[int])`: How many worker processes to start (default: one per CPU).
+    - `ordered (bool)`: Yield chunks in input order (`True`), or as soon as each finishes (`False`).
+    - `executor (Optional[Executor])`: Use this executor instead of starting a new process pool.
+
+    **Returns:**
+    - An iterator of `ChunkResult`, one per chunk.
+
+    **Example:**
+    >>> for chunk in evaluate_parallel([('add', 1.0, 2.0), ('divide', 1.0, 0.0)], max_workers=2):
+    ...     print(list(chunk.results), chunk.errors)
+    [3.0, nan] [(1, 'Cannot divide by zero.')]
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    workers = max_workers or os.cpu_count() or 1
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(CalculationFactory.registered_types(),),
+        )
+    # Keep a couple of chunks queued per worker so none of them sit idle, without
+    # reading the whole input up front.
+    max_in_flight = 2 * workers
+
+    try:
+        in_flight = deque()
+        start = 0
+        for index, chunk in enumerate(_chunked(records, chunk_size)):
+            in_flight.append(executor.submit(evaluate_chunk, index, start, chunk))
+            start += len(chunk)
+            while len(in_flight) >= max_in_flight:
+                yield from _collect(in_flight, ordered)
+        while in_flight:
+            yield from _collect(in_flight, ordered)
+    finally:
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def _collect(in_flight: deque, ordered: bool) -> Iterator[ChunkResult]:
+    """Waits for in-flight chunks and yields the next finished one(s)."""
+    if ordered:
+        yield in_flight.popleft().result()
+        return
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in done:
+        in_flight.remove(future)
+        yield future.result()
@@ -0,0 +1,327 @@
+"""
+This module provides `PersistentHistory`, a calculation history that lives on disk.
+
+The in-memory `History` disappears when the calculator exits. `PersistentHistory`
+instead appends every calculation to a file as a fixed-width binary record, so the
+history survives restarts and can grow far beyond what fits in memory.
+
+**File Layout:**
+- A 16-byte header: the magic bytes `CALCLOG1` followed by the record size.
+- Then one 40-byte record per calculation, in the order they were appended:
+
+  ======  =======  ==========================================
+  Offset  Type     Field
+  ======  =======  ==========================================
+  0       uint8    operation code (see the `.ops` file below)
+  1       7 bytes  padding, so the doubles are 8-byte aligned
+  8       float64  a (first operand)
+  16      float64  b (second operand)
+  24      float64  result
+  32      float64  timestamp (seconds since the epoch)
+  ======  =======  ==========================================
+
+- Operation codes are indexes into a small text file next to the log, `<path>.ops`,
+  holding one operation name per line (e.g. `add`). Codes never change once assigned.
+
+**Exact Numbers:**
+The fields are float64, so with an exact numeric backend (`--backend int`, `decimal` or
+`fraction`; see `app.numeric`) operands and results are stored rounded to the nearest
+float, and read back as floats. A value beyond the float range (`power 10 400` with
+integers) is rejected with a `ValueError`: the REPL still shows the result and reports
+that it was not added to the history.
+
+**Reading Without Copying:**
+Reads go through `mmap`, so the operating system pages the file in on demand and
+records are decoded straight out of the mapping with `struct`, without reading the
+whole file or creating a Python object per record. `view()` exposes the raw records
+as a `memoryview` for external tools; with NumPy for example:
+
+    >>> numpy.frombuffer(history.view(), dtype=RECORD_DTYPE)
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any, Iterator, List, NamedTuple, Optional, Union
+
+from app.aggregates import Aggregates
+from app.calculation import Calculation, CalculationFactory
+from app.history import registered_name
+
+if TYPE_CHECKING:  # pragma: no cover - the search indexes are only imported by the first search
+    from app.query import HistoryIndex, Query
+
+MAGIC = b'CALCLOG1'
+HEADER = struct.Struct('<8sI4x')
+RECORD = struct.Struct('<B7xdddd')
+RECORD_SIZE = RECORD.size
+
+# NumPy structured dtype description matching RECORD, for use with numpy.frombuffer.
+RECORD_DTYPE = {
+    'names': ['op', 'a', 'b', 'result', 'timestamp'],
+    'formats': ['u1', '<f8', '<f8', '<f8', '<f8'],
+    'offsets': [0, 8, 16, 24, 32],
+    'itemsize': RECORD_SIZE,
+}
+
+# The op-code field is one unsigned byte.
+MAX_OPERATION_TYPES = 256
+
+
+def _to_float(value: Any) -> float:
+    """
+    Converts an operand or result to the float64 a record stores. Exact numbers (big
+    integers, `Decimal`, `Fraction`; see `app.numeric`) are rounded to the nearest float.
+
+    **Raises:**
+    - `OverflowError`: If `value` is finite but beyond the float range (`float()` of such
+      a `Decimal` would quietly give inf).
+    - `TypeError`: If `value` is not a real number (e.g. complex).
+    """
+    converted = float(value)
+    if math.isinf(converted) and converted != value:
+        raise OverflowError(f"{value} is too large for a float")
+    return converted
+
+
+class HistoryRecord(NamedTuple):
+    """One decoded record of a persistent history."""
+    operation: str
+    a: float
+    b: float
+    result: float
+    timestamp: float
+
+
+class PersistentHistory:
+    """
+    An append-only calculation history stored in a binary file and read through `mmap`.
+
+    It supports the same operations as `History` (`append`, `len()`, indexing, slicing and
+    iteration, all yielding Calculation objects), so the REPL's `history` command works
+    with it unchanged. For large histories, `records()` and `view()` page through the raw
+    data without creating Calculation objects at all.
+
+    **Usage:**
+    >>> with PersistentHistory('calculations.log') as history:
+    ...     history.append(CalculationFactory.create_calculation('add', 1.0, 2.0))
+    ...     history.record(-1)
+    HistoryRecord(operation='add', a=1.0, b=2.0, result=3.0, timestamp=...)
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], autoflush: bool = False) -> None:
+        """
+        Opens the history file at `path`, creating it if it does not exist.
+
+        **Parameters:**
+        - `path`: The history file. The operation names are kept in `<path>.ops`.
+        - `autoflush (bool)`: Write each record to the file as soon as it is appended,
+          instead of buffering. Useful for interactive sessions.
+
+        **Raises:**
+        - `ValueError`: If the file exists but is not a calculation history.
+        """
+        self.path = os.fspath(path)
+        self._ops_path = self.path + '.ops'
+        self._file = open(self.path, 'a+b')
+        size = self._file.seek(0, os.SEEK_END)
+        if size == 0:
+            self._file.write(HEADER.pack(MAGIC, RECORD_SIZE))
+            self._file.flush()
+            size = HEADER.size
+        else:
+            self._file.seek(0)
+            magic, record_size = HEADER.unpack(self._file.read(HEADER.size))
+            if magic != MAGIC or record_size != RECORD_SIZE:
+                self._file.close()
+                raise ValueError(f"'{self.path}' is not a calculation history file.")
+        self._count: int = (size - HEADER.size) // RECORD_SIZE
+        if HEADER.size + self._count * RECORD_SIZE != size:
+            # A partial record left by an interrupted write would misalign every later
+            # record, so drop it.
+            self._file.truncate(HEADER.size + self._count * RECORD_SIZE)
+        self.autoflush: bool = autoflush
+
+        # Operation name table (code -> name) and its reverse.
+        self._names: List[str] = []
+        if os.path.exists(self._ops_path):
+            with open(self._ops_path, 'r', encoding='utf-8') as ops_file:
+                self._names = ops_file.read().split()
+        self._codes = {name: code for code, name in enumerate(self._names)}
+
+        # The read-only mapping is created lazily and re-created when the file has grown.
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_count: int = 0
+        # Running statistics; built from the file the first time they are asked for.
+        self._aggregates: Optional[Aggregates] = None
+        # Search indexes (see app.query), built from the file by the first search.
+        self._index: Optional["HistoryIndex"] = None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _new_code(self, name: str) -> int:
+        """Assigns the next operation code to `name` and records it in the `.ops` file."""
+        if len(self._names) >= MAX_OPERATION_TYPES:
+            raise ValueError(f"History supports at most {MAX_OPERATION_TYPES} operation types.")
+        code = len(self._names)
+        with open(self._ops_path, 'a', encoding='utf-8') as ops_file:
+            ops_file.write(name + '\n')
+        self._names.append(name)
+        self._codes[name] = code
+        return code
+
+    def append(self, calculation: Calculation, timestamp: Optional[float] = None) -> None:
+        """
+        Appends a calculation (and its result) to the end of the file.
+
+        **Parameters:**
+        - `calculation (Calculation)`: The calculation to record. Its class must be registered
+          with `CalculationFactory`, so it can be re-created when the history is read back.
+        - `timestamp (Optional[float])`: When it happened; defaults to now.
+
+        **Raises:**
+        - `ValueError`: If the calculation's class is not registered, it has more than two
+          operands (like `powmod`), which the fixed-width records have no room for, or a
+          value does not fit a float64 field (a complex result, say). Nothing is written then.
+        """
+        calculation_class = type(calculation)
+        if calculation.arity > 2:
+            raise ValueError(f"{calculation_class.__name__} has {calculation.arity} operands; "
+                             "the history file only stores two.")
+        name = registered_name(calculation_class)
+        if CalculationFactory.registered_types().get(name) is not calculation_class:
+            raise ValueError(f"{calculation_class.__name__} is not registered with CalculationFactory.")
+        result = calculation.execute()
+        if timestamp is None:
+            timestamp = time.time()
+        # Packed before anything is written, so a value the record cannot hold leaves the
+        # file (and the `.ops` table) as it was.
+        a, b, stored = calculation.a, calculation.b, result
+        code = self._codes.get(name)
+        try:
+            if not (type(a) is float and type(b) is float and type(stored) is float):
+                a, b, stored = _to_float(a), _to_float(b), _to_float(stored)
+            record = RECORD.pack(0 if code is None else code, a, b, stored, timestamp)
+        except (struct.error, OverflowError, TypeError) as e:
+            raise ValueError(f"The history file cannot store {calculation!r}: {e}") from None
+        if code is None:
+            # A new operation: its name is only recorded once the record is known to be valid.
+            record = RECORD.pack(self._new_code(name), a, b, stored, timestamp)
+        self._file.write(record)
+        # The index and statistics see what the file holds, just as when rebuilt from it.
+        if self._index is not None:
+            self._index.add(self._count, name, stored, timestamp)
+        self._count += 1
+        if self._aggregates is not None:
+            self._aggregates.add(name, stored)
+        if self.autoflush:
+            self._file.flush()
+
+    def flush(self) -> None:
+        """Writes any buffered records to the file."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flushes and closes the file. The history cannot be used afterwards."""
+        self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "PersistentHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _mapping(self) -> mmap.mmap:
+        """Returns a read-only mapping that covers every record appended so far."""
+        if self._mmap is None or self._mapped_count != self._count:
+            self._file.flush()
+            # The old mapping is not closed explicitly: views handed out by view() may still
+            # point into it, and it is released once the last of them is gone.
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_count = self._count
+        return self._mmap
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> memoryview:
+        """
+        Returns the raw bytes of records `start` to `stop` as a zero-copy `memoryview`
+        (see `RECORD` / `RECORD_DTYPE` for the layout).
+        """
+        start, stop, _ = slice(start, stop).indices(self._count)
+        stop = max(start, stop)
+        return memoryview(self._mapping())[HEADER.size + start * RECORD_SIZE:HEADER.size + stop * RECORD_SIZE]
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[HistoryRecord]:
+        """
+        Yields the decoded records from `start` to `stop` (like a slice), straight from the mapping.
+        """
+        names = self._names
+        for code, a, b, result, timestamp in RECORD.iter_unpack(self.view(start, stop)):
+            yield HistoryRecord(names[code], a, b, result, timestamp)
+
+    def record(self, index: int) -> HistoryRecord:
+        """Returns the decoded record at `index` (negative indexes count from the end)."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("History index out of range.")
+        code, a, b, result, timestamp = RECORD.unpack_from(self._mapping(), HEADER.size + index * RECORD_SIZE)
+        return HistoryRecord(self._names[code], a, b, result, timestamp)
+
+    @property
+    def aggregates(self) -> Aggregates:
+        """
+        Running statistics of every result in the file (see `app.aggregates`). The first
+        access reads the file once; after that each append updates them in O(1).
+        """
+        if self._aggregates is None:
+            aggregates = Aggregates()
+            for record in self.records():
+                aggregates.add(record.operation, record.result)
+            self._aggregates = aggregates
+        return self._aggregates
+
+    def search(self, query: "Query") -> List[int]:
+        """
+        Returns the indexes of the records matching `query`, oldest first (see `app.query`).
+        The first search reads the file once to build the indexes.
+        """
+        if self._index is None:
+            from app.query import HistoryIndex
+            self._index = HistoryIndex()
+            for serial, record in enumerate(self.records()):
+                self._index.add(serial, record.operation, record.result, record.timestamp)
+        return self._index.search(query, 0, self._count, lambda serial: self.record(serial).timestamp)
+
+    @staticmethod
+    def _materialize(record: HistoryRecord) -> Calculation:
+        """Re-creates the Calculation for `record`, with its stored result pre-filled."""
+        calculation = CalculationFactory.get_calculation_class(record.operation)(record.a, record.b)
+        calculation.set_result(record.result)
+        return calculation
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Calculation, List[Calculation]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                return [self._materialize(record) for record in self.records(start, stop)]
+            return [self._materialize(self.record(i)) for i in range(start, stop, step)]
+        return self._materialize(self.record(index))
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for record in self.records():
+            yield self._materialize(record)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, len={self._count})"
@@ -0,0 +1,358 @@
+"""
+This module runs the REPL's calculations in the background, so a slow one (a `power`
+with a huge exponent, say) no longer holds up the prompt.
+
+`CalculationPool.submit` hands a calculation to a worker and returns at once with a
+ticket number (printed as `[3] Started.`). When the calculation finishes, its result
+(or error) is printed with that ticket number, e.g. `[3] Result: ...`.
+
+**Two Lanes:**
+- Most calculations run on a pool of worker threads. Starting one costs next to
+  nothing, and `app.guardrails` has estimated them as cheap.
+- A `power` estimated to be expensive (see `app.guardrails`) runs in the slow lane
+  instead: in a child process of its own, one at a time. A single huge `int ** int` is
+  one step of the interpreter, so on a thread it would hold the GIL, and with it the
+  prompt, until it finished; in a process it only keeps that process busy.
+
+**Timeouts and Cancellation:**
+- With a `timeout`, a calculation still running after that many seconds is reported
+  as timed out. `cancel()` does the same for one or all of the outstanding calculations.
+  One that has not started yet never runs at all.
+- A slow-lane calculation is stopped by killing its process. Python cannot stop a
+  thread in the middle of a computation, so a calculation given up on in a worker
+  thread keeps it busy until it finishes by itself, and its result is thrown away.
+
+The worker threads are daemon threads and the slow-lane processes are daemon processes,
+so neither keeps the calculator from exiting.
+
+**History Order:**
+Results are printed as soon as they complete, which may be out of order, but they are
+added to the history in the order the calculations were submitted: a finished result
+waits until every calculation submitted before it has finished, failed or been given up on.
+Use `lock` around anything that reads the history while calculations are running.
+"""
+
+import operator
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from app.calculation import Calculation
+from app.guardrails import needs_slow_lane
+
+# How many worker threads a pool starts by default.
+DEFAULT_WORKERS = 4
+
+
+class WorkerThreads:
+    """
+    A minimal thread pool with daemon worker threads. Unlike
+    `concurrent.futures.ThreadPoolExecutor`, whose threads are joined when the
+    interpreter exits, a runaway calculation on one of these never blocks exiting.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._threads = [threading.Thread(target=self._work, name=f"calculation-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self) -> None:
+        """The loop of one worker thread: run jobs until told to stop (with `None`)."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run(*job)
+
+    def _run(self, future: Future, function: Callable[..., Any], args: tuple) -> None:
+        """Runs one job on this worker thread, unless it was cancelled before it started."""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        """Queues `function(*args)` for a worker and returns its Future."""
+        future: Future = Future()
+        self._queue.put((future, function, args))
+        return future
+
+    def shutdown(self) -> None:
+        """Tells the workers to stop once they have finished the jobs already queued."""
+        for _ in self._threads:
+            self._queue.put(None)
+
+
+def _run_in_child(connection, function: Callable[..., Any], args: tuple) -> None:
+    """
+    The body of a slow-lane process: runs `function(*args)` and sends back
+    `(True, result)`, or `(False, exception)` if it raised.
+    """
+    try:
+        outcome = (True, function(*args))
+    except Exception as e:
+        outcome = (False, e)
+    try:
+        connection.send(outcome)
+    except Exception as e:
+        # e.g. an exception that cannot be pickled: send its description instead.
+        connection.send((False, RuntimeError(f"{outcome[1]!r} could not be sent back: {e}")))
+    connection.close()
+
+
+class WorkerProcesses(WorkerThreads):
+    """
+    Runs each job in a child process of its own, started by one of the worker threads,
+    so that a running job can be stopped with `kill()`.
+
+    Where it can, the child is forked, so it starts with this process's state (the
+    registered calculations, the guardrail limits, ...) and nothing is pickled but the
+    result. Elsewhere (Windows), the job's function and arguments must be picklable.
+    """
+
+    def __init__(self, workers: int = 1) -> None:
+        # Imported here so multiprocessing is only loaded once a job needs a process.
+        import multiprocessing
+
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        self._context = multiprocessing.get_context(start_method)
+        # Guards _processes, so a job is never killed between starting and being listed.
+        self._lock = threading.Lock()
+        self._processes: Dict[Future, Any] = {}
+        super().__init__(workers)
+
+    def _run(self, future: Future, function: Callable[..., Any], args: tuple) -> None:
+        """Runs one job in a new child process and waits for its outcome."""
+        reader, writer = self._context.Pipe(duplex=False)
+        with self._lock:
+            if not future.set_running_or_notify_cancel():
+                reader.close()
+                writer.close()
+                return
+            process = self._context.Process(target=_run_in_child, args=(writer, function, args),
+                                            name="calculation", daemon=True)
+            process.start()
+            self._processes[future] = process
+        # The child has its own copy; closing ours makes recv() fail once the child is gone.
+        writer.close()
+        try:
+            outcome = reader.recv()
+        except EOFError:
+            outcome = None
+        finally:
+            reader.close()
+        process.join()
+        with self._lock:
+            self._processes.pop(future, None)
+        if outcome is None:
+            future.set_exception(RuntimeError(f"The worker process stopped with exit code {process.exitcode}."))
+        elif outcome[0]:
+            future.set_result(outcome[1])
+        else:
+            future.set_exception(outcome[1])
+
+    def kill(self, future: Future) -> bool:
+        """
+        Stops the job of `future`: cancels it if it has not started yet, and kills its
+        process if it is running.
+
+        **Returns:**
+        - `bool`: Whether the job was stopped (False if it had already finished).
+        """
+        if future.cancel():
+            return True
+        with self._lock:
+            process = self._processes.pop(future, None)
+            if process is None:
+                return False
+            process.kill()
+            return True
+
+
+class Job(NamedTuple):
+    """A calculation that has been submitted and has not finished yet."""
+    ticket: int
+    calculation: Calculation
+    submitted: float
+    future: Future
+    timer: Optional[threading.Timer]
+    executor: Any
+
+
+class CalculationPool:
+    """
+    Runs calculations on worker threads, and expensive ones in slow-lane processes, and
+    records their results in a history (see the module docstring).
+
+    **Usage:**
+    >>> pool = CalculationPool(history, workers=4, timeout=10.0)
+    >>> pool.submit(CalculationFactory.create_calculation('power', 2.0, 10.0))
+    [1] Started.
+    1
+    [1] Result: PowerCalculation: 2.0 Power 10.0 = 1024.0
+    """
+
+    def __init__(self, history, workers: int = DEFAULT_WORKERS, timeout: Optional[float] = None,
+                 execute: Callable[[Calculation], Any] = operator.methodcaller("execute"),
+                 output: Callable[[str], Any] = print, executor=None, slow_lane=None) -> None:
+        """
+        **Parameters:**
+        - `history`: Where to append the successful calculations (a `History`, ...).
+        - `workers (int)`: How many worker threads to start.
+        - `timeout (Optional[float])`: Give up on a calculation after this many seconds.
+        - `execute`: Runs one calculation and returns its result (e.g. a numeric backend's `execute`).
+        - `output`: Where to send the messages about finished calculations.
+        - `executor`: Run the calculations with this (anything with a `submit` method
+          returning a Future) instead of starting worker threads.
+        - `slow_lane`: Run the expensive ones with this; by default with `WorkerProcesses`,
+          started when the first of them arrives.
+
+        **Raises:**
+        - `ValueError`: If `workers` is smaller than 1 or `timeout` is not positive.
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive.")
+        self.history = history
+        self.timeout = timeout
+        self._execute = execute
+        self._output = output
+        self._executor = executor if executor is not None else WorkerThreads(workers)
+        self._slow_lane = slow_lane
+        # Guards everything below, and the history: hold it while reading the history.
+        self.lock = threading.RLock()
+        self._jobs: Dict[int, Job] = {}
+        self._next_ticket = 1
+        # Finished calculations waiting for their turn to be added to the history
+        # (None for the ones that failed), and the ticket whose turn it is.
+        self._finished: Dict[int, Optional[Calculation]] = {}
+        self._next_to_record = 1
+        self._idle = threading.Condition(self.lock)
+
+    def submit(self, calculation: Calculation) -> int:
+        """Starts a calculation and returns its ticket number."""
+        with self.lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            executor = self._executor
+            lane = ""
+            if needs_slow_lane(calculation):
+                if self._slow_lane is None:
+                    self._slow_lane = WorkerProcesses(1)
+                executor, lane = self._slow_lane, " in the slow lane"
+            # Announced first, so it is never printed after the result.
+            self._output(f"[{ticket}] Started{lane}.\n")
+            timer = None
+            if self.timeout is not None:
+                timer = threading.Timer(self.timeout, self._give_up, (ticket, f"Timed out after {self.timeout:g}s."))
+                timer.daemon = True
+            future = executor.submit(self._execute, calculation)
+            self._jobs[ticket] = Job(ticket, calculation, time.monotonic(), future, timer, executor)
+            if timer is not None:
+                timer.start()
+        # Outside the lock: with an executor that has already finished the calculation,
+        # the callback runs right here.
+        future.add_done_callback(lambda future: self._completed(ticket, future))
+        return ticket
+
+    def _completed(self, ticket: int, future: Future) -> None:
+        """Called (on the worker thread) when a calculation's Future is done."""
+        with self.lock:
+            job = self._jobs.get(ticket)
+            if job is None or future.cancelled():
+                return  # Already given up on, and reported.
+            # EAFP: the Future re-raises whatever the calculation raised.
+            try:
+                result = future.result()
+            except ZeroDivisionError:
+                self._finish(job, None, "Cannot divide by zero.")
+            except Exception as e:
+                self._finish(job, None, f"An error occurred during calculation: {e}")
+            else:
+                # Computed in another process, maybe: keep the result so that showing and
+                # recording the calculation does not compute it all over again here.
+                job.calculation.set_result(result)
+                self._finish(job, job.calculation, f"Result: {job.calculation}")
+
+    def _give_up(self, ticket: int, message: str) -> None:
+        """Reports a calculation as timed out or cancelled, and ignores its result from now on."""
+        with self.lock:
+            job = self._jobs.get(ticket)
+            if job is not None:
+                # A job in a worker process is stopped; one on a worker thread can only be
+                # cancelled if it has not started yet.
+                if isinstance(job.executor, WorkerProcesses):
+                    job.executor.kill(job.future)
+                else:
+                    job.future.cancel()
+                self._finish(job, None, message)
+
+    def _finish(self, job: Job, calculation: Optional[Calculation], message: str) -> None:
+        """Reports a finished job and adds whatever is now in turn to the history. Holds the lock."""
+        del self._jobs[job.ticket]
+        if job.timer is not None:
+            job.timer.cancel()
+        self._output(f"[{job.ticket}] {message}\n")
+        self._finished[job.ticket] = calculation
+        while self._next_to_record in self._finished:
+            finished = self._finished.pop(self._next_to_record)
+            # EAFP: e.g. the history file cannot store a three-operand powmod. Whatever
+            # goes wrong, it is reported and the next ticket still gets its turn; an
+            # exception here would otherwise end up in the Future's callback, stop every
+            # later result from being recorded and keep `wait()` waiting forever.
+            try:
+                if finished is not None:
+                    self.history.append(finished)
+            except Exception as e:
+                self._output(f"[{self._next_to_record}] Not added to the history: {e}\n")
+            finally:
+                self._next_to_record += 1
+        if not self._jobs:
+            self._idle.notify_all()
+
+    def cancel(self, ticket: Optional[int] = None) -> List[int]:
+        """
+        Gives up on the calculation with `ticket`, or on all of them when it is `None`.
+
+        **Returns:**
+        - The tickets that were cancelled (empty if there was nothing to cancel).
+        """
+        with self.lock:
+            if ticket is None:
+                tickets = list(self._jobs)
+            else:
+                tickets = [ticket] if ticket in self._jobs else []
+            for cancelled in tickets:
+                self._give_up(cancelled, "Cancelled.")
+            return tickets
+
+    def jobs(self) -> List[str]:
+        """Describes the calculations still running, oldest first."""
+        with self.lock:
+            now = time.monotonic()
+            return [f"[{job.ticket}] {job.calculation!r}, running for {now - job.submitted:.1f}s"
+                    for job in self._jobs.values()]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every submitted calculation has finished (or been given up on).
+
+        **Returns:**
+        - `bool`: Whether everything finished within `timeout` seconds.
+        """
+        with self.lock:
+            return self._idle.wait_for(lambda: not self._jobs, timeout)
+
+    def shutdown(self) -> None:
+        """Cancels whatever is still outstanding and stops the worker threads and processes."""
+        self.cancel()
+        for executor in (self._executor, self._slow_lane):
+            if isinstance(executor, WorkerThreads):
+                executor.shutdown()
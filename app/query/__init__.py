@@ -0,0 +1,211 @@
+"""
+This module answers queries over a calculation history, like "all divides with a result
+above 1e6" or "the last 100 power operations", using secondary indexes instead of
+scanning (and materializing) every entry.
+
+**Indexes:**
+`HistoryIndex` identifies entries by their serial number (0 for the first calculation
+ever appended, counting on across a bounded history's dropped entries) and keeps:
+- by operation: each operation's serials, in append order, so "the last N of an
+  operation" is a slice off the end;
+- by result: each operation's results in sorted order (with their serials), so a
+  result range is two `bisect` calls per operation;
+- by time: nothing extra. Timestamps are appended in order, so a time window is found
+  by bisecting the history's own timestamp column (falling back to checking every
+  candidate if the clock ever went backwards).
+
+The index is only built the first time a history is queried; after that each append
+updates it in O(log n) (inserting a result into a sorted list moves memory, but no objects).
+
+**Query Syntax (the REPL's `find` command):**
+    find divide result>1e6
+    find power last 100
+    find result>=10 result<20 since 5m
+"""
+
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# The usage shown when a query cannot be parsed.
+QUERY_USAGE = "Usage: find [<operation>] [result<op><number>]... [last <N>] [since <N>[s|m|h|d]]"
+
+# Seconds per unit of the `since` filter.
+TIME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_COMPARISON = re.compile(r'\s*(>=|<=|>|<|=)\s*')
+
+
+class Query(NamedTuple):
+    """
+    The filters of one history query. Every filter is optional; matches are returned
+    oldest first.
+
+    **Fields:**
+    - `operation`: Only calculations of this type (e.g. 'divide').
+    - `min_result`, `max_result`: Only results in this range; `include_min` and
+      `include_max` say whether the bounds themselves match.
+    - `since`, `until`: Only calculations appended at or after `since` and before `until`
+      (seconds since the epoch).
+    - `last`: Only the most recent `last` matches.
+    """
+    operation: Optional[str] = None
+    min_result: Any = None
+    max_result: Any = None
+    include_min: bool = True
+    include_max: bool = True
+    since: Optional[float] = None
+    until: Optional[float] = None
+    last: Optional[int] = None
+
+
+def parse_query(text: str, now: Optional[float] = None) -> Query:
+    """
+    Parses the arguments of the `find` command into a Query.
+
+    **Parameters:**
+    - `text (str)`: E.g. "divide result>1e6 last 10".
+    - `now (Optional[float])`: The time `since` counts back from; defaults to now.
+
+    **Raises:**
+    - `ValueError`: If the text is not a valid query.
+    """
+    fields: Dict[str, Any] = {}
+    tokens = _COMPARISON.sub(r'\1', text.lower()).split()
+    position = 0
+    try:
+        while position < len(tokens):
+            token = tokens[position]
+            if token.startswith('result'):
+                comparison = _COMPARISON.match(token, len('result'))
+                value = float(token[comparison.end():])
+                operator = comparison.group(1)
+                if operator in ('>', '>=', '='):
+                    fields['min_result'], fields['include_min'] = value, operator != '>'
+                if operator in ('<', '<=', '='):
+                    fields['max_result'], fields['include_max'] = value, operator != '<'
+            elif token == 'last':
+                position += 1
+                fields['last'] = int(tokens[position])
+                if fields['last'] < 1:
+                    raise ValueError
+            elif token == 'since':
+                position += 1
+                amount = tokens[position]
+                unit = TIME_UNITS.get(amount[-1])
+                seconds = float(amount[:-1]) * unit if unit else float(amount)
+                fields['since'] = (time.time() if now is None else now) - seconds
+            elif 'operation' not in fields:
+                fields['operation'] = token
+            else:
+                raise ValueError
+            position += 1
+    except (ValueError, IndexError, AttributeError):
+        raise ValueError(QUERY_USAGE) from None
+    return Query(**fields)
+
+
+class HistoryIndex:
+    """
+    Secondary indexes over the entries of a history (see the module docstring).
+
+    The history feeds every entry to `add`, and passes the range of serials it still
+    holds to `search`, so entries a bounded history has dropped are never returned.
+    """
+
+    def __init__(self) -> None:
+        # Operation name -> serials, in append order.
+        self._by_operation: Dict[str, array] = {}
+        # Operation name -> (results in ascending order, the serial of each).
+        self._by_result: Dict[str, Tuple[List[Any], List[int]]] = {}
+        # Whether timestamps have only ever gone forward, so time windows can be bisected.
+        self._time_ordered: bool = True
+        self._last_timestamp: float = float('-inf')
+        # Serials below this have been removed from the indexes.
+        self._pruned_below: int = 0
+        self._size: int = 0
+
+    def add(self, serial: int, operation: str, result: Any, timestamp: float) -> None:
+        """Indexes one entry. Serials must be added in increasing order."""
+        serials = self._by_operation.get(operation)
+        if serials is None:
+            serials = self._by_operation[operation] = array('q')
+            self._by_result[operation] = ([], [])
+        serials.append(serial)
+        # NaN has no place in a sorted order (and never matches a range), nor has a complex number.
+        if result == result and not isinstance(result, complex):
+            results, result_serials = self._by_result[operation]
+            position = bisect_right(results, result)
+            results.insert(position, result)
+            result_serials.insert(position, serial)
+        if timestamp < self._last_timestamp:
+            self._time_ordered = False
+        self._last_timestamp = timestamp
+        self._size += 1
+
+    def prune(self, first: int) -> None:
+        """
+        Removes the entries with serials below `first` (dropped from the history), once
+        they outnumber the live entries, so pruning costs O(1) per append on average.
+        """
+        dropped = first - self._pruned_below
+        if dropped <= self._size - dropped:
+            return
+        for operation, serials in self._by_operation.items():
+            del serials[:bisect_left(serials, first)]
+            results, result_serials = self._by_result[operation]
+            kept = [(result, serial) for result, serial in zip(results, result_serials) if serial >= first]
+            results[:] = [result for result, _ in kept]
+            result_serials[:] = [serial for _, serial in kept]
+        self._pruned_below = first
+        self._size -= dropped
+
+    def search(self, query: Query, first: int, stop: int, time_of: Callable[[int], float]) -> List[int]:
+        """
+        Returns the serials (between `first` and `stop`, the range the history still
+        holds) of the entries matching `query`, oldest first.
+
+        **Parameters:**
+        - `time_of (Callable[[int], float])`: Returns the timestamp of a serial.
+        """
+        operations = list(self._by_operation) if query.operation is None else [query.operation]
+        candidates: Sequence[int]
+        if query.min_result is not None or query.max_result is not None:
+            matches: List[int] = []
+            for operation in operations:
+                results, serials = self._by_result.get(operation, ([], []))
+                low, high = 0, len(results)
+                if query.min_result is not None:
+                    low = (bisect_left if query.include_min else bisect_right)(results, query.min_result)
+                if query.max_result is not None:
+                    high = (bisect_right if query.include_max else bisect_left)(results, query.max_result)
+                matches.extend(serial for serial in serials[low:high] if serial >= first)
+            matches.sort()
+            candidates = matches
+        elif query.operation is not None:
+            candidates = self._by_operation.get(query.operation, array('q'))
+        else:
+            candidates = range(first, stop)
+
+        # Narrow down to [low, high) positions of `candidates`, without copying it yet.
+        low, high = bisect_left(candidates, first), len(candidates)
+        if query.since is not None or query.until is not None:
+            if self._time_ordered:
+                # The first serial appended at or after a given time, found by bisecting the timestamps.
+                alive = range(first, stop)
+                def first_serial_at(moment: float) -> int:
+                    return first + bisect_left(alive, moment, key=time_of)
+                if query.since is not None:
+                    low = max(low, bisect_left(candidates, first_serial_at(query.since)))
+                if query.until is not None:
+                    high = min(high, bisect_left(candidates, first_serial_at(query.until)))
+            else:
+                candidates = [serial for serial in candidates[low:high]
+                              if (query.since is None or time_of(serial) >= query.since)
+                              and (query.until is None or time_of(serial) < query.until)]
+                low, high = 0, len(candidates)
+        if query.last is not None:
+            low = max(low, high - query.last)
+        return list(candidates[low:high])
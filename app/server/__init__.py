@@ -0,0 +1,197 @@
+"""
+This module serves the calculator over the network with asyncio.
+
+Clients connect over TCP (or a Unix socket) and send the same lines they would type
+into the REPL: `<operation> <num1> <num2>`, `history`, `summary`, `find <query>`,
+`eval <expression>`, `stats`, `help` and `exit`. Every connection gets its own history,
+just like its own REPL session would.
+
+**Why asyncio?**
+A single event loop serves thousands of concurrent connections without a thread or
+process per client: while one connection waits for its next line, the loop handles the
+others. Calculations themselves are quick, so they run directly on the loop.
+
+**Protocol:**
+- Requests are lines of UTF-8 text.
+- Every non-blank request gets exactly one response: one or more lines followed by an
+  empty line, so a client can tell where a multi-line response (like `history`) ends.
+  Blank request lines are ignored, as in the REPL.
+- Requests may be pipelined: a client can send many lines without waiting, and the
+  responses come back in the same order.
+- `exit` is answered with `Goodbye!` and the server closes the connection.
+
+**Usage:**
+    python main.py --serve 127.0.0.1:8765
+    python main.py --unix-socket /tmp/calculator.sock
+"""
+
+import asyncio
+import functools
+from typing import Optional
+
+from app.batch import INVALID_FORMAT_MESSAGE
+from app.cache import ParseCache
+from app.calculation import CalculationFactory
+from app.calculator import HELP_MESSAGE, find_lines, history_pages, history_range, stats_command
+from app.history import History
+
+# Longest request line accepted, in bytes.
+MAX_LINE_LENGTH = 64 * 1024
+
+# Operand token -> float, shared by every connection (they all run on the one event loop).
+OPERAND_CACHE = ParseCache(float)
+
+
+def respond(line: str, history: History) -> Optional[str]:
+    """
+    Handles one request line and returns the response text (without the trailing blank
+    line), or `None` for a blank line. Successful calculations are added to `history`.
+
+    The `exit` command is handled by the connection, not here.
+    """
+    text = line.strip()
+    if not text:
+        return None
+    command = text.lower()
+
+    if command == "help":
+        return HELP_MESSAGE.strip("\n")
+    if command == "history" or command.startswith("history "):
+        try:
+            start, stop = history_range(command[len("history"):], len(history))
+        except ValueError as e:
+            return str(e)
+        return "".join(history_pages(history, start, stop)).rstrip("\n")
+    if command == "summary":
+        return "\n".join(history.aggregates.lines())
+    if command == "find" or command.startswith("find "):
+        return "\n".join(find_lines(history, command[len("find"):]))
+    if command.startswith("eval "):
+        return _evaluate_expression(text[len("eval "):])
+    if command == "stats" or command.startswith("stats "):
+        # The statistics are process-wide, so every client sees (and switches) the same ones.
+        return stats_command(command[len("stats"):], OPERAND_CACHE)
+
+    # EAFP: try to parse and calculate, and turn each kind of failure into its message.
+    parse = OPERAND_CACHE.parse
+    try:
+        operation, num1_str, num2_str, *more_strs = text.split()
+        num1 = parse(num1_str)
+        num2 = parse(num2_str)
+        more = [parse(operand_str) for operand_str in more_strs]
+    except ValueError:
+        return INVALID_FORMAT_MESSAGE
+    try:
+        calculation = CalculationFactory.create_calculation(operation, num1, num2, *more)
+    except ValueError as e:
+        return str(e)
+    try:
+        calculation.execute()
+    except ZeroDivisionError:
+        return "Cannot divide by zero."
+    except Exception as e:
+        return f"An error occurred during calculation: {e}"
+    # EAFP, as in the REPL: the result is still reported if the history cannot take it.
+    try:
+        history.append(calculation)
+    except ValueError as e:
+        return f"Result: {calculation}\nNot added to the history: {e}"
+    return f"Result: {calculation}"
+
+
+def _evaluate_expression(source: str) -> str:
+    """Evaluates an `eval` request and returns the response text."""
+    from app.expression import ExpressionError, evaluate
+
+    try:
+        return f"Result: {source.strip()} = {evaluate(source)}"
+    except ExpressionError as e:
+        return f"Invalid expression: {e}"
+    except ZeroDivisionError:
+        return "Cannot divide by zero."
+    except Exception as e:
+        return f"An error occurred during calculation: {e}"
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_history: Optional[int] = None
+) -> None:
+    """
+    Serves one client connection until it sends `exit` or disconnects.
+
+    **Parameters:**
+    - `reader`, `writer`: The connection's streams, as given by `asyncio.start_server`.
+    - `max_history (Optional[int])`: Keep only this many calculations in the connection's history.
+    """
+    history = History(maxlen=max_history)
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # The line was longer than the stream's limit.
+                writer.write(b"Line too long.\n\n")
+                break
+            if not line:
+                break  # The client disconnected.
+            text = line.decode("utf-8", errors="replace")
+            if text.strip().lower() == "exit":
+                writer.write(b"Goodbye!\n\n")
+                break
+            response = respond(text, history)
+            if response is not None:
+                writer.write(response.encode("utf-8") + b"\n\n")
+                # drain() only actually waits when the client is not keeping up, so
+                # pipelined responses are sent as fast as the client reads them.
+                await writer.drain()
+    except ConnectionError:
+        pass  # The client went away mid-response; nothing left to do.
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:  # pragma: no cover - depends on how the client closed
+            pass
+
+
+async def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    unix_path: Optional[str] = None,
+    max_history: Optional[int] = None,
+) -> asyncio.AbstractServer:
+    """
+    Starts serving and returns the `asyncio` server (already listening).
+
+    **Parameters:**
+    - `host (str)`, `port (int)`: The TCP address to listen on. Port 0 picks a free port
+      (see `server.sockets[0].getsockname()`).
+    - `unix_path (Optional[str])`: Listen on this Unix socket instead of TCP.
+    - `max_history (Optional[int])`: Passed on to every connection (see `handle_connection`).
+    """
+    handler = functools.partial(handle_connection, max_history=max_history)
+    if unix_path is not None:
+        return await asyncio.start_unix_server(handler, path=unix_path, limit=MAX_LINE_LENGTH)
+    return await asyncio.start_server(handler, host, port, limit=MAX_LINE_LENGTH)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None,
+          max_history: Optional[int] = None) -> None:  # pragma: no cover - runs until interrupted
+    """
+    Runs the server until the process is interrupted (Ctrl+C). The calculation types are
+    frozen first (see `CalculationFactory.freeze`), so every request's lookup is a plain
+    dictionary access and a plugin can never be half-loaded mid-request.
+    """
+    CalculationFactory.freeze()
+
+    async def run() -> None:
+        server = await start_server(host, port, unix_path, max_history)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Calculator server listening on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
@@ -0,0 +1,368 @@
+"""
+Performance benchmarks for the calculator.
+
+The tests in `tests/` check that the calculator gives the right answers; these
+benchmarks check how fast it gives them, so performance regressions can be caught
+by comparing results between commits. They are kept out of `tests/` on purpose:
+pytest (with its coverage options from `pytest.ini`) never collects them.
+
+**Running:**
+
+    python -m benchmarks                          # run everything, print a table
+    python -m benchmarks --output before.json     # also save the results as JSON
+    python -m benchmarks --compare before.json    # show the change against saved results
+    python -m benchmarks operations repl          # run only some groups
+
+**What Is Measured:**
+- `operations`: time per call of each `Operation` static method.
+- `factory`: `CalculationFactory.create_calculation` + `execute`, versus the fast-path kernel.
+- `history`: time to render the `history` command for N entries, and to search them.
+- `repl`: end-to-end lines per second of `calculator()` fed a scripted stdin.
+- `commands`: per-line cost of turning a REPL line into an operation and operands, with
+  the old strip/lower/split/float chain versus the `app.command` tokenizer.
+- `instrumentation`: the cost of `app.metrics` instrumentation, switched off and on.
+- `powmod`: the fused `powmod` operation versus `power` followed by `modulus`.
+- `binary`: batch throughput reading the binary record format versus the text format.
+- `backends`: parsing (directly and through a `ParseCache` hit) and calculating with each
+  numeric backend (float, int, decimal, fraction).
+- `startup`: cold import time of `main` and `app.calculation` in a fresh interpreter.
+
+Each benchmark reports one or more named metrics. Metric names end in their unit:
+`_ns` (nanoseconds per call, lower is better) or `_per_s` (throughput, higher is better).
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional
+
+from app.calculation import CalculationFactory
+from app.operations import Operation
+
+# Registry of benchmark groups: name -> function returning {metric name: value}.
+BENCHMARKS: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+
+def benchmark(name: str):
+    """Decorator that registers a function as the benchmark group `name`."""
+    def decorator(function):
+        BENCHMARKS[name] = function
+        return function
+    return decorator
+
+
+def time_per_call_ns(function: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Returns the best-of-`repeat` time for one call of `function`, in nanoseconds.
+    Each repeat runs enough calls (as picked by `timeit`'s autorange) to last ~0.2s.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+# -----------------------------------------------------------------------------------
+# Benchmark Groups
+# -----------------------------------------------------------------------------------
+
+# One operand pair per Operation method, chosen so none of them raise.
+OPERATION_ARGUMENTS = {
+    'addition': (10.0, 5.0),
+    'subtraction': (10.0, 5.0),
+    'multiplication': (10.0, 5.0),
+    'division': (10.0, 5.0),
+    'power': (2.0, 10.0),
+    'modulus': (10.0, 3.0),
+}
+
+# Calculation types, matching OPERATION_ARGUMENTS in order.
+CALCULATION_TYPES = ['add', 'subtract', 'multiply', 'divide', 'power', 'modulus']
+
+
+@benchmark('operations')
+def bench_operations() -> Dict[str, float]:
+    """Latency of each Operation static method."""
+    results = {}
+    for name, (a, b) in OPERATION_ARGUMENTS.items():
+        method = getattr(Operation, name)
+        results[f'{name}_ns'] = time_per_call_ns(lambda: method(a, b))
+    return results
+
+
+@benchmark('factory')
+def bench_factory() -> Dict[str, float]:
+    """create_calculation + execute overhead, compared with calling the kernel directly."""
+    results = {}
+    create = CalculationFactory.create_calculation
+    for calculation_type, (a, b) in zip(CALCULATION_TYPES, OPERATION_ARGUMENTS.values()):
+        kernel = CalculationFactory.get_kernel(calculation_type)
+        results[f'{calculation_type}_create_execute_ns'] = time_per_call_ns(
+            lambda: create(calculation_type, a, b).execute()
+        )
+        results[f'{calculation_type}_kernel_ns'] = time_per_call_ns(lambda: kernel(a, b))
+    return results
+
+
+@benchmark('history')
+def bench_history(sizes: tuple = (100, 10_000)) -> Dict[str, float]:
+    """Time to render the history command for N entries (per entry), and to search them."""
+    from app.calculator import display_history
+    from app.history import History
+    from app.query import Query
+
+    results = {}
+    for size in sizes:
+        history = History()
+        for i in range(size):
+            history.append(CalculationFactory.create_calculation('add', float(i), 1.0))
+
+        def render():
+            with redirect_stdout(io.StringIO()):
+                display_history(history)
+
+        results[f'render_{size}_per_entry_ns'] = time_per_call_ns(render, repeat=3) / size
+        # Indexed search (the index is built by the first search, outside the timing).
+        query = Query(operation='add', min_result=size / 2, last=100)
+        history.search(query)
+        results[f'search_{size}_ns'] = time_per_call_ns(lambda: history.search(query), repeat=3)
+    return results
+
+
+def repl_script(lines: int) -> str:
+    """Builds a scripted REPL session of `lines` calculations followed by `exit`."""
+    operations = [f'{calculation_type} {a} {b}'
+                  for calculation_type, (a, b) in zip(CALCULATION_TYPES, OPERATION_ARGUMENTS.values())]
+    body = '\n'.join(operations[i % len(operations)] for i in range(lines))
+    return body + '\nexit\n'
+
+
+def run_repl(script: str) -> None:
+    """Runs calculator() on `script` as stdin, discarding its output."""
+    from app.calculator import calculator
+
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(script)
+    try:
+        with redirect_stdout(io.StringIO()):
+            calculator()
+    except SystemExit:
+        pass
+    finally:
+        sys.stdin = stdin
+
+
+@benchmark('repl')
+def bench_repl(lines: int = 20_000) -> Dict[str, float]:
+    """End-to-end REPL throughput with scripted stdin."""
+    script = repl_script(lines)
+    seconds = time_per_call_ns(lambda: run_repl(script), repeat=3) / 1e9
+    return {'lines_per_s': lines / seconds}
+
+
+def split_chain(line: str):
+    """
+    How `calculator()` used to turn a line into an operation and operands: strip, lower the
+    whole line, compare it with every special command, split, float() each operand, and
+    lower the operation again (as create_calculation did).
+    """
+    user_input = line.strip()
+    command = user_input.lower()
+    timed_command = command.partition(" ")[0]
+    if timed_command not in ("help", "history", "summary", "find", "eval", "stats", "jobs", "cancel"):
+        timed_command = "calculation"
+    if (command == "help" or command == "history" or command.startswith("history ") or command == "summary"
+            or command == "exit" or command == "find" or command.startswith("find ") or command == "jobs"
+            or command == "cancel" or command.startswith("cancel ") or command.startswith("eval ")
+            or command == "stats" or command.startswith("stats ")):
+        return None
+    operation, num1_str, num2_str, *more_strs = user_input.split()
+    return operation.lower(), float(num1_str), float(num2_str), [float(operand) for operand in more_strs]
+
+
+@benchmark('commands')
+def bench_commands() -> Dict[str, float]:
+    """
+    Per-line parsing cost of a calculation line, before and after the tokenizer. The two
+    are at parity within noise; this guards against the tokenizer becoming slower.
+    """
+    from app.cache import ParseCache
+    from app.command import parse_command
+
+    line = 'multiply 12.5 8'
+    cached_parse = ParseCache(float).parse
+    return {
+        'split_chain_ns': time_per_call_ns(lambda: split_chain(line)),
+        'tokenizer_ns': time_per_call_ns(lambda: parse_command(line.strip())),
+        'tokenizer_cached_ns': time_per_call_ns(lambda: parse_command(line.strip(), cached_parse)),
+    }
+
+
+@benchmark('backends')
+def bench_backends() -> Dict[str, float]:
+    """
+    Cost of each numeric backend: parsing an operand, and create_calculation + execute
+    with already-converted operands, so the cheapest exact mode can be picked.
+    """
+    from app.cache import ParseCache
+    from app.numeric import BACKENDS
+
+    results = {}
+    create = CalculationFactory.create_calculation
+    for name, backend in BACKENDS.items():
+        convert = backend.convert
+        # The int backend only parses whole numbers.
+        text = '12345678' if name == 'int' else '1234.5678'
+        results[f'{name}_parse_ns'] = time_per_call_ns(lambda: convert(text))
+        cached_parse = ParseCache(convert).parse
+        results[f'{name}_cached_parse_ns'] = time_per_call_ns(lambda: cached_parse(text))
+        a, b = convert('1234'), convert('56')
+        execute = backend.execute
+        for calculation_type in ('add', 'multiply', 'divide'):
+            results[f'{name}_{calculation_type}_ns'] = time_per_call_ns(
+                lambda: execute(create(calculation_type, a, b))
+            )
+    return results
+
+
+@benchmark('binary')
+def bench_binary(lines: int = 100_000) -> Dict[str, float]:
+    """Lines per second of run_batch on text versus run_binary on the same calculations."""
+    from app.batch import run_batch
+    from app.binary import convert_text, run_binary
+
+    text = repl_script(lines).removesuffix('exit\n')
+    binary = io.BytesIO()
+    convert_text(io.StringIO(text), binary)
+    buffer = binary.getvalue()
+    text_seconds = time_per_call_ns(lambda: run_batch(io.StringIO(text), io.StringIO()), repeat=3) / 1e9
+    binary_seconds = time_per_call_ns(lambda: run_binary(buffer, io.StringIO(), use_numpy=False), repeat=3) / 1e9
+    return {'text_lines_per_s': lines / text_seconds, 'binary_lines_per_s': lines / binary_seconds}
+
+
+@benchmark('instrumentation')
+def bench_instrumentation() -> Dict[str, float]:
+    """create_calculation + execute with instrumentation off (the default) and on."""
+    from app import metrics
+
+    create = CalculationFactory.create_calculation
+    results = {'add_off_ns': time_per_call_ns(lambda: create('add', 10.0, 5.0).execute())}
+    metrics.enable(metrics.Metrics())
+    try:
+        results['add_on_ns'] = time_per_call_ns(lambda: create('add', 10.0, 5.0).execute())
+    finally:
+        metrics.disable()
+    return results
+
+
+@benchmark('powmod')
+def bench_powmod(exponents: tuple = (1_000, 100_000)) -> Dict[str, float]:
+    """
+    The fused powmod operation versus power followed by modulus, on integers
+    (floats would simply overflow), for growing exponents.
+    """
+    base, modulus = 7, 1_000_000_007
+    results = {}
+    for exponent in exponents:
+        results[f'power_then_modulus_{exponent}_ns'] = time_per_call_ns(
+            lambda: Operation.modulus(Operation.power(base, exponent), modulus), repeat=3
+        )
+        results[f'powmod_{exponent}_ns'] = time_per_call_ns(lambda: Operation.powmod(base, exponent, modulus))
+    return results
+
+
+# Project root, so the start-up benchmark's subprocess can import `main` and `app`.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cold_import_us(module: str) -> int:
+    """Imports `module` in a fresh interpreter and returns its cumulative import time in µs."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    last_line = completed.stderr.strip().splitlines()[-1]
+    return int(last_line.split('|')[1])
+
+
+@benchmark('startup')
+def bench_startup(repeat: int = 5) -> Dict[str, float]:
+    """Best-of-`repeat` cold import time of the entry points."""
+    return {
+        f'import_{module.replace(".", "_")}_ns': min(cold_import_us(module) for _ in range(repeat)) * 1000.0
+        for module in ('main', 'app.calculation')
+    }
+
+
+# -----------------------------------------------------------------------------------
+# Running, Saving and Comparing
+# -----------------------------------------------------------------------------------
+
+def run(names: Optional[List[str]] = None) -> Dict[str, object]:
+    """
+    Runs the selected benchmark groups (all of them by default) and returns the results,
+    together with details of the machine they ran on.
+    """
+    selected = names or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}")
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {name: BENCHMARKS[name]() for name in selected},
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object]) -> Dict[str, Dict[str, float]]:
+    """
+    Returns, for every metric present in both runs, the relative change from `baseline`
+    to `current` (e.g. `0.10` means 10% higher). Whether higher is better depends on the
+    metric's unit (see the module docstring).
+    """
+    changes: Dict[str, Dict[str, float]] = {}
+    for group, metrics in current['results'].items():
+        old_metrics = baseline['results'].get(group, {})
+        for metric, value in metrics.items():
+            old_value = old_metrics.get(metric)
+            if old_value:
+                changes.setdefault(group, {})[metric] = value / old_value - 1.0
+    return changes
+
+
+def format_results(results: Dict[str, object], changes: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """Formats results (and optional changes) as a plain-text table."""
+    lines = []
+    for group, metrics in results['results'].items():
+        lines.append(f'[{group}]')
+        for metric, value in metrics.items():
+            line = f'  {metric:<40} {value:>16,.1f}'
+            change = (changes or {}).get(group, {}).get(metric)
+            if change is not None:
+                line += f'  {change:+.1%}'
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: `python -m benchmarks`."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the calculator benchmarks.')
+    parser.add_argument('names', nargs='*', help=f"benchmark groups to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--output', metavar='FILE', help='save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='compare with results saved earlier with --output')
+    args = parser.parse_args(argv)
+
+    results = run(args.names)
+    changes = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            changes = compare(results, json.load(baseline_file))
+    print(format_results(results, changes))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
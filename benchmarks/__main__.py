@@ -0,0 +1,4 @@
+# Lets the benchmarks run with `python -m benchmarks`.
+from benchmarks import main
+
+main()
@@ -1,3 +1,7 @@
+# This line is importing the "sys" module, which lets us look at the command-line
+# arguments and at the standard input, output and error streams.
+import sys
+
 # This line is importing the "calculator" function from another file.
 # Imagine that "calculator" is like a tool or recipe that we've already written somewhere else,
 # and now we are telling the computer, "Go and find that calculator tool for us."
@@ -5,6 +9,137 @@
 # which has the tool (function) called "calculator" that we need.
 from app.calculator import calculator
 
+
+def main(argv=None) -> None:
+    """
+    Starts the calculator in the right mode.
+
+    - `python main.py` on a terminal starts the interactive REPL.
+    - `python main.py --history-file calc.log` starts the REPL with a history kept on disk.
+    - `python main.py --batch in.txt` evaluates every line of `in.txt` and prints the results.
+    - `python main.py --batch -` (or just piping into `python main.py`) reads the lines from stdin.
+    - `python main.py --backend decimal` calculates with exact decimals instead of floats
+      (also works with `--batch`; see app.numeric for the choices).
+    - `python main.py --workers 4 --timeout 10` runs REPL calculations in the background,
+      giving up on any that take longer than 10 seconds; an expensive power runs in a
+      process of its own, which is killed when it is given up on (see app.pool).
+    - `python main.py --serve 127.0.0.1:8765` serves the same line protocol to network clients.
+    - `python main.py --convert in.txt in.bin` converts a file of calculations to the binary
+      format, and `python main.py --binary in.bin` evaluates it (see app.binary).
+
+    In batch mode the results go to stdout and the throughput summary goes to stderr,
+    so the results can be redirected to a file without the summary mixed in.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        # The common case: no options. We skip argparse entirely, which keeps start-up fast.
+        if sys.stdin.isatty():
+            calculator()
+            return
+        # Something is being piped in, so there is no person to show a prompt to.
+        path, backend = "-", None
+    else:
+        # "argparse" reads the options given on the command line (like "--batch in.txt") for us.
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Professional Calculator")
+        parser.add_argument("--batch", metavar="FILE", nargs="?", const="-",
+                            help="evaluate every line of FILE (or stdin for '-') without the REPL")
+        parser.add_argument("--history-file", metavar="FILE",
+                            help="keep the REPL history in FILE so it survives restarts")
+        parser.add_argument("--max-history", metavar="N", type=int,
+                            help="keep only the N most recent calculations in the in-memory history")
+        parser.add_argument("--backend", choices=["float", "int", "decimal", "fraction"],
+                            help="calculate with this kind of number (default: float)")
+        parser.add_argument("--stats", action="store_true",
+                            help="collect call counts and latencies from the start (see the 'stats' command)")
+        parser.add_argument("--workers", metavar="N", type=int,
+                            help="run REPL calculations in the background on N worker threads, and expensive powers "
+                                 "in a separate process")
+        parser.add_argument("--timeout", metavar="SECONDS", type=float,
+                            help="with --workers, give up on a calculation after SECONDS (killing it, in the slow lane)")
+        parser.add_argument("--max-power-bits", metavar="N", type=float,
+                            help="reject powers whose exact result would exceed about N bits (see app.guardrails)")
+        parser.add_argument("--slow-power-bits", metavar="N", type=float,
+                            help="with --workers, run powers above about N bits in a separate slow-lane process")
+        parser.add_argument("--serve", metavar="[HOST:]PORT",
+                            help="serve the calculator line protocol over TCP instead of running the REPL")
+        parser.add_argument("--unix-socket", metavar="PATH",
+                            help="serve the calculator line protocol on a Unix socket")
+        parser.add_argument("--binary", metavar="FILE",
+                            help="evaluate every record of the binary calculation file FILE")
+        parser.add_argument("--convert", metavar=("TEXT", "BINARY"), nargs=2,
+                            help="convert the calculations in TEXT to the binary format, into BINARY")
+        args = parser.parse_args(argv)
+        if args.stats:
+            from app import metrics
+            metrics.enable()
+        if args.max_power_bits is not None or args.slow_power_bits is not None:
+            from app import guardrails
+            try:
+                guardrails.configure(args.slow_power_bits, args.max_power_bits)
+            except ValueError as e:
+                parser.error(str(e))
+        if args.serve is not None or args.unix_socket is not None:
+            # The server is only imported when it is used.
+            from app.server import serve
+
+            host, _, port = (args.serve or "").rpartition(":")
+            serve(host or "127.0.0.1", int(port or 8765), args.unix_socket, args.max_history)
+            return
+        if args.convert is not None or args.binary is not None:
+            run_binary_file(args.convert, args.binary)
+            return
+        path, backend = args.batch, args.backend
+        if path is None:
+            calculator(max_history=args.max_history, history_file=args.history_file, backend=backend,
+                       workers=args.workers, timeout=args.timeout)
+            return
+
+    # Batch mode is only imported when it is used, so the REPL starts as fast as before.
+    from app.batch import run_batch
+
+    if path == "-":
+        stats = run_batch(sys.stdin, sys.stdout, backend=backend)
+    else:
+        with open(path, "r", encoding="utf-8", buffering=1 << 20) as input_file:
+            stats = run_batch(input_file, sys.stdout, backend=backend)
+    sys.stdout.flush()
+    print(stats, file=sys.stderr)
+
+
+def run_binary_file(convert, binary) -> None:
+    """
+    Handles `--convert TEXT BINARY` (converting a text file to the binary format) and
+    `--binary FILE` (evaluating a binary file, with the results on stdout like `--batch`).
+    """
+    import mmap
+    import os
+
+    from app.binary import convert_text, run_binary
+
+    if convert is not None:
+        text_path, binary_path = convert
+        with open(text_path, "r", encoding="utf-8", buffering=1 << 20) as text_file, open(binary_path, "wb") as binary_file:
+            conversion = convert_text(text_file, binary_file)
+        for line_number, message in conversion.errors:
+            print(f"{text_path}:{line_number}: skipped: {message}", file=sys.stderr)
+        print(f"Converted {conversion.records} calculations to {binary_path}", file=sys.stderr)
+    if binary is not None:
+        with open(binary, "rb") as binary_file:
+            try:
+                # An empty file cannot be mapped, and is not a valid calculation file either.
+                if os.fstat(binary_file.fileno()).st_size == 0:
+                    raise ValueError("Not a binary calculation file.")
+                # Memory-mapping lets the records be read straight from the file without copying.
+                with mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    stats = run_binary(buffer, sys.stdout)
+            except ValueError as e:
+                sys.exit(f"{binary}: {e}")
+        sys.stdout.flush()
+        print(stats, file=sys.stderr)
+
+
 # This part of the code is super important! It checks if this file is being run directly by the computer.
 # Let me explain: when we write Python programs, sometimes we want to run them directly,
 # and other times we just want to use parts of the program inside other programs.
@@ -14,6 +149,6 @@ from app.calculator import calculator
 # So, what this line means is: "If you're running this program directly (not as part of another program), 
 # then go ahead and start the calculator."
 if __name__ == "__main__":
-    # Now, we use the calculator tool we got earlier. This will start the calculator, which is a program 
-    # that keeps running and doing math based on what we tell it.
-    calculator()
+    # Now, we use the main function, which starts the calculator REPL, or batch mode
+    # when we were given a file (or a pipe) full of calculations.
+    main()
@@ -1,13 +1,15 @@
 # tests/conftest.py
 
 import pytest
-from app.calculation import CalculationFactory
+from app.calculation import CalculationFactory, Registry
 from app.calculation import (
     AddCalculation,
     SubtractCalculation,
     MultiplyCalculation,
     DivideCalculation,
-    
+    PowerCalculation,
+    ModulusCalculation,
+    PowModCalculation,
 )
 
 @pytest.fixture(autouse=True)
@@ -15,11 +17,37 @@ def reset_calculation_factory():
     """
     Fixture to reset CalculationFactory's registered calculations before each test.
     """
-    # Clear existing registrations
-    CalculationFactory._calculations.clear()
+    # Start from empty registrations. The registries are copy-on-write, so they are
+    # replaced rather than cleared in place.
+    CalculationFactory.frozen = False
+    CalculationFactory._registry = Registry({}, {})
+    # No lazy registrations either, and no installed package's plugins: tests that
+    # exercise discovery turn it back on.
+    CalculationFactory._plugins = {}
+    CalculationFactory._plugins_discovered = True
+    CalculationFactory.backend = None
 
     # Re-register the default calculations
     CalculationFactory.register_calculation('add')(AddCalculation)
     CalculationFactory.register_calculation('subtract')(SubtractCalculation)
     CalculationFactory.register_calculation('multiply')(MultiplyCalculation)
-    CalculationFactory.register_calculation('divide')(DivideCalculation)
\ No newline at end of file
+    CalculationFactory.register_calculation('divide')(DivideCalculation)
+
+@pytest.fixture
+def all_calculations():
+    """
+    Fixture that also registers the 'power', 'modulus' and 'powmod' calculations, which the
+    reset above leaves out, for tests that need every built-in operation.
+    """
+    # test_calculation.py reloads app.calculation, so modules imported before the reload
+    # use the original factory and those imported after it use the reloaded one. Register
+    # the calculations with both (each with its own module's classes).
+    import app.calculation
+
+    original = (CalculationFactory, PowerCalculation, ModulusCalculation, PowModCalculation)
+    current = (app.calculation.CalculationFactory, app.calculation.PowerCalculation,
+               app.calculation.ModulusCalculation, app.calculation.PowModCalculation)
+    for factory, *classes in {original, current}:
+        for name, calculation_class in zip(('power', 'modulus', 'powmod'), classes):
+            if name not in factory.registered_types():
+                factory.register_calculation(name)(calculation_class)
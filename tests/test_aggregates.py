@@ -0,0 +1,218 @@
+# tests/test_aggregates.py
+
+"""
+Unit tests for the app/aggregates module (running statistics of results).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import statistics
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app.aggregates import Aggregates, RunningStats
+
+
+def running_stats(values):
+    """Helper that builds a RunningStats from the given values."""
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    return stats
+
+
+def test_running_stats_matches_statistics_module():
+    """
+    Test count, sum, min, max, mean and both variances against the statistics module.
+    """
+    # Arrange
+    values = [4.0, -2.5, 10.0, 7.25, 0.0, 3.5]
+
+    # Act
+    stats = running_stats(values)
+
+    # Assert
+    assert stats.count == 6
+    assert stats.total == pytest.approx(sum(values))
+    assert (stats.minimum, stats.maximum) == (-2.5, 10.0)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.variance == pytest.approx(statistics.pvariance(values))
+    assert stats.sample_variance == pytest.approx(statistics.variance(values))
+
+
+def test_running_stats_empty_and_single_value():
+    """
+    Test the statistics before the first value and after just one.
+    """
+    # Arrange
+    empty = RunningStats()
+
+    # Act
+    single = running_stats([5.0])
+
+    # Assert
+    assert (empty.count, empty.total, empty.minimum, empty.maximum, empty.mean) == (0, 0, None, None, 0)
+    assert (single.variance, single.sample_variance) == (0, 0)
+    assert (single.minimum, single.maximum, single.mean) == (5.0, 5.0, 5.0)
+
+
+def test_running_stats_compensated_sum():
+    """
+    Test that the Kahan-compensated sum does not drift where naive float addition does.
+    """
+    # Arrange
+    values = [1.0] + [1e-16] * 10_000
+
+    # Act
+    stats = running_stats(values)
+
+    # Assert
+    naive = 0.0
+    for value in values:
+        naive += value
+    assert naive == 1.0  # every tiny value was rounded away
+    assert stats.total == math.fsum(values)
+
+
+def test_running_stats_variance_of_large_close_values():
+    """
+    Test that Welford's update keeps the variance of large, nearly equal values accurate.
+    """
+    # Arrange
+    values = [1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16]
+
+    # Act
+    stats = running_stats(values)
+
+    # Assert
+    assert stats.variance == pytest.approx(22.5)
+
+
+@pytest.mark.parametrize("number_type", [Decimal, Fraction])
+def test_running_stats_exact_number_types(number_type):
+    """
+    Test that exact number types stay exact.
+    """
+    # Arrange
+    values = [number_type(1), number_type(2), number_type(4)]
+
+    # Act
+    stats = running_stats(values)
+
+    # Assert
+    assert stats.total == number_type(7)
+    assert type(stats.mean) is number_type
+    assert stats.variance == statistics.pvariance(values)
+
+
+def test_aggregates_per_operation_and_overall():
+    """
+    Test that results are counted overall and under their operation.
+    """
+    # Arrange
+    aggregates = Aggregates()
+
+    # Act
+    for operation, result in [('add', 3.0), ('divide', 0.5), ('add', 7.0)]:
+        aggregates.add(operation, result)
+
+    # Assert
+    assert aggregates.overall.count == 3
+    assert list(aggregates.by_operation) == ['add', 'divide']
+    assert aggregates.by_operation['add'].total == 10.0
+    assert aggregates.by_operation['divide'].mean == 0.5
+    assert repr(aggregates) == "Aggregates(count=3, operations=['add', 'divide'])"
+
+
+def test_aggregates_skip_complex_results():
+    """
+    Test that complex results, which have no order, and integers too large for a float
+    are counted as skipped.
+    """
+    # Arrange
+    aggregates = Aggregates()
+
+    # Act
+    aggregates.add('power', 1j)
+    aggregates.add('power', -10 ** 400)
+    aggregates.add('power', 2.0)
+    aggregates.add('power', 10 ** 300)
+
+    # Assert
+    assert aggregates.overall.count == 2
+    assert aggregates.skipped == 2
+    assert list(aggregates.lines())[-1] == "(2 results not included: complex, or too large for a float)"
+
+
+def test_running_stats_after_infinite_value():
+    """
+    Test that once an infinite value is added, the sum and mean stay inf instead of
+    the compensation turning them into NaN.
+    """
+    # Act
+    stats = running_stats([1.0, 1e308 * 10, 5.0, 2.0])
+
+    # Assert
+    assert (stats.total, stats.mean, stats.maximum) == (math.inf, math.inf, math.inf)
+    assert math.isnan(stats.variance)
+
+
+def test_running_stats_sum_overflowing_to_infinity():
+    """
+    Test that a sum of finite values that overflows stays inf afterwards.
+    """
+    # Act
+    stats = running_stats([1e308, 1e308, -1.0])
+
+    # Assert
+    assert stats.total == math.inf
+    assert stats.mean == math.inf
+
+
+def test_running_stats_integer_sum_beyond_float_range():
+    """
+    Test that an exact integer sum larger than any float still counts as finite.
+    """
+    # Act
+    stats = running_stats([2 ** 1022 * 3, 2 ** 1022 * 3])
+
+    # Assert
+    assert stats.total == 2 ** 1023 * 3
+
+
+def test_running_stats_infinite_decimal():
+    """
+    Test that an infinite Decimal does not raise (Decimal traps inf - inf).
+    """
+    # Act
+    stats = running_stats([Decimal(1), Decimal('Infinity'), Decimal(2)])
+
+    # Assert
+    assert stats.total == Decimal('Infinity')
+    assert stats.mean == Decimal('Infinity')
+
+
+def test_aggregates_lines():
+    """
+    Test the lines of the summary command.
+    """
+    # Arrange
+    aggregates = Aggregates()
+    empty_lines = list(aggregates.lines())
+    aggregates.add('add', 2.0)
+    aggregates.add('add', 4.0)
+
+    # Act
+    lines = list(aggregates.lines())
+
+    # Assert
+    assert empty_lines == ["No calculations performed yet."]
+    assert lines == [
+        "Summary of 2 calculations:",
+        "all: count=2, sum=6.0, mean=3.0, min=2.0, max=4.0, variance=1.0",
+        "add: count=2, sum=6.0, mean=3.0, min=2.0, max=4.0, variance=1.0",
+    ]
+    assert repr(aggregates.overall) == "RunningStats(count=2, sum=6.0, min=2.0, max=4.0, mean=3.0, variance=1.0)"
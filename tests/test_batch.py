@@ -0,0 +1,141 @@
+# tests/test_batch.py
+
+"""
+Unit tests for the app/batch module (non-interactive streaming mode).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+from io import StringIO
+
+import pytest
+
+from app.batch import BatchStats, run_batch
+from app.cache import ParseCache
+
+
+def test_run_batch_results():
+    """
+    Test that every valid line produces its result, in input order.
+    """
+    # Arrange
+    input_stream = StringIO("add 10 5\nsubtract 20 3\nmultiply 7 8\ndivide 20 4\n")
+    output_stream = StringIO()
+
+    # Act
+    stats = run_batch(input_stream, output_stream)
+
+    # Assert
+    assert output_stream.getvalue() == "15.0\n17.0\n56.0\n5.0\n"
+    assert stats.lines == 4
+    assert stats.errors == 0
+
+
+def test_run_batch_errors_keep_line_alignment():
+    """
+    Test that failing lines produce an error line, so output lines stay aligned
+    with input lines, and that blank lines are skipped.
+    """
+    # Arrange
+    input_stream = StringIO("divide 1 0\n\nadd 1\nadd ten five\nunknown 1 2\nadd 1 2\n")
+    output_stream = StringIO()
+
+    # Act
+    stats = run_batch(input_stream, output_stream)
+
+    # Assert
+    output_lines = output_stream.getvalue().splitlines()
+    assert output_lines[0] == "error: Cannot divide by zero."
+    assert output_lines[1] == "error: Invalid input. Please follow the format: <operation> <num1> <num2>"
+    assert output_lines[2] == "error: Invalid input. Please follow the format: <operation> <num1> <num2>"
+    assert output_lines[3].startswith("error: Unsupported calculation type: 'unknown'")
+    assert output_lines[4] == "3.0"
+    assert stats.lines == 5
+    assert stats.errors == 4
+
+
+def test_run_batch_small_chunks():
+    """
+    Test that reading in many small chunks gives the same output as one big chunk.
+    """
+    # Arrange
+    text = "".join(f"add {i} {i}\n" for i in range(100))
+    output_stream = StringIO()
+
+    # Act
+    run_batch(StringIO(text), output_stream, chunk_size=16)
+
+    # Assert
+    assert output_stream.getvalue() == "".join(f"{2.0 * i}\n" for i in range(100))
+
+
+def test_run_batch_single_write_per_chunk():
+    """
+    Test that output is written once per chunk rather than once per line.
+    """
+    # Arrange
+    class CountingStream(StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    output_stream = CountingStream()
+
+    # Act
+    run_batch(StringIO("add 1 1\n" * 50), output_stream)
+
+    # Assert
+    assert output_stream.writes == 1
+
+
+def test_batch_stats_throughput():
+    """
+    Test the throughput figure and summary text of BatchStats.
+    """
+    # Arrange
+    stats = BatchStats(lines=1000, errors=2, seconds=0.5)
+
+    # Act & Assert
+    assert stats.lines_per_second == pytest.approx(2000.0)
+    assert str(stats) == "Processed 1000 lines (2 errors) in 0.500s (2,000 lines/s)"
+    assert BatchStats(0, 0, 0.0).lines_per_second == 0.0
+
+
+@pytest.mark.usefixtures('all_calculations')
+def test_run_batch_three_operands():
+    """
+    Test that powmod lines take three operands, and that every operation needs
+    exactly its own number of operands.
+    """
+    # Arrange
+    input_stream = StringIO("powmod 4 13 497\npowmod 4 13\nadd 1 2 3\npowmod 4 13 x\n")
+    output_stream = StringIO()
+
+    # Act
+    stats = run_batch(input_stream, output_stream)
+
+    # Assert
+    invalid = "error: Invalid input. Please follow the format: <operation> <num1> <num2>"
+    assert output_stream.getvalue().splitlines() == ["445", invalid, invalid, invalid]
+    assert stats.errors == 3
+
+
+def test_run_batch_parses_each_operand_token_once():
+    """
+    Test that repeated operand tokens are looked up in the parse cache, with the hits
+    and misses counted, and that invalid tokens are not cached.
+    """
+    # Arrange
+    cache = ParseCache(float)
+    input_stream = StringIO("add 1 2\nmultiply 2 1\nadd 1 x\nsubtract 2 2\n")
+    output_stream = StringIO()
+
+    # Act
+    run_batch(input_stream, output_stream, parse_cache=cache)
+
+    # Assert
+    assert output_stream.getvalue().splitlines()[:2] == ["3.0", "2.0"]
+    assert (cache.hits, cache.misses) == (5, 3)
+    assert list(cache.entries) == ["1", "2"]
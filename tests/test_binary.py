@@ -0,0 +1,234 @@
+# tests/test_binary.py
+
+"""
+Unit tests for the app/binary module (binary record input format).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+from io import BytesIO, StringIO
+
+import pytest
+
+from app.batch import run_batch
+from app.binary import (
+    HEADER,
+    MAGIC,
+    RECORD,
+    RECORD_DTYPE,
+    convert_text,
+    evaluate_binary,
+    iter_records,
+    read_header,
+    records_view,
+    run_binary,
+)
+
+
+def convert(text: str) -> bytes:
+    """Converts `text` to the binary format and returns the file's bytes."""
+    output = BytesIO()
+    convert_text(StringIO(text), output)
+    return output.getvalue()
+
+
+def test_convert_text_round_trip():
+    """
+    Test that converted records read back as the original operations and operands.
+    """
+    # Arrange
+    text = "add 10 5\nDIVIDE 1 0\n\nmultiply -2.5 4\n"
+
+    # Act
+    buffer = convert(text)
+
+    # Assert
+    assert list(iter_records(buffer)) == [('add', 10.0, 5.0), ('divide', 1.0, 0.0), ('multiply', -2.5, 4.0)]
+
+
+def test_convert_text_layout():
+    """
+    Test the file layout: header, operation table, then one 17-byte record per calculation.
+    """
+    # Arrange
+    text = "subtract 3 1\n"
+
+    # Act
+    buffer = convert(text)
+
+    # Assert
+    names, offset = read_header(buffer)
+    assert buffer.startswith(MAGIC)
+    assert names == ['add', 'subtract', 'multiply', 'divide']
+    assert offset == HEADER.size + len('add\nsubtract\nmultiply\ndivide')
+    assert len(buffer) - offset == RECORD.size == 17
+    assert RECORD.unpack_from(buffer, offset) == (1, 3.0, 1.0)
+
+
+def test_convert_text_reports_skipped_lines(all_calculations):
+    """
+    Test that invalid lines, unknown operations and three-operand operations are left out
+    and reported with their line numbers.
+    """
+    # Arrange
+    text = "add 1 2\nadd 1\nadd one two\nunknown 1 2\npowmod 4 13 497\nmodulus 7 4\n"
+    output = BytesIO()
+
+    # Act
+    conversion = convert_text(StringIO(text), output)
+
+    # Assert
+    assert conversion.records == 2
+    assert [line_number for line_number, _ in conversion.errors] == [2, 3, 4, 5]
+    assert conversion.errors[2] == (4, "Unsupported calculation type: 'unknown'.")
+    assert 'powmod' not in read_header(output.getvalue())[0]
+
+
+@pytest.mark.parametrize("buffer, message", [
+    (b"", "Not a binary calculation file."),
+    (b"NOTBINARY!", "Not a binary calculation file."),
+    (HEADER.pack(MAGIC, 3) + b"add" + b"\x00" * 5, "Binary calculation file is truncated."),
+])
+def test_records_view_rejects_bad_files(buffer, message):
+    """
+    Test that a buffer without the magic bytes, or with a cut-off record, is rejected.
+    """
+    # Arrange / Act / Assert
+    with pytest.raises(ValueError, match=message):
+        records_view(buffer)
+
+
+def test_evaluate_binary_results_and_errors():
+    """
+    Test that every record is evaluated in order, with failures in the error mask.
+    """
+    # Arrange
+    buffer = convert("add 10 5\ndivide 1 0\nmultiply 7 8\n")
+
+    # Act
+    batch = evaluate_binary(buffer, use_numpy=False)
+
+    # Assert
+    assert batch.results[0] == 15.0 and batch.results[2] == 56.0
+    assert math.isnan(batch.results[1])
+    assert list(batch.errors) == [0, 1, 0]
+
+
+def test_evaluate_binary_unknown_operation_codes():
+    """
+    Test that records whose operation is no longer registered, or whose code is outside
+    the operation table, fail instead of raising.
+    """
+    # Arrange
+    table = b"add\nsquare"
+    buffer = (HEADER.pack(MAGIC, len(table)) + table
+              + RECORD.pack(0, 1.0, 2.0) + RECORD.pack(1, 3.0, 0.0) + RECORD.pack(7, 1.0, 1.0))
+
+    # Act
+    batch = evaluate_binary(buffer, use_numpy=False)
+
+    # Assert
+    assert list(batch.errors) == [0, 1, 1]
+
+
+def test_run_binary_matches_text_batch():
+    """
+    Test that evaluating the binary file writes exactly what batch mode writes for the text.
+    """
+    # Arrange
+    text = "add 10 5\ndivide 1 0\nsubtract 2.5 0.5\nmultiply 3 -4\n"
+    expected = StringIO()
+    run_batch(StringIO(text), expected)
+    output = StringIO()
+
+    # Act
+    stats = run_binary(convert(text), output, use_numpy=False)
+
+    # Assert
+    assert output.getvalue() == expected.getvalue()
+    assert (stats.lines, stats.errors) == (4, 1)
+
+
+def test_run_binary_unknown_operation_messages():
+    """
+    Test the error lines written for an unregistered operation and an out-of-table code.
+    """
+    # Arrange
+    table = b"square"
+    buffer = HEADER.pack(MAGIC, len(table)) + table + RECORD.pack(0, 3.0, 0.0) + RECORD.pack(5, 1.0, 1.0)
+    output = StringIO()
+
+    # Act
+    run_binary(buffer, output, use_numpy=False)
+
+    # Assert
+    lines = output.getvalue().splitlines()
+    assert lines[0].startswith("error: Unsupported calculation type: 'square'")
+    assert lines[1].startswith("error: Unsupported calculation type: '#5'")
+
+
+def test_evaluate_binary_with_numpy_matches_pure_python():
+    """
+    Test that the NumPy path gives the same results and error mask as the pure-Python path.
+    """
+    # Arrange
+    numpy = pytest.importorskip('numpy')
+    table = b"add\nsubtract\nmultiply\ndivide\nsquare"
+    buffer = HEADER.pack(MAGIC, len(table)) + table + b"".join(
+        RECORD.pack(code, float(row), float(row % 3)) for row, code in enumerate([0, 3, 1, 2, 3, 4, 9])
+    )
+    expected = evaluate_binary(buffer, use_numpy=False)
+
+    # Act
+    batch = evaluate_binary(buffer, use_numpy=True)
+
+    # Assert
+    assert [bool(flag) for flag in batch.errors] == [bool(flag) for flag in expected.errors]
+    numpy.testing.assert_array_equal(batch.results, numpy.array(expected.results))
+    records = numpy.frombuffer(records_view(buffer)[1], dtype=numpy.dtype(RECORD_DTYPE))
+    assert records['op'].tolist() == [0, 3, 1, 2, 3, 4, 9]
+
+
+def test_convert_text_writes_in_chunks(monkeypatch):
+    """
+    Test that records collected across several write chunks all end up in the file, in order.
+    """
+    # Arrange
+    monkeypatch.setattr('app.binary.WRITE_CHUNK_RECORDS', 2)
+    text = "".join(f"add {i} 1\n" for i in range(5))
+
+    # Act
+    buffer = convert(text)
+
+    # Assert
+    assert [a for _, a, _ in iter_records(buffer)] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_run_binary_writes_per_chunk(monkeypatch):
+    """
+    Test that records are evaluated and written a chunk at a time, with the error rows
+    of every chunk explained and the output the same as in one go.
+    """
+    # Arrange
+    text = "".join(f"divide {i} {i % 3}\n" for i in range(5))
+    buffer = convert(text)
+    expected = StringIO()
+    run_binary(buffer, expected, use_numpy=False)
+    monkeypatch.setattr('app.binary.WRITE_CHUNK_RECORDS', 2)
+    writes = []
+
+    class RecordingStream(StringIO):
+        def write(self, text):
+            writes.append(text)
+            return super().write(text)
+
+    output = RecordingStream()
+
+    # Act
+    stats = run_binary(buffer, output, use_numpy=False)
+
+    # Assert
+    assert output.getvalue() == expected.getvalue()
+    assert [chunk.count("\n") for chunk in writes] == [2, 2, 1]
+    assert (stats.lines, stats.errors) == (5, 2)
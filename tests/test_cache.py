@@ -0,0 +1,368 @@
+# tests/test_cache.py
+
+"""
+Unit tests for the app/cache module and the result caching built into Calculation.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.cache import CacheInfo, ParseCache, ResultCache
+from app.calculation import AddCalculation, Calculation, DivideCalculation, PowerCalculation, PowModCalculation
+from app.operations import Operation
+
+
+@pytest.fixture
+def result_cache():
+    """
+    Fixture that enables a process-wide ResultCache for one test and disables it afterwards.
+    """
+    cache = ResultCache(maxsize=4)
+    Calculation.result_cache = cache
+    yield cache
+    Calculation.result_cache = None
+
+
+# -----------------------------------------------------------------------------------
+# Test ResultCache
+# -----------------------------------------------------------------------------------
+
+def test_result_cache_hit_and_miss():
+    """
+    Test that get counts misses for absent keys and hits for stored keys.
+    """
+    # Arrange
+    cache = ResultCache(maxsize=2)
+
+    # Act
+    missing = cache.get('a', 'default')
+    cache.put('a', 1)
+    found = cache.get('a')
+
+    # Assert
+    assert missing == 'default'
+    assert found == 1
+    assert cache.info() == CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+
+def test_result_cache_evicts_least_recently_used():
+    """
+    Test that a full cache evicts the least recently used entry.
+    """
+    # Arrange
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')  # 'a' becomes the most recently used.
+
+    # Act
+    cache.put('c', 3)
+
+    # Assert
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert len(cache) == 2
+
+
+def test_result_cache_from_several_threads():
+    """
+    Test that threads filling and reading a small cache at once neither fail nor lose
+    count of their lookups.
+    """
+    # Arrange
+    cache = ResultCache(maxsize=8)
+    errors = []
+
+    def use_cache(offset):
+        try:
+            for i in range(5_000):
+                cache.put(offset + i % 16, i)
+                cache.get(offset + (i + 1) % 16)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=use_cache, args=(offset,)) for offset in (0, 100, 200, 300)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    info = cache.info()
+    assert errors == []
+    assert info.hits + info.misses == 20_000
+    assert info.currsize == 8
+
+
+def test_result_cache_clear():
+    """
+    Test that clear removes all entries and resets the counters.
+    """
+    # Arrange
+    cache = ResultCache()
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('b')
+
+    # Act
+    cache.clear()
+
+    # Assert
+    assert cache.info() == CacheInfo(hits=0, misses=0, maxsize=1024, currsize=0)
+
+
+def test_result_cache_invalid_maxsize():
+    """
+    Test that a maxsize below 1 is rejected.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        ResultCache(maxsize=0)
+
+    assert str(exc_info.value) == "maxsize must be at least 1."
+
+
+# -----------------------------------------------------------------------------------
+# Test Calculation Result Caching
+# -----------------------------------------------------------------------------------
+
+@patch.object(Operation, 'addition', return_value=15.0)
+def test_execute_computes_once_per_instance(mock_addition):
+    """
+    Test that repeated execute and str calls on one instance compute the result only once.
+    """
+    # Arrange
+    calculation = AddCalculation(10.0, 5.0)
+
+    # Act
+    calculation.execute()
+    calculation.execute()
+    text = str(calculation)
+
+    # Assert
+    mock_addition.assert_called_once_with(10.0, 5.0)
+    assert text == "AddCalculation: 10.0 Add 5.0 = 15.0"
+
+
+@patch.object(Operation, 'power', return_value=8.0)
+def test_power_str_uses_cached_result(mock_power):
+    """
+    Test that PowerCalculation's own __str__ also reuses the cached result.
+    """
+    # Arrange
+    calculation = PowerCalculation(2.0, 3.0)
+
+    # Act
+    calculation.execute()
+    str(calculation)
+
+    # Assert
+    mock_power.assert_called_once_with(2.0, 3.0)
+
+
+@pytest.mark.parametrize("change, expected_result, expected_text", [
+    (lambda c: setattr(c, 'base', 5.0), 125.0, "PowerCalculation: 5.0 Power 3.0 = 125.0"),
+    (lambda c: setattr(c, 'exponent', 2.0), 4.0, "PowerCalculation: 2.0 Power 2.0 = 4.0"),
+    (lambda c: setattr(c, 'a', 3.0), 27.0, "PowerCalculation: 3.0 Power 3.0 = 27.0"),
+])
+def test_execute_recomputes_after_an_operand_changes(change, expected_result, expected_text):
+    """
+    Test that assigning an operand after execute() makes the next call compute again
+    instead of returning the result for the old operands.
+    """
+    # Arrange
+    calculation = PowerCalculation(2.0, 3.0)
+    calculation.execute()
+
+    # Act
+    change(calculation)
+
+    # Assert
+    assert calculation.execute() == expected_result
+    assert str(calculation) == expected_text
+
+
+def test_powmod_recomputes_after_the_modulus_changes():
+    """
+    Test that the memo also covers operands beyond `a` and `b`, and that a result
+    stored with set_result is returned without computing.
+    """
+    # Arrange
+    calculation = PowModCalculation(4, 13, 497)
+    calculation.execute()
+
+    # Act
+    calculation.m = 10
+    recomputed = calculation.execute()
+    calculation.set_result(-1)
+
+    # Assert
+    assert recomputed == 4 ** 13 % 10
+    assert calculation.execute() == -1
+
+
+def test_execute_does_not_cache_errors():
+    """
+    Test that a failing calculation raises again on every call.
+    """
+    # Arrange
+    calculation = DivideCalculation(1.0, 0.0)
+
+    # Act & Assert
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            calculation.execute()
+
+
+@patch.object(Operation, 'addition', return_value=15.0)
+def test_shared_cache_across_instances(mock_addition, result_cache):
+    """
+    Test that, with a process-wide cache enabled, equal calculations on different
+    instances compute the result only once.
+    """
+    # Act
+    first = AddCalculation(10.0, 5.0).execute()
+    second = AddCalculation(10.0, 5.0).execute()
+
+    # Assert
+    assert first == second == 15.0
+    mock_addition.assert_called_once_with(10.0, 5.0)
+    assert result_cache.info().hits == 1
+    assert result_cache.info().misses == 1
+
+
+def test_shared_cache_keys_on_type_and_operands(result_cache):
+    """
+    Test that the cache key includes the calculation type and the operand types.
+    """
+    # Act
+    int_result = AddCalculation(1, 2).execute()
+    float_result = AddCalculation(1.0, 2.0).execute()
+    power_result = PowerCalculation(1.0, 2.0).execute()
+
+    # Assert
+    assert type(int_result) is int
+    assert type(float_result) is float
+    assert power_result == 1.0
+    assert result_cache.info().currsize == 3
+
+
+def test_subclass_without_execute_is_still_abstract():
+    """
+    Test that the caching wrapper does not make Calculation itself instantiable.
+    """
+    with pytest.raises(TypeError):
+        Calculation(1.0, 2.0)
+
+
+@patch.object(Operation, 'addition', return_value=3.0)
+def test_inherited_execute_is_not_wrapped_twice(mock_addition):
+    """
+    Test that a subclass inheriting execute keeps the parent's single caching wrapper.
+    """
+    # Arrange
+    class LoggedAddCalculation(AddCalculation):
+        pass
+
+    calculation = LoggedAddCalculation(1.0, 2.0)
+
+    # Act
+    calculation.execute()
+    calculation.execute()
+
+    # Assert
+    assert 'execute' not in LoggedAddCalculation.__dict__
+    mock_addition.assert_called_once_with(1.0, 2.0)
+
+
+def test_result_cache_key_includes_extra_operands(result_cache):
+    """
+    Test that calculations with a third operand are cached separately for each value of it.
+    """
+    # Act
+    first = PowModCalculation(4, 13, 497).execute()
+    second = PowModCalculation(4, 13, 5).execute()
+
+    # Assert
+    assert first == 445
+    assert second == 4 ** 13 % 5
+    assert result_cache.info().misses == 2
+
+
+# -----------------------------------------------------------------------------------
+# Test ParseCache
+# -----------------------------------------------------------------------------------
+
+def test_parse_cache_shares_parsed_numbers():
+    """
+    Test that a repeated token is parsed once and returns the very same number object.
+    """
+    # Arrange
+    cache = ParseCache(float)
+
+    # Act
+    first = cache.parse("2.5")
+    second = cache.parse("2.5")
+
+    # Assert
+    assert first == 2.5
+    assert second is first
+    assert cache.info() == CacheInfo(hits=1, misses=1, maxsize=4096, currsize=1)
+
+
+def test_parse_cache_evicts_oldest_token():
+    """
+    Test that a full cache evicts the token added first, and counts the eviction.
+    """
+    # Arrange
+    cache = ParseCache(Decimal, maxsize=2)
+
+    # Act
+    for token in ("1", "2", "1", "3"):
+        cache.parse(token)
+
+    # Assert
+    assert list(cache.entries) == ["2", "3"]
+    assert cache.entries["3"] == Decimal("3")
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+    assert repr(cache) == "ParseCache(hits=1, misses=3, evictions=1, size=2/2)"
+
+
+def test_parse_cache_does_not_cache_invalid_tokens():
+    """
+    Test that an invalid token raises the parse error every time and is never cached.
+    """
+    # Arrange
+    cache = ParseCache(float)
+
+    # Act & Assert
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.parse("abc")
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
+def test_parse_cache_clear_and_validation():
+    """
+    Test that clear empties the cache and resets its counters, and that maxsize must be positive.
+    """
+    # Arrange
+    cache = ParseCache(float, maxsize=1)
+    for token in ("1", "1", "2"):
+        cache.parse(token)
+
+    # Act
+    cache.clear()
+
+    # Assert
+    assert cache.info() == CacheInfo(hits=0, misses=0, maxsize=1, currsize=0)
+    assert cache.evictions == 0
+    with pytest.raises(ValueError, match="maxsize must be at least 1."):
+        ParseCache(float, maxsize=0)
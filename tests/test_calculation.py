@@ -13,6 +13,8 @@ to PEP8 standards for code style and formatting.
 
 import pytest
 from unittest.mock import patch
+import array
+import math
 import sys, importlib
 import app.calculation
 importlib.reload(app.calculation)
@@ -25,7 +27,9 @@ from app.calculation import (
     DivideCalculation,
     PowerCalculation,
     ModulusCalculation,
-    Calculation 
+    PowModCalculation,
+    Calculation,
+    BatchResult,
 )
 
 
@@ -808,4 +812,561 @@ def test_calculation_str_parameterized(
     calc_str = str(calc)
 
     # Assert: Verify the string representation matches the expected format
-    assert calc_str == expected_str
\ No newline at end of file
+    assert calc_str == expected_str
+
+# -----------------------------------------------------------------------------------
+# Tests for Batch Evaluation
+# -----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("calc_type, a_values, b_values, expected_results", [
+    ('add', [1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [5.0, 7.0, 9.0]),
+    ('subtract', [10.0, 0.0], [4.0, 5.0], [6.0, -5.0]),
+    ('multiply', [2.0, -3.0], [4.0, 5.0], [8.0, -15.0]),
+    ('divide', [10.0, 9.0], [4.0, 3.0], [2.5, 3.0]),
+    ('power', [2.0, 9.0], [3.0, 0.5], [8.0, 3.0]),
+    ('modulus', [10.0, -7.0], [3.0, 3.0], [1.0, 2.0]),
+])
+def test_evaluate_batch_matches_execute(calc_type, a_values, b_values, expected_results):
+    """
+    Test that evaluate_batch produces the same results as executing each
+    Calculation individually, with an all-clear error mask.
+    """
+    # Act
+    batch = CalculationFactory.evaluate_batch(calc_type, a_values, b_values)
+
+    # Assert
+    assert list(batch.results) == expected_results
+    assert list(batch.errors) == [0] * len(expected_results)
+    assert [CalculationFactory.create_calculation(calc_type, a, b).execute()
+            for a, b in zip(a_values, b_values)] == expected_results
+
+
+@pytest.mark.parametrize("calc_type, a_values, b_values, expected_errors", [
+    ('divide', [10.0, 1.0, 4.0], [2.0, 0.0, 2.0], [0, 1, 0]),
+    ('modulus', [10.0, 1.0], [0.0, 3.0], [1, 0]),
+    ('power', [0.0, 2.0, -8.0], [0.0, 2.0, 0.5], [1, 0, 1]),
+    ('power', [10.0], [1e6], [1]),
+])
+def test_evaluate_batch_error_mask(calc_type, a_values, b_values, expected_errors):
+    """
+    Test that rows which fail (division or modulus by zero, 0^0, complex results,
+    overflow) are flagged in the error mask and hold nan, while the other rows
+    are still evaluated.
+    """
+    # Act
+    batch = CalculationFactory.evaluate_batch(calc_type, a_values, b_values)
+
+    # Assert
+    assert list(batch.errors) == expected_errors
+    for result, failed in zip(batch.results, batch.errors):
+        assert math.isnan(result) == bool(failed)
+
+
+def test_evaluate_batch_accepts_arrays():
+    """
+    Test that evaluate_batch accepts array.array columns and returns typed arrays.
+    """
+    # Arrange
+    a_values = array.array('d', [1.0, 2.0])
+    b_values = array.array('d', [3.0, 4.0])
+
+    # Act
+    batch = CalculationFactory.evaluate_batch('multiply', a_values, b_values)
+
+    # Assert
+    assert isinstance(batch, BatchResult)
+    assert batch.results == array.array('d', [3.0, 8.0])
+    assert batch.errors.typecode == 'b'
+
+
+def test_evaluate_batch_custom_calculation_without_kernel():
+    """
+    Test that a registered Calculation without an operation_name falls back to
+    executing one Calculation per row.
+    """
+    # Arrange
+    @CalculationFactory.register_calculation('average')
+    class AverageCalculation(Calculation):
+        def execute(self):
+            if self.a < 0:
+                raise ValueError("negative")
+            return (self.a + self.b) / 2
+
+    try:
+        # Act
+        batch = CalculationFactory.evaluate_batch('average', [2.0, -1.0], [4.0, 1.0])
+    finally:
+        CalculationFactory.unregister_calculation('average')
+
+    # Assert
+    assert batch.results[0] == 3.0
+    assert list(batch.errors) == [0, 1]
+
+
+def test_evaluate_batch_length_mismatch():
+    """
+    Test that evaluate_batch rejects operand columns of different lengths.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        CalculationFactory.evaluate_batch('add', [1.0, 2.0], [1.0])
+
+    assert "differ in length" in str(exc_info.value)
+
+
+def test_evaluate_batch_unsupported_type():
+    """
+    Test that evaluate_batch raises the same error as create_calculation for unknown types.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        CalculationFactory.evaluate_batch('unknown', [1.0], [1.0])
+
+    assert "Unsupported calculation type: 'unknown'" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("calc_type, a_values, b_values", [
+    ('add', [1.0, 2.0], [3.0, 4.0]),
+    ('divide', [10.0, 1.0], [2.0, 0.0]),
+    ('modulus', [-7.0, 1.0], [3.0, 0.0]),
+    ('power', [0.0, 2.0, -8.0], [0.0, 3.0, 0.5]),
+])
+def test_evaluate_batch_numpy_matches_python(calc_type, a_values, b_values):
+    """
+    Test that the NumPy path returns the same results and error mask as the
+    pure-Python path. Skipped when NumPy is not installed.
+    """
+    # Arrange
+    numpy = pytest.importorskip('numpy')
+    expected = CalculationFactory.evaluate_batch(calc_type, a_values, b_values)
+
+    # Act
+    batch = CalculationFactory.evaluate_batch(calc_type, numpy.array(a_values), numpy.array(b_values))
+
+    # Assert
+    assert batch.errors.tolist() == [bool(flag) for flag in expected.errors]
+    numpy.testing.assert_array_equal(batch.results, numpy.array(expected.results))
+
+
+def test_evaluate_batch_numpy_is_vectorized():
+    """
+    Test that NumPy arrays of a built-in operation are computed with a ufunc, returning
+    NumPy arrays. Skipped when NumPy is not installed.
+    """
+    # Arrange
+    numpy = pytest.importorskip('numpy')
+
+    # Act
+    batch = CalculationFactory.evaluate_batch('divide', numpy.array([10.0, 1.0]), numpy.array([2.0, 0.0]))
+
+    # Assert
+    assert isinstance(batch.results, numpy.ndarray)
+    assert batch.errors.tolist() == [False, True]
+
+
+def test_evaluate_batch_numpy_subclass_that_overrides_execute():
+    """
+    Test that NumPy arrays of a subclass that overrides `execute` are not computed with
+    its parent's ufunc. Skipped when NumPy is not installed.
+    """
+    # Arrange
+    numpy = pytest.importorskip('numpy')
+
+    @CalculationFactory.register_calculation('double_add')
+    class DoubleAddCalculation(AddCalculation):
+        __slots__ = ()
+
+        def execute(self):
+            return 2 * (self.a + self.b)
+
+    try:
+        # Act
+        batch = CalculationFactory.evaluate_batch('double_add', numpy.array([1.0, 2.0]), numpy.array([2.0, 3.0]))
+    finally:
+        CalculationFactory.unregister_calculation('double_add')
+
+    # Assert
+    assert list(batch.results) == [6.0, 10.0]
+
+
+# -----------------------------------------------------------------------------------
+# Tests for the Slotted Calculation Hierarchy
+# -----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("calc_class", [
+    AddCalculation,
+    SubtractCalculation,
+    MultiplyCalculation,
+    DivideCalculation,
+    PowerCalculation,
+    ModulusCalculation,
+])
+def test_calculations_have_no_instance_dict(calc_class):
+    """
+    Test that the built-in calculations use __slots__ and carry no per-instance __dict__,
+    which keeps each object small.
+    """
+    # Arrange
+    calc = calc_class(10.0, 2.0)
+
+    # Act
+    calc.execute()
+
+    # Assert
+    assert not hasattr(calc, '__dict__')
+    assert sys.getsizeof(calc) <= 64
+
+
+def test_power_calculation_base_exponent_alias_operands():
+    """
+    Test that PowerCalculation stores its operands once, with base/exponent as aliases of a/b.
+    """
+    # Arrange
+    calc = PowerCalculation(2.0, 3.0)
+
+    # Act
+    calc.base = 4.0
+    calc.exponent = 0.5
+
+    # Assert
+    assert (calc.a, calc.b) == (4.0, 0.5)
+    assert (calc.base, calc.exponent) == (4.0, 0.5)
+    assert calc.execute() == 2.0
+
+
+def test_register_calculation_without_slots():
+    """
+    Test that a subclass that does not declare __slots__ can still be registered and used,
+    it simply gets a __dict__ of its own.
+    """
+    # Arrange
+    @CalculationFactory.register_calculation('label')
+    class LabelledAddCalculation(AddCalculation):
+        def __init__(self, a, b):
+            super().__init__(a, b)
+            self.label = 'total'
+
+    try:
+        # Act
+        calc = CalculationFactory.create_calculation('label', 1.0, 2.0)
+    finally:
+        CalculationFactory.unregister_calculation('label')
+
+    # Assert
+    assert calc.execute() == 3.0
+    assert calc.label == 'total'
+
+
+# -----------------------------------------------------------------------------------
+# Tests for the Fast-Path Kernel Dispatch Table
+# -----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("calc_type, a, b", [
+    ('add', 10.0, 5.0),
+    ('subtract', 10.0, 5.0),
+    ('multiply', 10.0, 5.0),
+    ('divide', 10.0, 4.0),
+    ('power', 2.0, 10.0),
+    ('modulus', -7.0, 3.0),
+])
+def test_get_kernel_matches_execute(calc_type, a, b):
+    """
+    Test that each kernel returns the same result as creating and executing the calculation.
+    """
+    # Act
+    kernel = CalculationFactory.get_kernel(calc_type)
+
+    # Assert
+    assert kernel(a, b) == CalculationFactory.create_calculation(calc_type, a, b).execute()
+
+
+@pytest.mark.parametrize("calc_type, a, b, expected_exception, message", [
+    ('divide', 1.0, 0.0, ZeroDivisionError, "Cannot divide by zero."),
+    ('power', 0.0, 0.0, ValueError, "0^0 is undefined."),
+    ('modulus', 1.0, 0.0, ValueError, "Modulus by zero is not allowed."),
+])
+def test_get_kernel_keeps_value_checks(calc_type, a, b, expected_exception, message):
+    """
+    Test that kernels raise the same errors as execute for invalid values.
+    """
+    # Arrange
+    kernel = CalculationFactory.get_kernel(calc_type)
+
+    # Act & Assert
+    with pytest.raises(expected_exception) as exc_info:
+        kernel(a, b)
+    assert str(exc_info.value) == message
+
+
+def test_get_kernel_is_case_insensitive():
+    """
+    Test that get_kernel folds the case of the type like create_calculation does.
+    """
+    assert CalculationFactory.get_kernel('ADD') is CalculationFactory.get_kernel('add')
+
+
+def test_get_kernel_unsupported_type():
+    """
+    Test that get_kernel raises the factory's usual error for unknown types.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        CalculationFactory.get_kernel('unknown')
+
+    assert "Unsupported calculation type: 'unknown'" in str(exc_info.value)
+
+
+def test_get_kernel_for_calculation_without_kernel():
+    """
+    Test that a calculation without a `kernel` attribute gets one that creates and
+    executes the calculation.
+    """
+    # Arrange
+    @CalculationFactory.register_calculation('maximum')
+    class MaximumCalculation(Calculation):
+        def execute(self):
+            return max(self.a, self.b)
+
+    try:
+        # Act
+        kernel = CalculationFactory.get_kernel('maximum')
+
+        # Assert
+        assert kernel(3.0, 7.0) == 7.0
+    finally:
+        CalculationFactory.unregister_calculation('maximum')
+
+
+def test_kernel_of_subclass_that_overrides_execute():
+    """
+    Test that a subclass overriding `execute` does not inherit its parent's kernel, on
+    every fast path, while one that only adds behaviour elsewhere keeps it.
+    """
+    # Arrange
+    @CalculationFactory.register_calculation('double_add')
+    class DoubleAddCalculation(AddCalculation):
+        __slots__ = ()
+
+        def execute(self):
+            return 2 * (self.a + self.b)
+
+    @CalculationFactory.register_calculation('loud_add')
+    class LoudAddCalculation(AddCalculation):
+        __slots__ = ()
+
+        def __str__(self):
+            return super().__str__().upper()
+
+    try:
+        # Act
+        kernel = CalculationFactory.get_kernel('double_add')
+        batch = CalculationFactory.evaluate_batch('double_add', [1.0], [2.0])
+        loud_kernel = CalculationFactory.get_kernel('loud_add')
+    finally:
+        CalculationFactory.unregister_calculation('double_add')
+        CalculationFactory.unregister_calculation('loud_add')
+
+    # Assert
+    assert DoubleAddCalculation(1.0, 2.0).execute() == 6.0
+    assert kernel(1.0, 2.0) == 6.0
+    assert list(batch.results) == [6.0]
+    assert loud_kernel is AddCalculation.kernel
+
+
+def test_registered_types_is_a_copy():
+    """
+    Test that registered_types lists the registered classes, and that changing the
+    returned dictionary does not change the registry.
+    """
+    # Act
+    registered = CalculationFactory.registered_types()
+    registered['plus'] = AddCalculation
+
+    # Assert
+    assert registered['add'] is AddCalculation
+    assert 'plus' not in CalculationFactory.registered_types()
+    with pytest.raises(ValueError):
+        CalculationFactory.get_calculation_class('plus')
+
+
+def test_registry_is_copy_on_write():
+    """
+    Test that registering and unregistering swap in new registries, so a snapshot taken
+    by a reader (e.g. while iterating it) never changes underneath it.
+    """
+    # Arrange
+    snapshot = CalculationFactory.registry()
+    names = list(snapshot.calculations)
+
+    # Act
+    CalculationFactory.register_calculation('plus')(AddCalculation)
+    registered = CalculationFactory.registry()
+    CalculationFactory.unregister_calculation('plus')
+
+    # Assert
+    assert list(snapshot.calculations) == names
+    assert 'plus' not in snapshot.kernels
+    assert registered.calculations['plus'] is AddCalculation
+    assert registered.kernels['plus'] is AddCalculation.kernel
+    assert CalculationFactory.registry() is not registered
+    assert 'plus' not in CalculationFactory.registry().calculations
+
+
+def test_registry_concurrent_registration_and_lookup():
+    """
+    Test that threads registering types while others look types up and iterate the
+    registry neither raise nor lose registrations.
+    """
+    # Arrange
+    import threading
+
+    errors = []
+    names = [f'plus{i}' for i in range(200)]
+    writers_done = threading.Event()
+
+    def register(chunk):
+        for name in chunk:
+            CalculationFactory.register_calculation(name)(AddCalculation)
+
+    def read():
+        try:
+            while not writers_done.is_set():
+                assert CalculationFactory.create_calculation('add', 1.0, 2.0).execute() == 3.0
+                assert CalculationFactory.get_kernel('ADD')(1.0, 2.0) == 3.0
+                registry = CalculationFactory.registry()
+                for name in registry.calculations:
+                    assert name in registry.kernels
+        except Exception as e:  # pragma: no cover - only reached if the test fails
+            errors.append(e)
+
+    writers = [threading.Thread(target=register, args=(names[i::4],)) for i in range(4)]
+    readers = [threading.Thread(target=read) for _ in range(4)]
+
+    try:
+        # Act
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writers_done.set()
+        for thread in readers:
+            thread.join()
+
+        # Assert
+        assert errors == []
+        assert all(CalculationFactory.get_calculation_class(name) is AddCalculation for name in names)
+    finally:
+        for name in names:
+            CalculationFactory.unregister_calculation(name)
+
+
+def test_get_kernel_when_the_type_is_unregistered_during_the_lookup():
+    """
+    Test that get_kernel stays consistent with the class it found when another thread
+    unregisters the type between the class lookup and the kernel lookup, instead of
+    raising KeyError.
+    """
+    # Arrange
+    CalculationFactory.register_calculation('plus')(AddCalculation)
+    get_calculation_class = CalculationFactory.get_calculation_class
+
+    def unregistered_meanwhile(calculation_type):
+        calculation_class = get_calculation_class(calculation_type)
+        CalculationFactory.unregister_calculation(calculation_type)
+        return calculation_class
+
+    # Act
+    with patch.object(CalculationFactory, 'get_calculation_class', unregistered_meanwhile):
+        kernel = CalculationFactory.get_kernel('PLUS', arity=2)
+
+    # Assert
+    assert kernel is AddCalculation.kernel
+    assert 'plus' not in CalculationFactory.registry().calculations
+
+
+def test_freeze_without_plugins():
+    """
+    Test freezing when the plugins have already been looked for and there are none.
+    """
+    # Arrange
+    saved = CalculationFactory._plugins, CalculationFactory._plugins_discovered
+    CalculationFactory._plugins, CalculationFactory._plugins_discovered = {}, True
+
+    try:
+        # Act
+        CalculationFactory.freeze()
+
+        # Assert
+        assert CalculationFactory.create_calculation('add', 1.0, 2.0).execute() == 3.0
+        with pytest.raises(RuntimeError, match="frozen"):
+            CalculationFactory.register_calculation('plus')(AddCalculation)
+    finally:
+        CalculationFactory.frozen = False
+        CalculationFactory._plugins, CalculationFactory._plugins_discovered = saved
+
+
+def test_unregister_calculation_removes_kernel():
+    """
+    Test that unregistering a type removes both its class and its kernel.
+    """
+    # Arrange
+    CalculationFactory.register_calculation('plus')(AddCalculation)
+
+    # Act
+    CalculationFactory.unregister_calculation('PLUS')
+
+    # Assert
+    assert 'plus' not in CalculationFactory.registry().calculations
+    assert 'plus' not in CalculationFactory.registry().kernels
+    with pytest.raises(ValueError) as exc_info:
+        CalculationFactory.unregister_calculation('plus')
+    assert str(exc_info.value) == "Calculation type 'plus' is not registered."
+
+
+# --------------------------------------------------------------------------
+# Test Three-Operand Calculations (PowMod)
+# --------------------------------------------------------------------------
+
+def test_powmod_calculation():
+    """
+    Test PowModCalculation's result, operands and string forms.
+    """
+    # Arrange
+    calculation = PowModCalculation(4.0, 13.0, 497.0)
+
+    # Act
+    result = calculation.execute()
+
+    # Assert
+    assert result == 445
+    assert calculation.arity == 3
+    assert calculation.operands == (4.0, 13.0, 497.0)
+    assert str(calculation) == "PowModCalculation: 4.0 ^ 13.0 mod 497.0 = 445"
+    assert repr(calculation) == "PowModCalculation(base=4.0, exponent=13.0, modulus=497.0)"
+    assert CalculationFactory.get_kernel('powmod')(4, 13, 497) == 445
+
+
+def test_create_calculation_checks_operand_count():
+    """
+    Test that the factory passes extra operands on, and rejects the wrong number of operands.
+    """
+    # Act
+    calculation = CalculationFactory.create_calculation('powmod', '4', '13', '497', backend='int')
+
+    # Assert
+    assert calculation.operands == (4, 13, 497)
+    with pytest.raises(ValueError, match="Calculation type 'powmod' takes 3 operands, got 2."):
+        CalculationFactory.create_calculation('powmod', 4, 13)
+    with pytest.raises(ValueError, match="Calculation type 'add' takes 2 operands, got 3."):
+        CalculationFactory.create_calculation('add', 1, 2, 3)
+
+
+def test_two_operand_batch_paths_reject_powmod(all_calculations):
+    """
+    Test that the two-column batch API rejects a three-operand type up front instead of
+    failing every row, while get_kernel without `arity` still returns its kernel.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="Calculation type 'powmod' takes 3 operands, got 2."):
+        CalculationFactory.evaluate_batch('powmod', [2.0, 3.0], [3.0, 4.0])
+    with pytest.raises(ValueError, match="Calculation type 'POWMOD' takes 3 operands, got 2."):
+        CalculationFactory.get_kernel('POWMOD', arity=2)
+    assert CalculationFactory.get_kernel('add', arity=2)(1.0, 2.0) == 3.0
+    assert CalculationFactory.get_kernel('powmod', arity=3)(4, 13, 497) == 445
@@ -381,4 +381,101 @@ def test_calculator_unexpected_exception(monkeypatch, capsys):
     # Assert
     captured = capsys.readouterr()
     assert "An error occurred during calculation: Mock exception during execution" in captured.out
-    assert "Please try again." in captured.out
\ No newline at end of file
+    assert "Please try again." in captured.out
+
+def test_calculator_enables_line_editing_on_a_terminal(monkeypatch, capsys):
+    """
+    Test that readline-based line editing is only set up when stdin is a terminal.
+
+    AAA Pattern:
+    - Arrange: Provide stdin that claims to be a TTY, and record calls to enable_line_editing.
+    - Act: Call the calculator function.
+    - Assert: Verify that line editing was enabled exactly once.
+    """
+    # Arrange
+    class TerminalInput(StringIO):
+        def isatty(self):
+            return True
+
+    calls = []
+    monkeypatch.setattr('sys.stdin', TerminalInput('exit\n'))
+    monkeypatch.setattr('app.calculator.enable_line_editing', lambda: calls.append(True))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    assert calls == [True]
+
+
+def test_enable_line_editing():
+    """
+    Test that enable_line_editing loads readline (where the platform provides it).
+    """
+    # Arrange
+    import sys
+    from app.calculator import enable_line_editing
+
+    # Act
+    enable_line_editing()
+
+    # Assert
+    assert 'readline' in sys.modules or sys.platform == 'win32'
+
+
+@pytest.mark.parametrize("expression_input, expected_output", [
+    ('eval (10 + 5) * 2 ^ 3 % 7', "Result: (10 + 5) * 2 ^ 3 % 7 = 1.0"),
+    ('EVAL 2 * 3', "Result: 2 * 3 = 6.0"),
+    ('eval 1 / 0', "Cannot divide by zero."),
+    ('eval 0 ^ 0', "An error occurred during calculation: 0^0 is undefined."),
+    ('eval 1 +', "Invalid expression: Unexpected end of expression"),
+    ('eval x + 1', "Invalid expression: Unbound variable: 'x'"),
+])
+@pytest.mark.usefixtures('all_calculations')
+def test_calculator_eval_command(monkeypatch, capsys, expression_input, expected_output):
+    """
+    Test the calculator's 'eval' command for multi-operand formulas.
+
+    AAA Pattern:
+    - Arrange: Prepare an 'eval' line followed by 'exit'.
+    - Act: Call the calculator function.
+    - Assert: Verify the result or error message is displayed.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO(f'{expression_input}\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    assert expected_output in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("user_input, expected_output", [
+    ('powmod 4 13 497', "Result: PowModCalculation: 4.0 ^ 13.0 mod 497.0 = 445"),
+    ('powmod 2 1000000000000 1000000007', f"= {pow(2, 10 ** 12, 1_000_000_007)}"),
+    ('powmod 4 13', "Calculation type 'powmod' takes 3 operands, got 2."),
+    ('powmod 4.5 13 497', "An error occurred during calculation: powmod operands must be whole numbers."),
+    ('powmod 4 13 x', "Invalid input. Please follow the format: <operation> <num1> <num2>"),
+])
+@pytest.mark.usefixtures('all_calculations')
+def test_calculator_powmod(monkeypatch, capsys, user_input, expected_output):
+    """
+    Test the calculator's three-operand 'powmod' operation.
+
+    AAA Pattern:
+    - Arrange: Prepare a powmod line followed by 'exit'.
+    - Act: Call the calculator function.
+    - Assert: Verify the result or error message is displayed.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO(f'{user_input}\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    assert expected_output in capsys.readouterr().out
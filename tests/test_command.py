@@ -0,0 +1,101 @@
+# tests/test_command.py
+
+"""
+Unit tests for the app/command module (the REPL's single-pass line tokenizer).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+
+from app.calculator import calculator
+from app.command import Command, CommandError, parse_command
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("add 1 2", Command('add', '', (1.0, 2.0))),
+    ("  ADD   1e3  -2 ", Command('add', '', (1000.0, -2.0))),
+    ("powmod 4 13 497", Command('powmod', '', (4.0, 13.0, 497.0))),
+    ("help", Command('help')),
+    ("HISTORY Tail 5", Command('history', 'Tail 5')),
+    ("eval  (1 +  2) * x ", Command('eval', '(1 +  2) * x')),
+    ("   ", Command('')),
+])
+def test_parse_command(line, expected):
+    """
+    Test that lines are classified, the operation lowered and the operands parsed,
+    and that a command's argument is kept as typed.
+    """
+    # Act
+    command = parse_command(line)
+
+    # Assert
+    assert command == expected
+    assert command.is_calculation == bool(expected.operands)
+
+
+def test_parse_command_uses_the_given_parser():
+    """
+    Test that operands are parsed with the given function (e.g. a numeric backend).
+    """
+    # Act
+    command = parse_command("divide 1 3", Decimal)
+
+    # Assert
+    assert command.operands == (Decimal(1), Decimal(3))
+
+
+@pytest.mark.parametrize("line, message, position", [
+    ("add 1 x", "Not a number: 'x'", 6),
+    ("add  x   1", "Not a number: 'x'", 5),
+    ("add 1", "Expected <operation> <num1> <num2>", 6),
+    ("add", "Expected <operation> <num1> <num2>", 4),
+    ("help me", "'help' takes no arguments", 5),
+    ("exit  now please", "'exit' takes no arguments", 6),
+])
+def test_parse_command_errors(line, message, position):
+    """
+    Test that invalid lines raise a CommandError saying what is wrong and where.
+    """
+    # Act
+    with pytest.raises(CommandError) as exc_info:
+        parse_command(line)
+
+    # Assert
+    assert str(exc_info.value) == message
+    assert exc_info.value.position == position
+    assert isinstance(exc_info.value, ValueError)
+
+
+def test_command_error_pointer():
+    """
+    Test that pointer() shows the line with a caret under the problem.
+    """
+    # Arrange
+    error = CommandError("Not a number: 'x'", 6)
+
+    # Act
+    pointer = error.pointer("add 1 x")
+
+    # Assert
+    assert pointer == "    add 1 x\n          ^ Not a number: 'x'"
+
+
+def test_calculator_points_at_invalid_operand(monkeypatch, capsys):
+    """
+    Test that the REPL shows where an invalid line went wrong.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('add 1 x\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Invalid input. Please follow the format: <operation> <num1> <num2>\n" in captured.out
+    assert "    add 1 x\n          ^ Not a number: 'x'\n" in captured.out
@@ -0,0 +1,244 @@
+# tests/test_expression.py
+
+"""
+Unit tests for the app/expression module (multi-operand formula engine).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+import app.expression as expression_module
+from app.expression import (
+    CalculationNode,
+    Expression,
+    ExpressionError,
+    NegateNode,
+    NumberNode,
+    VariableNode,
+    cache_info,
+    compile_expression,
+    evaluate,
+    parse,
+)
+
+# Formulas use every operator, so every built-in calculation must be registered.
+pytestmark = pytest.mark.usefixtures('all_calculations')
+
+
+# -----------------------------------------------------------------------------------
+# Test Parsing
+# -----------------------------------------------------------------------------------
+
+def test_parse_builds_calculation_tree():
+    """
+    Test that operators become CalculationNodes named after the calculation types.
+    """
+    # Act
+    tree = parse('1 + x * 2')
+
+    # Assert
+    assert tree == CalculationNode(
+        'add', NumberNode(1.0), CalculationNode('multiply', VariableNode('x'), NumberNode(2.0))
+    )
+
+
+@pytest.mark.parametrize("source, expected", [
+    ('1 + 2 * 3', 7.0),
+    ('(1 + 2) * 3', 9.0),
+    ('10 - 4 - 3', 3.0),
+    ('100 / 10 / 5', 2.0),
+    ('2 ^ 3 ^ 2', 512.0),
+    ('-2 ^ 2', -4.0),
+    ('2 ^ -1', 0.5),
+    ('+5 - -3', 8.0),
+    ('17 % 5 * 2', 4.0),
+    ('1.5e2 + .5', 150.5),
+    ('(10 + 5) * 2 ^ 3 % 7', 1.0),
+])
+def test_operator_precedence_and_associativity(source, expected):
+    """
+    Test precedence (^ over unary minus over * / % over + -) and associativity.
+    """
+    assert evaluate(source) == expected
+
+
+@pytest.mark.parametrize("source, message, position", [
+    ('1 +', "Unexpected end of expression", 3),
+    ('(1 + 2', "Unexpected end of expression", 6),
+    ('1 $ 2', "Unexpected '$' at position 2", 2),
+    (')', "Unexpected ')' at position 0", 0),
+    ('1 2', "Unexpected '2' at position 2", 2),
+    ('', "Unexpected end of expression", 0),
+])
+def test_parse_errors_report_position(source, message, position):
+    """
+    Test that invalid expressions raise ExpressionError with the offending position.
+    """
+    with pytest.raises(ExpressionError) as exc_info:
+        parse(source)
+
+    assert str(exc_info.value) == message
+    assert exc_info.value.position == position
+
+
+# -----------------------------------------------------------------------------------
+# Test Evaluation
+# -----------------------------------------------------------------------------------
+
+def test_evaluate_with_bindings():
+    """
+    Test that variables can be bound by mapping, by keyword, or both.
+    """
+    # Arrange
+    expression = compile_expression('(a + b) * c ^ 2 % m')
+
+    # Act & Assert
+    assert expression.variables == frozenset({'a', 'b', 'c', 'm'})
+    assert expression.evaluate(a=1, b=2, c=3, m=5) == 2.0
+    assert expression({'a': 1, 'b': 2, 'c': 3}, m=7) == 6.0
+
+
+def test_evaluate_unbound_variable():
+    """
+    Test that evaluating without a needed variable raises ExpressionError.
+    """
+    with pytest.raises(ExpressionError) as exc_info:
+        evaluate('x + 1')
+
+    assert str(exc_info.value) == "Unbound variable: 'x'"
+
+
+@pytest.mark.parametrize("source, bindings", [
+    ('x + y * 2 - (x ^ 2) / y % 3', {'x': 3.0, 'y': 4.0}),
+    ('-(x - 10) * 2', {'x': 4.0}),
+    ('2 * x', {'x': 5.0}),
+    ('x / 4', {'x': 5.0}),
+    ('-x', {'x': 5.0}),
+])
+def test_compiled_matches_tree_evaluation(source, bindings):
+    """
+    Test that the compiled closures give the same result as evaluating the tree of
+    Calculation objects directly.
+    """
+    # Arrange
+    expression = compile_expression(source)
+
+    # Act & Assert
+    assert expression.evaluate(bindings) == expression.tree.evaluate(bindings)
+
+
+def test_tree_evaluation_unbound_variable():
+    """
+    Test that evaluating the tree directly also reports unbound variables.
+    """
+    with pytest.raises(ExpressionError):
+        parse('-y').evaluate({})
+
+
+def test_constant_subexpressions_are_folded():
+    """
+    Test that number-only sub-expressions are computed once at compile time,
+    not on every evaluation.
+    """
+    # Arrange
+    calls = []
+
+    def counting_power(base, exponent):
+        calls.append((base, exponent))
+        return base ** exponent
+
+    get_kernel = expression_module.CalculationFactory.get_kernel
+
+    def patched_get_kernel(name, arity=None):
+        return counting_power if name == 'power' else get_kernel(name, arity)
+
+    with patch.object(expression_module.CalculationFactory, 'get_kernel', patched_get_kernel):
+        expression = Expression('x * (2 ^ 10 - -1)')
+
+    # Act
+    results = [expression.evaluate(x=x) for x in (1.0, 2.0, 3.0)]
+
+    # Assert
+    assert calls == [(2.0, 10.0)]
+    assert results == [1025.0, 2050.0, 3075.0]
+    assert Expression('2 * 3').evaluate() == 6.0
+
+
+@pytest.mark.parametrize("source, expected_exception", [
+    ('1 / 0', ZeroDivisionError),
+    ('0 ^ 0', ValueError),
+    ('x % 0', ValueError),
+])
+def test_errors_are_raised_at_evaluation_time(source, expected_exception):
+    """
+    Test that operation errors (even in constant parts) surface when evaluating.
+    """
+    # Arrange
+    expression = compile_expression(source)
+
+    # Act & Assert
+    for _ in range(2):
+        with pytest.raises(expected_exception):
+            expression.evaluate(x=1.0)
+
+
+def test_compile_expression_caches_by_source():
+    """
+    Test that compiling the same source twice returns the cached Expression.
+    """
+    # Arrange
+    source = 'cache_test_variable * 2'
+    hits_before = cache_info().hits
+
+    # Act
+    first = compile_expression(source)
+    second = compile_expression(source)
+
+    # Assert
+    assert first is second
+    assert cache_info().hits == hits_before + 1
+    assert repr(first) == "Expression('cache_test_variable * 2')"
+
+
+def test_compile_expression_recompiles_after_registry_change():
+    """
+    Test that a cached Expression compiled against an older registry is not reused,
+    so it never calls a kernel that has since been replaced.
+    """
+    # Arrange
+    factory = expression_module.CalculationFactory
+    source = 'registry_test_variable + 1'
+    before = compile_expression(source)
+    original = factory.get_calculation_class('add')
+
+    class TenfoldAddCalculation(original):
+        __slots__ = ()
+
+        def execute(self):
+            return 10 * (self.a + self.b)
+
+    factory.unregister_calculation('add')
+    factory.register_calculation('add')(TenfoldAddCalculation)
+    try:
+        # Act
+        after = compile_expression(source)
+        result = evaluate(source, registry_test_variable=1.0)
+    finally:
+        factory.unregister_calculation('add')
+        factory.register_calculation('add')(original)
+
+    # Assert
+    assert after is not before
+    assert after.registry is not before.registry
+    assert before.evaluate(registry_test_variable=1.0) == 2.0
+    assert result == 20.0
+
+
+def test_negate_node_evaluate():
+    """
+    Test that a NegateNode negates its operand when evaluated directly.
+    """
+    assert NegateNode(NumberNode(3.0)).evaluate({}) == -3.0
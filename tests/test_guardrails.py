@@ -0,0 +1,266 @@
+# tests/test_guardrails.py
+
+"""
+Unit tests for the app/guardrails module (cost limits on expensive powers), and the
+places that apply them: Operation.power, the batch kernel and the worker pool's slow lane.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import time
+from concurrent.futures import Future
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app import guardrails, metrics
+from app.calculation import CalculationFactory
+from app.guardrails import PowerLimits, check_power, configure, estimate_power_bits, needs_slow_lane
+from app.history import History
+from app.metrics import Metrics
+from app.operations import Operation
+from app.pool import CalculationPool, WorkerProcesses
+
+
+class SynchronousExecutor:
+    """An executor that runs every job as soon as it is submitted, and remembers them."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append(args)
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+@pytest.fixture(autouse=True)
+def default_limits(monkeypatch):
+    """
+    Fixture that restores the default limits after every test.
+    """
+    monkeypatch.setattr(guardrails, 'limits', PowerLimits())
+
+
+@pytest.fixture
+def active_metrics():
+    """
+    Fixture that switches instrumentation on for one test and off again afterwards.
+    """
+    yield metrics.enable(Metrics())
+    metrics.disable()
+
+
+@pytest.mark.parametrize("base, exponent, expected", [
+    (2, 200, 200.0),
+    (Fraction(1, 2), 10, 10.0),
+    (Fraction(-3, 4), -8, pytest.approx(8 * (1.5849625 + 2))),
+    (1, 10 ** 100, 0.0),
+    (-1, 10 ** 100, 0.0),
+    (0, 5, 0.0),
+    (10, -5, 0.0),
+    (2.0, 10 ** 6, 0.0),
+    (2, 0.5, 0.0),
+    (Fraction(2), Fraction(1, 2), 0.0),
+    (Decimal(10), Decimal(10 ** 6), 0.0),
+])
+def test_estimate_power_bits(base, exponent, expected):
+    """
+    Test that only exact results are estimated, as their size in bits.
+    """
+    # Act & Assert
+    assert estimate_power_bits(base, exponent) == expected
+
+
+def test_estimate_power_bits_of_huge_exponent():
+    """
+    Test that an exponent too large for a float is estimated as infinitely expensive.
+    """
+    # Act & Assert
+    assert estimate_power_bits(3, 10 ** 400) == float('inf')
+
+
+def test_check_power_rejects_and_counts(active_metrics):
+    """
+    Test that check_power rejects results above max_bits, and counts the rejections.
+    """
+    # Act
+    check_power(2, 1000)
+    with pytest.raises(ValueError, match=r"Power result too large: about 3,000,000 bits \(the limit is 2,097,152\)\."):
+        check_power(2, 3_000_000)
+
+    # Assert
+    snapshot, = active_metrics.snapshot()
+    assert (snapshot.stage, snapshot.name, snapshot.calls) == ('guard', 'power rejected', 1)
+
+
+def test_check_power_without_metrics():
+    """
+    Test that rejecting works with instrumentation off.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError):
+        check_power(10, 10 ** 7)
+
+
+def test_operation_power_applies_the_limit():
+    """
+    Test that Operation.power refuses exact results over the limit but not floats.
+    """
+    # Arrange
+    configure(max_bits=100)
+
+    # Act & Assert
+    assert Operation.power(2, 100) == 2 ** 100
+    assert Operation.power(2.0, 200.0) == 2.0 ** 200
+    with pytest.raises(ValueError, match="Power result too large"):
+        Operation.power(2, 101)
+
+
+def test_batch_kernel_applies_the_limit(all_calculations):
+    """
+    Test that batch evaluation reports powers over the limit as failed rows.
+    """
+    # Arrange
+    configure(max_bits=100)
+    kernel = CalculationFactory.get_kernel('power')
+
+    # Act & Assert
+    assert kernel(2, 100) == 2 ** 100
+    with pytest.raises(ValueError):
+        kernel(Fraction(1, 2), 200)
+
+
+def test_configure():
+    """
+    Test that configure changes the limits, keeps the ones not given, and lowers
+    slow_bits along with max_bits.
+    """
+    # Act & Assert
+    assert configure(slow_bits=10) == PowerLimits(10, 1 << 21)
+    assert configure(max_bits=500) == PowerLimits(10, 500)
+    assert configure(max_bits=5) == PowerLimits(5, 5)
+    assert guardrails.limits == PowerLimits(5, 5)
+
+
+@pytest.mark.parametrize("slow_bits, max_bits, message", [
+    (-1, None, "Power limits cannot be negative."),
+    (10, 5, "The slow-lane limit cannot be above the maximum."),
+])
+def test_configure_rejects_invalid_limits(slow_bits, max_bits, message):
+    """
+    Test that configure refuses negative limits and a slow lane above the maximum.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        configure(slow_bits, max_bits)
+    assert guardrails.limits == PowerLimits()
+
+
+def test_needs_slow_lane(all_calculations, active_metrics):
+    """
+    Test that only powers between slow_bits and max_bits go to the slow lane, and
+    that those are counted.
+    """
+    # Arrange
+    configure(slow_bits=100, max_bits=1000)
+    create = CalculationFactory.create_calculation
+
+    # Act
+    lanes = [needs_slow_lane(create('power', 2, 50)), needs_slow_lane(create('power', 2, 500)),
+             needs_slow_lane(create('power', 2, 5000)), needs_slow_lane(create('multiply', 2, 500))]
+
+    # Assert
+    assert lanes == [False, True, False, False]
+    snapshot, = [snapshot for snapshot in active_metrics.snapshot() if snapshot.stage == 'guard']
+    assert (snapshot.name, snapshot.calls) == ('power slow lane', 1)
+
+
+def test_needs_slow_lane_without_metrics(all_calculations):
+    """
+    Test that the slow lane is chosen with instrumentation off too.
+    """
+    # Arrange
+    configure(slow_bits=100)
+
+    # Act & Assert
+    assert needs_slow_lane(CalculationFactory.create_calculation('power', 2, 500))
+
+
+def test_pool_runs_expensive_powers_in_the_slow_lane(all_calculations):
+    """
+    Test that the pool sends expensive powers to its slow lane, and the rest to its workers.
+    """
+    # Arrange
+    configure(slow_bits=100)
+    workers, slow_lane = SynchronousExecutor(), SynchronousExecutor()
+    output = []
+    pool = CalculationPool(History(number_type=int), executor=workers, slow_lane=slow_lane, output=output.append)
+
+    # Act
+    pool.submit(CalculationFactory.create_calculation('power', 2, 500))
+    pool.submit(CalculationFactory.create_calculation('power', 2, 5))
+
+    # Assert
+    assert (len(workers.submitted), len(slow_lane.submitted)) == (1, 1)
+    assert output[0] == "[1] Started in the slow lane.\n"
+    assert output[2] == "[2] Started.\n"
+    assert len(pool.history) == 2
+
+
+def test_pool_starts_a_slow_lane_process_when_needed(all_calculations):
+    """
+    Test that the default slow lane runs the calculation in a worker process, started
+    on first use and stopped with the pool, and that the result computed there is the
+    one shown and recorded.
+    """
+    # Arrange
+    configure(slow_bits=100)
+    pool = CalculationPool(History(number_type=int), executor=SynchronousExecutor(), output=lambda message: None)
+
+    # Act
+    pool.submit(CalculationFactory.create_calculation('power', 2, 500))
+    finished = pool.wait(5)
+    pool.shutdown()
+    pool._slow_lane._threads[0].join(5)
+
+    # Assert
+    assert finished is True
+    assert isinstance(pool._slow_lane, WorkerProcesses)
+    assert pool.history[0].execute() == 2 ** 500
+
+
+@pytest.mark.parametrize("give_up, message", [
+    (lambda pool: None, "[1] Timed out after 0.2s.\n"),
+    (lambda pool: pool.cancel(1), "[1] Cancelled.\n"),
+])
+def test_pool_stops_a_slow_lane_calculation(all_calculations, give_up, message):
+    """
+    Test that a timeout or cancel kills the slow-lane process of a calculation that is
+    still running, instead of leaving it to finish.
+    """
+    # Arrange
+    configure(slow_bits=100)
+    output = []
+    pool = CalculationPool(History(number_type=int), timeout=0.2, execute=lambda calculation: time.sleep(60),
+                           executor=SynchronousExecutor(), output=output.append)
+    pool.submit(CalculationFactory.create_calculation('power', 2, 500))
+    future = pool._jobs[1].future
+    for _ in range(500):
+        if pool._slow_lane._processes:
+            break  # The calculation is running in its process.
+        time.sleep(0.01)
+
+    # Act
+    give_up(pool)
+    finished = pool.wait(5)
+    error = future.exception(5)
+    pool.shutdown()
+
+    # Assert
+    assert finished is True
+    assert output == ["[1] Started in the slow lane.\n", message]
+    assert str(error) == "The worker process stopped with exit code -9."
+    assert len(pool.history) == 0
@@ -0,0 +1,584 @@
+# tests/test_history.py
+
+"""
+Unit tests for the app/history module (columnar History store).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from app.calculation import (
+    PowModCalculation,
+    AddCalculation,
+    DivideCalculation,
+    PowerCalculation,
+    SubtractCalculation,
+)
+from app.calculator import HISTORY_USAGE, calculator, display_history, history_pages, history_range
+from app.history import MAX_OPERATION_TYPES, History, registered_name
+from app.query import Query
+from app.operations import Operation
+
+
+def make_history(*calculations, maxlen=None):
+    """Helper that builds a History from the given calculations."""
+    history = History(maxlen=maxlen)
+    for calculation in calculations:
+        history.append(calculation)
+    return history
+
+
+def test_registered_name():
+    """
+    Test that a class is named by its registration, or by its class name if it has none.
+    """
+    # Arrange
+    class UnregisteredCalculation(AddCalculation):
+        __slots__ = ()
+
+    # Act
+    names = registered_name(AddCalculation), registered_name(UnregisteredCalculation)
+
+    # Assert
+    assert names == ('add', 'UnregisteredCalculation')
+
+
+def test_history_append_and_index():
+    """
+    Test that appended calculations come back with the same type, operands and result.
+    """
+    # Arrange
+    history = make_history(AddCalculation(10.0, 5.0), PowerCalculation(2.0, 3.0))
+
+    # Act
+    first = history[0]
+    last = history[-1]
+
+    # Assert
+    assert len(history) == 2
+    assert isinstance(first, AddCalculation)
+    assert (first.a, first.b, first.execute()) == (10.0, 5.0, 15.0)
+    assert isinstance(last, PowerCalculation)
+    assert (last.base, last.exponent, last.execute()) == (2.0, 3.0, 8.0)
+
+
+def test_history_does_not_recompute_results():
+    """
+    Test that reading entries back reuses the stored result instead of executing again.
+    """
+    # Arrange
+    history = make_history(AddCalculation(1.0, 2.0))
+
+    # Act
+    with patch.object(Operation, 'addition') as mock_addition:
+        text = str(history[0])
+
+    # Assert
+    mock_addition.assert_not_called()
+    assert text == "AddCalculation: 1.0 Add 2.0 = 3.0"
+
+
+def test_history_index_out_of_range():
+    """
+    Test that indexing past either end raises IndexError.
+    """
+    # Arrange
+    history = make_history(AddCalculation(1.0, 2.0))
+
+    # Act & Assert
+    with pytest.raises(IndexError):
+        history[1]
+    with pytest.raises(IndexError):
+        history[-2]
+
+
+def test_history_slicing_and_iteration():
+    """
+    Test that slicing returns a list of calculations and iteration yields every entry in order.
+    """
+    # Arrange
+    history = make_history(*(AddCalculation(float(i), 1.0) for i in range(5)))
+
+    # Act
+    sliced = history[1:4:2]
+    iterated = [calculation.a for calculation in history]
+
+    # Assert
+    assert [calculation.a for calculation in sliced] == [1.0, 3.0]
+    assert iterated == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_history_ring_buffer_keeps_most_recent():
+    """
+    Test that a bounded history drops the oldest entries once it is full.
+    """
+    # Arrange
+    history = make_history(*(SubtractCalculation(float(i), 0.0) for i in range(7)), maxlen=3)
+
+    # Act
+    operands = [calculation.a for calculation in history]
+
+    # Assert
+    assert len(history) == 3
+    assert operands == [4.0, 5.0, 6.0]
+    assert history[0].a == 4.0
+    assert history[-1].a == 6.0
+    assert [calculation.a for calculation in history[::-1]] == [6.0, 5.0, 4.0]
+
+
+def test_history_ring_buffer_wraps_back_to_start():
+    """
+    Test that the ring buffer stays in order after wrapping around exactly once.
+    """
+    # Arrange
+    history = make_history(*(AddCalculation(float(i), 0.0) for i in range(4)), maxlen=2)
+
+    # Act & Assert
+    assert [calculation.a for calculation in history] == [2.0, 3.0]
+
+
+def test_history_keeps_extra_operands():
+    """
+    Test that three-operand calculations keep their third operand, including when a
+    ring buffer overwrites them with two-operand calculations.
+    """
+    # Arrange
+    history = make_history(PowModCalculation(4.0, 13.0, 497.0), AddCalculation(1.0, 2.0), maxlen=2)
+
+    # Act
+    stored = history[0]
+    history.append(AddCalculation(3.0, 4.0))
+
+    # Assert
+    assert stored.operands == (4.0, 13.0, 497.0)
+    assert stored.execute() == 445  # Stored with the entry, not recomputed.
+    assert [calculation.operands for calculation in history] == [(1.0, 2.0), (3.0, 4.0)]
+
+
+def test_history_keeps_values_the_float_columns_cannot_hold():
+    """
+    Test that a complex result and an integer too large for a float are stored as they
+    are, including when a ring buffer later overwrites them.
+    """
+    # Arrange
+    history = make_history(PowerCalculation(-8.0, 0.5), AddCalculation(10 ** 400, 1), maxlen=2)
+
+    # Act
+    stored = history[:]
+    found = history.search(Query(min_result=0.0))
+    history.append(AddCalculation(1.0, 2.0))
+
+    # Assert
+    assert stored[0].execute() == (-8.0) ** 0.5
+    assert (stored[1].a, stored[1].execute()) == (10 ** 400, 10 ** 400 + 1)
+    assert history.aggregates.skipped == 2
+    assert found == [1]
+    assert [calculation.execute() for calculation in history] == [10 ** 400 + 1, 3.0]
+    history.append(AddCalculation(3.0, 4.0))
+    assert history._objects == {}
+    assert history.search(Query(min_result=5.0)) == [1]
+
+
+def test_history_keeps_integer_results_exact():
+    """
+    Test that an integer result comes back exactly, and as an int: a float column
+    would round a big one and turn a small one into a float.
+    """
+    # Arrange
+    exact = pow(3, 1000, int(1e300))
+    history = make_history(PowModCalculation(3.0, 1000.0, 1e300), AddCalculation(1, 2))
+
+    # Act
+    results = [calculation.execute() for calculation in history]
+
+    # Assert
+    assert results == [exact, 3]
+    assert [type(result) for result in results] == [int, int]
+    assert history.search(Query(min_result=float(exact))) == [0]
+
+
+def test_calculator_history_with_exact_integer_result(monkeypatch, capsys, all_calculations):
+    """
+    Test that the history command lists a powmod result exactly as the prompt printed it.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('powmod 3 1000 1e300\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    listed = capsys.readouterr().out.split("Calculation History:")[1]
+    assert f"= {pow(3, 1000, int(1e300))}" in listed
+
+
+def test_calculator_history_with_complex_result(monkeypatch, capsys, all_calculations):
+    """
+    Test that a complex result is recorded and listed by the history command (a failed
+    append used to leave the columns out of step, and `history` then crashed).
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('power -8 0.5\nadd 1 2\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    listed = capsys.readouterr().out.split("Calculation History:")[1]
+    assert f"1. PowerCalculation: -8.0 Power 0.5 = {(-8.0) ** 0.5}" in listed
+    assert "2. AddCalculation: 1.0 Add 2.0 = 3.0" in listed
+
+
+def test_history_clear():
+    """
+    Test that clear empties the history but keeps its maxlen.
+    """
+    # Arrange
+    history = make_history(AddCalculation(1.0, 2.0), maxlen=5)
+
+    # Act
+    history.clear()
+
+    # Assert
+    assert len(history) == 0
+    assert history.maxlen == 5
+    assert repr(history) == "History(len=0, maxlen=5)"
+
+
+def test_history_invalid_maxlen():
+    """
+    Test that a maxlen below 1 is rejected.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        History(maxlen=0)
+
+    assert str(exc_info.value) == "maxlen must be at least 1."
+
+
+def test_history_rejects_failing_calculation():
+    """
+    Test that a calculation that cannot be executed is not recorded.
+    """
+    # Arrange
+    history = History()
+
+    # Act & Assert
+    with pytest.raises(ZeroDivisionError):
+        history.append(DivideCalculation(1.0, 0.0))
+    assert len(history) == 0
+
+
+def test_history_operation_type_limit(monkeypatch):
+    """
+    Test that more operation types than the op-code column can hold are rejected.
+    """
+    # Arrange
+    monkeypatch.setattr('app.history.MAX_OPERATION_TYPES', 1)
+    history = make_history(AddCalculation(1.0, 2.0))
+
+    # Act & Assert
+    with pytest.raises(ValueError) as exc_info:
+        history.append(SubtractCalculation(1.0, 2.0))
+    assert "at most 1 operation types" in str(exc_info.value)
+    assert MAX_OPERATION_TYPES == 256
+
+
+def test_display_history_with_history(capsys):
+    """
+    Test that display_history prints a History the same way it prints a list.
+    """
+    # Arrange
+    history = make_history(AddCalculation(10.0, 5.0), SubtractCalculation(20.0, 3.0))
+
+    # Act
+    display_history(history)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "1. AddCalculation: 10.0 Add 5.0 = 15.0" in captured.out
+    assert "2. SubtractCalculation: 20.0 Subtract 3.0 = 17.0" in captured.out
+
+
+def test_display_history_empty_history(capsys):
+    """
+    Test that an empty History prints the 'no calculations' message.
+    """
+    # Act
+    display_history(History())
+
+    # Assert
+    assert "No calculations performed yet." in capsys.readouterr().out
+
+
+def test_calculator_max_history(monkeypatch, capsys):
+    """
+    Test that the REPL's history keeps only max_history entries.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('add 1 1\nadd 2 2\nadd 3 3\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(max_history=2)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "1. AddCalculation: 2.0 Add 2.0 = 4.0" in captured.out
+    assert "2. AddCalculation: 3.0 Add 3.0 = 6.0" in captured.out
+    assert "1.0 Add 1.0" not in captured.out.split("Calculation History:")[1]
+
+
+def test_history_aggregates_updated_on_append():
+    """
+    Test that the running aggregates follow every append, per operation and overall,
+    and keep counting entries a bounded history has dropped.
+    """
+    # Arrange
+    history = History(maxlen=2)
+
+    # Act
+    for calculation in (AddCalculation(1.0, 2.0), DivideCalculation(9.0, 3.0), AddCalculation(5.0, 5.0)):
+        history.append(calculation)
+
+    # Assert
+    assert len(history) == 2
+    assert history.aggregates.overall.count == 3
+    assert history.aggregates.overall.total == 16.0
+    assert history.aggregates.by_operation['add'].maximum == 10.0
+    assert history.aggregates.by_operation['divide'].mean == 3.0
+    history.clear()
+    assert history.aggregates.overall.count == 0
+
+
+def test_history_aggregates_unregistered_class():
+    """
+    Test that a calculation class that is not registered is aggregated under its class name.
+    """
+    # Arrange
+    class HalfCalculation(AddCalculation):
+        __slots__ = ()
+
+        def execute(self):
+            return self.a / 2
+
+    history = History()
+
+    # Act
+    history.append(HalfCalculation(8.0, 0.0))
+
+    # Assert
+    assert history.aggregates.by_operation['HalfCalculation'].total == 4.0
+
+
+def test_calculator_summary(monkeypatch, capsys):
+    """
+    Test the REPL's summary command.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('summary\nadd 1 2\nmultiply 2 4\nsummary\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "No calculations performed yet." in captured.out
+    assert "Summary of 2 calculations:" in captured.out
+    assert "all: count=2, sum=11.0, mean=5.5, min=3.0, max=8.0, variance=6.25" in captured.out
+    assert "multiply: count=1, sum=8.0" in captured.out
+
+
+def test_history_search():
+    """
+    Test searching by operation and result, and that the index follows later appends.
+    """
+    # Arrange
+    history = History()
+    history.append(DivideCalculation(4e6, 2.0), timestamp=10.0)
+    history.append(AddCalculation(1.0, 2.0), timestamp=20.0)
+    history.append(DivideCalculation(1.0, 2.0), timestamp=30.0)
+
+    # Act
+    large = history.search(Query(operation='divide', min_result=1e6))
+    history.append(DivideCalculation(9e6, 1.0), timestamp=40.0)
+    large_after_append = history.search(Query(operation='divide', min_result=1e6))
+    recent = history.search(Query(since=25.0))
+
+    # Assert
+    assert large == [0]
+    assert large_after_append == [0, 3]
+    assert recent == [2, 3]
+    assert history[large_after_append[1]].execute() == 9e6
+
+
+def test_history_search_bounded_history():
+    """
+    Test that a bounded history's search only finds the entries it still holds, and
+    returns their current indexes.
+    """
+    # Arrange
+    history = History(maxlen=3)
+    history.append(AddCalculation(1.0, 1.0), timestamp=1.0)
+    history.search(Query())
+
+    # Act
+    for i in range(2, 8):
+        history.append(AddCalculation(float(i), float(i)), timestamp=float(i))
+    matches = history.search(Query(operation='add', max_result=12.0))
+
+    # Assert
+    assert [history[i].a for i in history.search(Query())] == [5.0, 6.0, 7.0]
+    assert matches == [0, 1]
+    assert history.search(Query(until=6.0)) == [0]
+
+
+def test_history_timestamp():
+    """
+    Test reading back when each calculation was appended.
+    """
+    # Arrange
+    history = History()
+    history.append(AddCalculation(1.0, 1.0), timestamp=123.0)
+    history.append(AddCalculation(2.0, 2.0))
+
+    # Act / Assert
+    assert history.timestamp(0) == 123.0
+    assert history.timestamp(-1) > 123.0
+    with pytest.raises(IndexError, match="History index out of range."):
+        history.timestamp(2)
+
+
+def test_calculator_find(monkeypatch, capsys):
+    """
+    Test the REPL's find command.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO(
+        'add 1 2\ndivide 9 3\nadd 5 5\nfind add result>5\nfind divide last 1\nfind subtract\nfind last\nexit\n'
+    ))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Found 1 calculations:\n3. AddCalculation: 5.0 Add 5.0 = 10.0" in captured.out
+    assert "2. DivideCalculation: 9.0 Divide 3.0 = 3.0" in captured.out
+    assert "No matching calculations." in captured.out
+    assert "Usage: find" in captured.out
+
+
+@pytest.mark.parametrize("arguments, expected", [
+    ("", (0, 25)),
+    (" 10", (0, 10)),
+    ("100", (0, 25)),
+    ("tail", (15, 25)),
+    ("tail 3", (22, 25)),
+    ("tail 100", (0, 25)),
+    ("--from 5 --to 8", (4, 8)),
+    ("--to 8 --from 5", (4, 8)),
+    ("--from 20", (19, 25)),
+    ("--from 30", (29, 25)),
+    ("--to 3", (0, 3)),
+])
+def test_history_range(arguments, expected):
+    """
+    Test which entries each form of the history command selects from a 25-entry history.
+    """
+    # Act / Assert
+    assert history_range(arguments, 25) == expected
+
+
+@pytest.mark.parametrize("arguments", [
+    "0", "ten", "tail 0", "tail 1 2", "--from", "--from 0", "--from 5 --to 4", "--from 1 --from 2", "--last 3", "1 2",
+])
+def test_history_range_rejects_invalid_arguments(arguments):
+    """
+    Test that invalid history arguments raise ValueError with the usage message.
+    """
+    # Act / Assert
+    with pytest.raises(ValueError, match=r"Usage: history"):
+        history_range(arguments, 25)
+
+
+def test_history_pages():
+    """
+    Test that the output is split into pages of whole entries, numbered as in the full
+    listing, with the header only on the first page.
+    """
+    # Arrange
+    history = make_history(*[AddCalculation(float(i), 0.0) for i in range(5)])
+
+    # Act
+    pages = list(history_pages(history, 1, 5, page_size=2))
+
+    # Assert
+    assert pages == [
+        "Calculation History:\n2. AddCalculation: 1.0 Add 0.0 = 1.0\n3. AddCalculation: 2.0 Add 0.0 = 2.0\n",
+        "4. AddCalculation: 3.0 Add 0.0 = 3.0\n5. AddCalculation: 4.0 Add 0.0 = 4.0\n",
+    ]
+    assert list(history_pages(history, 7)) == ["No calculations in that range (the history has 5).\n"]
+
+
+def test_history_pages_do_not_recompute_results():
+    """
+    Test that rendering pages uses the stored results instead of executing calculations again.
+    """
+    # Arrange
+    history = make_history(AddCalculation(1.0, 2.0))
+
+    # Act
+    with patch.object(Operation, 'addition', side_effect=AssertionError("recomputed")):
+        pages = list(history_pages(history))
+
+    # Assert
+    assert pages == ["Calculation History:\n1. AddCalculation: 1.0 Add 2.0 = 3.0\n"]
+
+
+def test_display_history_one_write_per_page(monkeypatch):
+    """
+    Test that display_history writes each page with a single call.
+    """
+    # Arrange
+    history = make_history(*[AddCalculation(float(i), 0.0) for i in range(5)])
+    monkeypatch.setattr('app.calculator.HISTORY_PAGE_SIZE', 2)
+    writes = []
+    monkeypatch.setattr('sys.stdout', type('Output', (), {'write': staticmethod(writes.append)})())
+
+    # Act
+    display_history(history)
+
+    # Assert
+    assert len(writes) == 3
+    assert writes[2] == "5. AddCalculation: 4.0 Add 0.0 = 4.0\n"
+
+
+def test_calculator_paged_history(monkeypatch, capsys):
+    """
+    Test the REPL's paged history commands.
+    """
+    # Arrange
+    calculations = "".join(f"add {i} 0\n" for i in range(1, 13))
+    monkeypatch.setattr('sys.stdin', StringIO(
+        calculations + "history 2\nhistory tail\nhistory --from 11 --to 12\nhistory last\nexit\n"
+    ))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    outputs = capsys.readouterr().out.split("Calculation History:\n")[1:]
+    assert outputs[0].startswith("1. AddCalculation: 1.0 Add 0.0 = 1.0\n2. AddCalculation: 2.0 Add 0.0 = 2.0\n>>")
+    assert outputs[1].startswith("3. AddCalculation: 3.0")
+    assert outputs[1].count("AddCalculation") == 10
+    assert outputs[2].startswith("11. AddCalculation: 11.0 Add 0.0 = 11.0\n12.")
+    assert HISTORY_USAGE in outputs[2]
@@ -0,0 +1,91 @@
+# tests/test_import_time.py
+
+"""
+Start-up (cold import) checks for the calculator.
+
+Each test imports a module in a fresh interpreter with `python -X importtime`, which
+reports how long every module took to import, and checks that:
+- interactive-only dependencies (readline, argparse), the plugin machinery
+  (importlib.metadata), and modules only some features need (threading for the worker
+  pool, asyncio for the server, decimal for the exact backends) are not imported up
+  front, and
+- the total import time stays within a budget.
+
+`import main` takes about 20ms here, so the budget leaves less than 2x headroom: enough
+for a noisy machine, not enough to hide a heavy new top-level import. The best of a few
+runs is used, and the first run writes the bytecode, so the budget never pays for
+compiling the sources. Slower machines can raise it with the CALCULATOR_IMPORT_BUDGET_MS
+environment variable.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Project root, so the subprocess can import `main` and `app`.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = float(os.environ.get('CALCULATOR_IMPORT_BUDGET_MS', '35'))
+
+# How many fresh interpreters the budget test imports in, keeping the fastest.
+BUDGET_RUNS = 3
+
+
+def import_times(module: str) -> dict:
+    """
+    Imports `module` in a fresh interpreter and returns {module name: cumulative microseconds}
+    for every module imported along the way.
+    """
+    # Bytecode is written even when the tests run with PYTHONDONTWRITEBYTECODE, so that
+    # stale .pyc files are only recompiled once.
+    env = {name: value for name, value in os.environ.items() if name != 'PYTHONDONTWRITEBYTECODE'}
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True, env=env,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        # Lines look like: "import time:       123 |       456 |     app.calculation"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ['main', 'app.calculator', 'app.calculation'])
+def test_no_interactive_imports_at_startup(module):
+    """
+    Test that importing the calculator does not load readline or argparse; they are
+    only imported once an interactive session or command-line options need them. Nor
+    does it load what only some features use.
+    """
+    # Act
+    times = import_times(module)
+
+    # Assert
+    assert module in times
+    assert 'readline' not in times
+    assert 'argparse' not in times
+    # Plugins are looked for only when a calculation type is not found.
+    assert 'importlib.metadata' not in times
+    # The worker pool, the server and the exact numeric backends import these themselves.
+    assert 'threading' not in times
+    assert 'asyncio' not in times
+    assert 'decimal' not in times
+
+
+@pytest.mark.parametrize("module", ['main', 'app.calculation'])
+def test_import_time_budget(module):
+    """
+    Test that the cold import time of the entry points stays within the budget.
+    """
+    # Act
+    cumulative_ms = min(import_times(module)[module] for _ in range(BUDGET_RUNS)) / 1000
+
+    # Assert
+    assert cumulative_ms < IMPORT_BUDGET_MS, (
+        f"Importing {module} took {cumulative_ms:.1f}ms, over the {IMPORT_BUDGET_MS:.0f}ms budget"
+    )
@@ -0,0 +1,319 @@
+# tests/test_metrics.py
+
+"""
+Unit tests for the app/metrics module (opt-in instrumentation) and the `stats` command.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import json
+import threading
+from io import StringIO
+
+import pytest
+
+from app import metrics
+from app.cache import ResultCache
+from app.calculation import Calculation, CalculationFactory
+from app.calculator import calculator, stats_command
+from app.history import History
+from app.metrics import BUCKET_COUNT, Metrics, _format_ns
+from app.server import respond
+
+
+@pytest.fixture
+def active_metrics():
+    """
+    Fixture that switches instrumentation on for one test and off again afterwards.
+    """
+    yield metrics.enable(Metrics())
+    metrics.disable()
+
+
+def test_record_and_snapshot():
+    """
+    Test that record keeps counts, errors, min/max/total and the latency histogram.
+    """
+    # Arrange
+    collected = Metrics()
+
+    # Act
+    for elapsed_ns in (100, 300, 5_000):
+        collected.record('execute', 'AddCalculation', elapsed_ns)
+    collected.record('execute', 'AddCalculation', 2 ** 60, 'ValueError')
+    snapshot, = collected.snapshot()
+
+    # Assert
+    assert (snapshot.stage, snapshot.name, snapshot.calls) == ('execute', 'AddCalculation', 4)
+    assert snapshot.errors == {'ValueError': 1}
+    assert (snapshot.min_ns, snapshot.max_ns) == (100, 2 ** 60)
+    assert snapshot.buckets[7] == 1  # 100ns is in [64, 128)
+    assert snapshot.buckets[9] == 1  # 300ns is in [256, 512)
+    assert snapshot.buckets[BUCKET_COUNT - 1] == 1  # Everything slower lands in the last bucket.
+    assert snapshot.mean_ns == (100 + 300 + 5_000 + 2 ** 60) / 4
+    assert snapshot.percentile_ns(50) == 512
+    assert snapshot.percentile_ns(100) == 2 ** 60
+
+
+def test_record_from_several_threads():
+    """
+    Test that no call is lost when several threads record at once.
+    """
+    # Arrange
+    collected = Metrics()
+
+    def record_many():
+        for _ in range(10_000):
+            collected.record('execute', 'AddCalculation', 100)
+    threads = [threading.Thread(target=record_many) for _ in range(4)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot, = collected.snapshot()
+
+    # Assert
+    assert snapshot.calls == 40_000
+    assert snapshot.total_ns == 4_000_000
+
+
+def test_percentile_edge_cases():
+    """
+    Test percentiles of an empty histogram and of a single very fast call.
+    """
+    # Arrange
+    collected = Metrics()
+    collected.record('create', 'add', 90)
+    snapshot, = collected.snapshot()
+    empty = snapshot._replace(calls=0, buckets=(0,) * BUCKET_COUNT, max_ns=0, total_ns=0)
+
+    # Act & Assert
+    assert snapshot.percentile_ns(99) == 90  # Capped at the slowest call, not the bucket edge (128).
+    assert empty.percentile_ns(99) == 0
+    assert empty.mean_ns == 0.0
+
+
+def test_time_records_result_and_errors():
+    """
+    Test that time() returns the function's result, and records and re-raises its exceptions.
+    """
+    # Arrange
+    collected = Metrics()
+
+    # Act
+    result = collected.time('execute', 'f', lambda x: x * 2, 21)
+    with pytest.raises(ZeroDivisionError):
+        collected.time('execute', 'f', lambda: 1 / 0)
+
+    # Assert
+    snapshot, = collected.snapshot()
+    assert result == 42
+    assert snapshot.calls == 2
+    assert snapshot.errors == {'ZeroDivisionError': 1}
+
+
+def test_export_is_json_ready():
+    """
+    Test the structure of export() and that it can be written as JSON.
+    """
+    # Arrange
+    collected = Metrics()
+    collected.record('create', 'add', 1_000)
+    collected.record('create', 'add', 3_000, 'TypeError')
+
+    # Act
+    exported = collected.export()
+
+    # Assert
+    add = exported['create']['add']
+    assert add['calls'] == 2
+    assert add['errors'] == {'TypeError': 1}
+    assert add['buckets'] == {'1024': 1, '4096': 1}
+    assert add['p50_ns'] == 1024
+    assert add['p99_ns'] == 3_000
+    assert json.loads(json.dumps(exported)) == exported
+
+
+def test_reset_and_format():
+    """
+    Test the stats table, including error lines, and that reset empties it.
+    """
+    # Arrange
+    collected = Metrics()
+    collected.record('execute', 'DivideCalculation', 2_500_000, 'ZeroDivisionError')
+
+    # Act
+    table = collected.format()
+    collected.reset()
+
+    # Assert
+    assert table.splitlines()[0].split() == ['stage', 'operation', 'calls', 'errors', 'mean', 'p50', 'p99', 'max']
+    assert table.splitlines()[1].split()[:4] == ['execute', 'DivideCalculation', '1', '1']
+    assert 'ZeroDivisionError: 1' in table
+    assert collected.format() == "No statistics recorded yet."
+
+
+@pytest.mark.parametrize("nanoseconds, expected", [
+    (850, '850ns'),
+    (1_250, '1.2µs'),
+    (3_400_000, '3.4ms'),
+    (2_500_000_000, '2.50s'),
+])
+def test_format_ns(nanoseconds, expected):
+    """
+    Test that latencies are shown with a readable unit.
+    """
+    # Act & Assert
+    assert _format_ns(nanoseconds) == expected
+
+
+def test_enable_keeps_current_metrics():
+    """
+    Test that enabling again keeps collecting into the same Metrics, unless a new one is given.
+    """
+    try:
+        # Act
+        first = metrics.enable()
+        again = metrics.enable()
+        replaced = metrics.enable(Metrics())
+
+        # Assert
+        assert again is first
+        assert replaced is not first
+        assert metrics.active is replaced
+    finally:
+        metrics.disable()
+    assert metrics.active is None
+
+
+def test_factory_and_execute_are_instrumented(active_metrics):
+    """
+    Test that create_calculation and execute are timed per operation, with their errors,
+    and that unknown types are counted under one name.
+    """
+    # Act
+    CalculationFactory.create_calculation('add', 1.0, 2.0).execute()
+    with pytest.raises(ZeroDivisionError):
+        CalculationFactory.create_calculation('DIVIDE', 1.0, 0.0).execute()
+    for unknown in ('foo', 'bar'):
+        with pytest.raises(ValueError):
+            CalculationFactory.create_calculation(unknown, 1.0, 2.0)
+
+    # Assert
+    exported = active_metrics.export()
+    assert exported['create']['add']['calls'] == 1
+    assert exported['create']['divide']['calls'] == 1
+    assert exported['create']['unsupported'] == dict(exported['create']['unsupported'], calls=2,
+                                                     errors={'ValueError': 2})
+    assert exported['execute']['AddCalculation']['calls'] == 1
+    assert exported['execute']['DivideCalculation']['errors'] == {'ZeroDivisionError': 1}
+
+
+def test_instrumented_execute_uses_result_cache(active_metrics):
+    """
+    Test that a result taken from the process-wide cache is still timed as one call.
+    """
+    # Arrange
+    Calculation.result_cache = ResultCache()
+    try:
+        # Act
+        for _ in range(2):
+            CalculationFactory.create_calculation('multiply', 2.0, 3.0).execute()
+    finally:
+        Calculation.result_cache = None
+
+    # Assert
+    assert active_metrics.export()['execute']['MultiplyCalculation']['calls'] == 2
+
+
+def test_disabled_by_default_records_nothing():
+    """
+    Test that nothing is recorded while instrumentation is off.
+    """
+    # Arrange
+    collected = Metrics()
+    metrics.enable(collected)
+    metrics.disable()
+
+    # Act
+    CalculationFactory.create_calculation('add', 1.0, 2.0).execute()
+
+    # Assert
+    assert collected.snapshot() == []
+
+
+@pytest.mark.parametrize("argument, expected", [
+    ('', "Statistics are not being collected. Type 'stats on' to start."),
+    ('reset', "Statistics reset."),
+    ('loud', "Usage: stats [on|off|reset]"),
+])
+def test_stats_command_while_off(argument, expected):
+    """
+    Test the stats command's answers while instrumentation is off.
+    """
+    # Act & Assert
+    assert stats_command(argument) == expected
+
+
+def test_stats_command_on_reset_off():
+    """
+    Test switching statistics on, resetting them and switching them off with the stats command.
+    """
+    try:
+        # Act
+        turned_on = stats_command(' ON ')
+        CalculationFactory.create_calculation('add', 1.0, 2.0)
+        before_reset = stats_command()
+        reset = stats_command('reset')
+        after_reset = stats_command()
+        turned_off = stats_command('off')
+    finally:
+        metrics.disable()
+
+    # Assert
+    assert turned_on == "Collecting statistics."
+    assert 'create' in before_reset
+    assert reset == "Statistics reset."
+    assert after_reset == "No statistics recorded yet."
+    assert turned_off == "Stopped collecting statistics."
+    assert metrics.active is None
+
+
+def test_calculator_stats(monkeypatch, capsys):
+    """
+    Test that the REPL times each line by command and shows the table for 'stats'.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('add 1 2\nhelp\nhistory\nstats\nexit\n'))
+
+    # Act
+    try:
+        with pytest.raises(SystemExit):
+            calculator(stats=True)
+        exported = metrics.active.export()
+    finally:
+        metrics.disable()
+
+    # Assert
+    assert sorted(exported['repl']) == ['calculation', 'help', 'history', 'stats']
+    output = capsys.readouterr().out
+    assert 'repl     calculation' in output
+    assert 'Operand cache: 0 hits, 2 misses, 0 evictions, 2/4096 entries' in output
+
+
+def test_server_stats(active_metrics):
+    """
+    Test that network clients can read the statistics too.
+    """
+    # Arrange
+    history = History()
+    respond('add 1 2', history)
+
+    # Act
+    response = respond('stats', history)
+
+    # Assert
+    assert 'create   add' in response
+    assert 'Operand cache: ' in response
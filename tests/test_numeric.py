@@ -0,0 +1,200 @@
+# tests/test_numeric.py
+
+"""
+Unit tests for the app/numeric module (numeric backends) and the places that use it:
+CalculationFactory, History, the REPL and batch mode.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import decimal
+from fractions import Fraction
+from io import StringIO
+
+import pytest
+
+from app.batch import run_batch
+from app.calculation import CalculationFactory
+from app.calculator import calculator
+from app.history import History
+from app.numeric import (
+    BACKENDS,
+    DECIMAL,
+    FLOAT,
+    FRACTION,
+    INTEGER,
+    DecimalBackend,
+    NumericBackend,
+    get_backend,
+    register_backend,
+)
+from app.operations import Operation
+
+
+@pytest.mark.parametrize("backend, text, expected", [
+    (FLOAT, '0.1', 0.1),
+    (INTEGER, '12345678901234567890123', 12345678901234567890123),
+    (INTEGER, 4.0, 4),
+    (DECIMAL, '0.1', decimal.Decimal('0.1')),
+    (FRACTION, '0.1', Fraction(1, 10)),
+    (FRACTION, '1/3', Fraction(1, 3)),
+])
+def test_convert(backend, text, expected):
+    """
+    Test that each backend converts text (and numbers) to its own number type exactly.
+    """
+    # Act
+    value = backend.convert(text)
+
+    # Assert
+    assert value == expected
+    assert type(value) is backend.number_type
+
+
+@pytest.mark.parametrize("backend, value", [
+    (FLOAT, 'ten'),
+    (INTEGER, '1.5'),
+    (INTEGER, 1.5),
+    (INTEGER, float('inf')),
+    (DECIMAL, 'ten'),
+    (DECIMAL, [1]),
+    (FRACTION, 'inf'),
+])
+def test_convert_invalid(backend, value):
+    """
+    Test that every kind of invalid operand is reported as a ValueError.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError):
+        backend.convert(value)
+
+
+def test_decimal_context_applies_to_operands_and_results():
+    """
+    Test that a Decimal backend rounds to its context's precision, but only its own results.
+    """
+    # Arrange
+    backend = DecimalBackend('decimal6', decimal.Context(prec=6))
+    calculation = CalculationFactory.create_calculation('divide', '2', '3', backend=backend)
+
+    # Act
+    result = backend.execute(calculation)
+
+    # Assert
+    assert backend.convert('3.14159265') == decimal.Decimal('3.14159')
+    assert result == decimal.Decimal('0.666667')
+    assert decimal.Decimal(2) / decimal.Decimal(3) != result  # The global context is untouched.
+
+
+def test_get_backend():
+    """
+    Test looking backends up by name (case-insensitively) or passing one through.
+    """
+    # Act & Assert
+    assert get_backend('Fraction') is FRACTION
+    assert get_backend(DECIMAL) is DECIMAL
+    assert repr(INTEGER) == "IntegerBackend('int')"
+    with pytest.raises(ValueError, match="Unsupported numeric backend: 'complex'. Available backends: float, int"):
+        get_backend('complex')
+
+
+def test_register_backend(monkeypatch):
+    """
+    Test registering a new backend, and that names cannot be registered twice.
+    """
+    # Arrange
+    monkeypatch.setattr('app.numeric.BACKENDS', dict(BACKENDS))
+    backend = NumericBackend('complex', complex)
+
+    # Act
+    register_backend(backend)
+
+    # Assert
+    assert get_backend('complex') is backend
+    with pytest.raises(ValueError, match="Numeric backend 'Float' is already registered."):
+        register_backend(NumericBackend('Float', float))
+
+
+@pytest.mark.parametrize("a, b", [
+    (decimal.Decimal('2.5'), decimal.Decimal('2')),
+    (Fraction(5, 2), Fraction(2)),
+    (10 ** 30, 7),
+])
+def test_operations_accept_exact_types(a, b):
+    """
+    Test that the Operation type checks accept every numeric type, not just int and float.
+    """
+    # Act & Assert
+    assert Operation.power(a, b) == a ** b
+    assert Operation.modulus(a, b) == a % b
+
+
+def test_create_calculation_with_backend():
+    """
+    Test that create_calculation converts operands with a backend given per call or per factory.
+    """
+    # Act
+    per_call = CalculationFactory.create_calculation('add', '0.1', '0.2', backend='decimal')
+    CalculationFactory.set_backend('fraction')
+    per_factory = CalculationFactory.create_calculation('divide', '1', '3')
+    CalculationFactory.set_backend(None)
+    plain = CalculationFactory.create_calculation('add', 0.1, 0.2)
+
+    # Assert
+    assert per_call.execute() == decimal.Decimal('0.3')
+    assert per_factory.execute() == Fraction(1, 3)
+    assert plain.execute() == 0.1 + 0.2
+
+
+def test_history_keeps_exact_numbers():
+    """
+    Test that a History for an exact number type stores operands and results without rounding.
+    """
+    # Arrange
+    history = History(maxlen=2, number_type=int)
+    big = 10 ** 30 + 1
+
+    # Act
+    for i in range(3):
+        history.append(CalculationFactory.create_calculation('multiply', big, i, backend='int'))
+    history.clear()
+    history.append(CalculationFactory.create_calculation('add', big, 1, backend='int'))
+
+    # Assert
+    assert history.number_type is int
+    assert history[0].a == big
+    assert history[0].execute() == big + 1
+
+
+def test_calculator_with_backend(monkeypatch, capsys):
+    """
+    Test the REPL with the fraction backend: exact results, exact history and invalid operands.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('divide 1 3\nadd 1 inf\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(backend='fraction')
+
+    # Assert
+    output = capsys.readouterr().out
+    assert "Result: DivideCalculation: 1 Divide 3 = 1/3" in output
+    assert "Invalid input. Please follow the format: <operation> <num1> <num2>" in output
+    assert "1. DivideCalculation: 1 Divide 3 = 1/3" in output
+
+
+def test_run_batch_with_backend():
+    """
+    Test batch mode with the decimal backend.
+    """
+    # Arrange
+    input_stream = StringIO("add 0.1 0.2\nmultiply 1.10 3\ndivide 1 0\n")
+    output_stream = StringIO()
+
+    # Act
+    stats = run_batch(input_stream, output_stream, backend='decimal')
+
+    # Assert
+    assert output_stream.getvalue() == "0.3\n3.30\nerror: Cannot divide by zero.\n"
+    assert stats.errors == 1
@@ -663,6 +663,9 @@ def test_modulus_fractional_result():
     (Operation.power, 2.0, '3', TypeError),
     (Operation.modulus, '10', 3.0, TypeError),
     (Operation.modulus, 10.0, '3', TypeError),
+    (Operation.power, 2j, 2, TypeError),
+    (Operation.power, 2.0, 1j, TypeError),
+    (Operation.modulus, 2j, 1.0, TypeError),
 ])
 def test_operations_invalid_input_types(calc_method, a, b, expected_exception):
     """
@@ -676,4 +679,61 @@ def test_operations_invalid_input_types(calc_method, a, b, expected_exception):
 
     # Act & Assert
     with pytest.raises(expected_exception):
-        calc_method(a, b)
\ No newline at end of file
+        calc_method(a, b)
+
+def test_power_and_modulus_accept_every_backends_numbers():
+    """
+    Test that the type checks accept the exact number types of the numeric backends,
+    while still rejecting complex numbers (checked above).
+    """
+    # Arrange
+    from decimal import Decimal
+    from fractions import Fraction
+
+    # Act
+    results = (Operation.power(Decimal('1.5'), 2), Operation.modulus(Fraction(7, 2), 1),
+               Operation.power(Fraction(1, 2), 3), Operation.modulus(Decimal(7), Decimal(3)))
+
+    # Assert
+    assert results == (Decimal('2.25'), Fraction(1, 2), Fraction(1, 8), Decimal(1))
+
+
+# -----------------------------------------------------------------------------------
+# Test PowMod Method
+# -----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("base, exponent, modulus, expected_result", [
+    (4, 13, 497, 445),
+    (4.0, 13.0, 497.0, 445),
+    (2, 10 ** 18, 1_000_000_007, pow(2, 10 ** 18, 1_000_000_007)),
+    (3, -1, 7, 5),
+    (-2, 3, 5, 2),
+])
+def test_powmod(base, exponent, modulus, expected_result):
+    """
+    Test that powmod gives (base ** exponent) % modulus, also for whole-number floats
+    and exponents far too large to compute the power first.
+    """
+    # Act
+    result = Operation.powmod(base, exponent, modulus)
+
+    # Assert
+    assert result == expected_result
+    assert type(result) is int
+
+
+@pytest.mark.parametrize("base, exponent, modulus, expected_exception, message", [
+    (2, 3, 0, ValueError, "Modulus by zero is not allowed."),
+    (2.5, 3, 5, TypeError, "powmod operands must be whole numbers."),
+    ('2', 3, 5, TypeError, "powmod operands must be whole numbers."),
+    (2, float('inf'), 5, TypeError, "powmod operands must be whole numbers."),
+    (2, -1, 4, ValueError, "base is not invertible for the given modulus"),
+])
+def test_powmod_invalid(base, exponent, modulus, expected_exception, message):
+    """
+    Test that powmod rejects a zero modulus, operands that are not whole numbers,
+    and negative exponents of bases without a modular inverse.
+    """
+    # Act & Assert
+    with pytest.raises(expected_exception, match=message):
+        Operation.powmod(base, exponent, modulus)
@@ -0,0 +1,145 @@
+# tests/test_parallel.py
+
+"""
+Unit tests for the app/parallel module (multiprocess batch evaluator).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import math
+
+import pytest
+
+from app.calculation import AddCalculation, CalculationFactory
+import app.parallel
+from app.parallel import ChunkResult, _init_worker, evaluate_chunk, evaluate_parallel
+
+
+def make_records(count):
+    """Helper that builds a mix of records, including a division by zero every 10 rows."""
+    operations = ['add', 'subtract', 'multiply', 'divide']
+    return [
+        (operations[i % 4], float(i), 0.0 if i % 10 == 3 else 2.0)
+        for i in range(count)
+    ]
+
+
+def expected_result(operation, a, b):
+    """Helper that computes a record's result the ordinary way (nan on error)."""
+    try:
+        return CalculationFactory.create_calculation(operation, a, b).execute()
+    except ZeroDivisionError:
+        return math.nan
+
+
+def test_evaluate_chunk_mixed_operations():
+    """
+    Test that a chunk with several operations returns results in input order and
+    reports failing rows with their row number in the whole input.
+    """
+    # Arrange
+    records = [('add', 1.0, 2.0), ('divide', 1.0, 0.0), ('multiply', 3.0, 4.0), ('unknown', 1.0, 1.0)]
+
+    # Act
+    chunk = evaluate_chunk(5, 100, records)
+
+    # Assert
+    assert isinstance(chunk, ChunkResult)
+    assert (chunk.index, chunk.start) == (5, 100)
+    assert chunk.results[0] == 3.0
+    assert math.isnan(chunk.results[1])
+    assert chunk.results[2] == 12.0
+    assert chunk.errors[0] == (101, "Cannot divide by zero.")
+    assert chunk.errors[1][0] == 103
+    assert chunk.errors[1][1].startswith("Unsupported calculation type: 'unknown'")
+
+
+@pytest.mark.usefixtures('all_calculations')
+def test_evaluate_chunk_reports_value_errors():
+    """
+    Test that errors raised as ValueError by the kernels are reported with their message.
+    """
+    # Act
+    chunk = evaluate_chunk(0, 0, [('power', 0.0, 0.0), ('modulus', 1.0, 0.0)])
+
+    # Assert
+    assert chunk.errors == [(0, "0^0 is undefined."), (1, "Modulus by zero is not allowed.")]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_evaluate_parallel_process_pool(ordered):
+    """
+    Test that a process pool evaluates every record exactly once, matching the
+    single-process results.
+    """
+    # Arrange
+    records = make_records(250)
+
+    # Act
+    chunks = list(evaluate_parallel(records, chunk_size=40, max_workers=2, ordered=ordered))
+
+    # Assert
+    if ordered:
+        assert [chunk.index for chunk in chunks] == list(range(7))
+    chunks.sort(key=lambda chunk: chunk.index)
+    results = [result for chunk in chunks for result in chunk.results]
+    expected = [expected_result(*record) for record in records]
+    assert len(results) == len(records)
+    for result, wanted in zip(results, expected):
+        assert result == wanted or (math.isnan(result) and math.isnan(wanted))
+    error_rows = [row for chunk in chunks for row, _ in chunk.errors]
+    assert error_rows == [i for i in range(250) if i % 10 == 3 and i % 4 == 3]
+
+
+def test_evaluate_parallel_custom_executor():
+    """
+    Test that a caller-supplied executor is used and left running.
+    """
+    # Arrange
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Act
+        chunks = list(evaluate_parallel(make_records(10), chunk_size=3, max_workers=1, executor=executor))
+
+        # Assert
+        assert [chunk.start for chunk in chunks] == [0, 3, 6, 9]
+        assert executor.submit(lambda: 'still running').result() == 'still running'
+
+
+def test_evaluate_parallel_empty_input():
+    """
+    Test that an empty input produces no chunks.
+    """
+    assert list(evaluate_parallel([], max_workers=1)) == []
+
+
+def test_evaluate_parallel_invalid_chunk_size():
+    """
+    Test that a chunk_size below 1 is rejected.
+    """
+    with pytest.raises(ValueError) as exc_info:
+        list(evaluate_parallel([('add', 1.0, 2.0)], chunk_size=0))
+
+    assert str(exc_info.value) == "chunk_size must be at least 1."
+
+
+def test_init_worker_registers_missing_types():
+    """
+    Test that the worker initializer registers types the worker is missing and leaves
+    existing registrations alone.
+    """
+    # Arrange
+    # app.parallel may have been imported before test_calculation.py reloaded
+    # app.calculation (app.binary imports it), so use the factory it registers with.
+    factory = app.parallel.CalculationFactory
+    registrations = factory.registered_types()
+    registrations['plus'] = AddCalculation
+
+    try:
+        # Act
+        _init_worker(registrations)
+
+        # Assert
+        assert factory.registered_types()['plus'] is AddCalculation
+    finally:
+        factory.unregister_calculation('plus')
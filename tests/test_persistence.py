@@ -0,0 +1,389 @@
+# tests/test_persistence.py
+
+"""
+Unit tests for the app/persistence module (on-disk, mmap-backed history).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+from io import StringIO
+import struct
+
+import pytest
+
+from app.calculation import AddCalculation, Calculation, DivideCalculation, PowerCalculation
+from app.calculator import calculator, display_history
+from app.query import Query
+from app.persistence import (
+    HEADER,
+    RECORD,
+    RECORD_DTYPE,
+    RECORD_SIZE,
+    HistoryRecord,
+    PersistentHistory,
+)
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    """Fixture that returns a path for a fresh history file."""
+    return tmp_path / 'calculations.log'
+
+
+@pytest.mark.usefixtures('all_calculations')
+def test_append_and_read_back_records(history_path):
+    """
+    Test that appended calculations can be read back as decoded records.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        # Act
+        history.append(AddCalculation(1.0, 2.0), timestamp=100.0)
+        history.append(PowerCalculation(2.0, 10.0), timestamp=200.0)
+
+        # Assert
+        assert len(history) == 2
+        assert history.record(0) == HistoryRecord('add', 1.0, 2.0, 3.0, 100.0)
+        assert history.record(-1) == HistoryRecord('power', 2.0, 10.0, 1024.0, 200.0)
+        assert list(history.records(1)) == [HistoryRecord('power', 2.0, 10.0, 1024.0, 200.0)]
+
+
+def test_history_survives_reopening(history_path):
+    """
+    Test that records and operation codes are still there after closing and reopening the file.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        history.append(DivideCalculation(10.0, 4.0), timestamp=1.0)
+
+    # Act
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 1.0), timestamp=2.0)
+        history.append(DivideCalculation(9.0, 3.0), timestamp=3.0)
+        operations = [record.operation for record in history.records()]
+
+    # Assert
+    assert operations == ['divide', 'add', 'divide']
+    assert (history_path.parent / 'calculations.log.ops').read_text() == 'divide\nadd\n'
+    assert history_path.stat().st_size == HEADER.size + 3 * RECORD_SIZE
+
+
+def test_materialized_calculations(history_path):
+    """
+    Test that indexing, slicing and iterating yield Calculation objects with stored results.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        for i in range(4):
+            history.append(AddCalculation(float(i), 10.0))
+
+        # Act
+        single = history[-1]
+        contiguous = history[1:3]
+        stepped = history[::2]
+        iterated = list(history)
+
+    # Assert
+    assert isinstance(single, AddCalculation)
+    assert (single.a, single.b, single.execute()) == (3.0, 10.0, 13.0)
+    assert [calc.a for calc in contiguous] == [1.0, 2.0]
+    assert [calc.a for calc in stepped] == [0.0, 2.0]
+    assert [calc.execute() for calc in iterated] == [10.0, 11.0, 12.0, 13.0]
+
+
+def test_record_index_out_of_range(history_path):
+    """
+    Test that reading past the end raises IndexError.
+    """
+    with PersistentHistory(history_path) as history:
+        with pytest.raises(IndexError):
+            history.record(0)
+        with pytest.raises(IndexError):
+            history[-1]
+
+
+def test_view_is_zero_copy_and_sees_new_records(history_path):
+    """
+    Test that view() exposes the raw record bytes and is refreshed after further appends.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 2.0), timestamp=5.0)
+        first_view = history.view()
+
+        # Act
+        history.append(AddCalculation(3.0, 4.0), timestamp=6.0)
+        second_view = history.view()
+
+        # Assert
+        assert isinstance(first_view, memoryview)
+        assert len(first_view) == RECORD_SIZE
+        assert len(second_view) == 2 * RECORD_SIZE
+        assert RECORD.unpack_from(second_view, RECORD_SIZE) == (0, 3.0, 4.0, 7.0, 6.0)
+        assert len(history.view(2, 1)) == 0
+        del first_view, second_view
+
+
+def test_view_with_numpy(history_path):
+    """
+    Test that RECORD_DTYPE lets NumPy read the records as columns. Skipped without NumPy.
+    """
+    # Arrange
+    numpy = pytest.importorskip('numpy')
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 2.0))
+        history.append(AddCalculation(3.0, 4.0))
+
+        # Act
+        columns = numpy.frombuffer(history.view(), dtype=numpy.dtype(RECORD_DTYPE))
+
+        # Assert
+        assert columns['result'].tolist() == [3.0, 7.0]
+        del columns
+
+
+def test_partial_record_is_dropped(history_path):
+    """
+    Test that a half-written trailing record (e.g. from a crash) is discarded on open.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 2.0))
+    with open(history_path, 'ab') as log_file:
+        log_file.write(b'\x00' * 10)
+
+    # Act
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(2.0, 2.0))
+        results = [record.result for record in history.records()]
+
+    # Assert
+    assert results == [3.0, 4.0]
+
+
+def test_rejects_foreign_file(history_path):
+    """
+    Test that opening a file that is not a history raises ValueError.
+    """
+    # Arrange
+    history_path.write_bytes(struct.pack('<8sI4x', b'NOTALOG!', RECORD_SIZE))
+
+    # Act & Assert
+    with pytest.raises(ValueError) as exc_info:
+        PersistentHistory(history_path)
+    assert "is not a calculation history file" in str(exc_info.value)
+
+
+def test_rejects_unregistered_calculation(history_path):
+    """
+    Test that a calculation class not registered with the factory cannot be recorded,
+    since it could not be re-created when reading the history back.
+    """
+    # Arrange
+    class UnregisteredCalculation(Calculation):
+        def execute(self):
+            return 0.0
+
+    # Act & Assert
+    with PersistentHistory(history_path) as history:
+        with pytest.raises(ValueError) as exc_info:
+            history.append(UnregisteredCalculation(1.0, 2.0))
+    assert "is not registered with CalculationFactory" in str(exc_info.value)
+
+
+def test_operation_type_limit(history_path, monkeypatch):
+    """
+    Test that more operation types than the op-code field can hold are rejected.
+    """
+    # Arrange
+    monkeypatch.setattr('app.persistence.MAX_OPERATION_TYPES', 1)
+
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 2.0))
+
+        # Act & Assert
+        with pytest.raises(ValueError) as exc_info:
+            history.append(DivideCalculation(1.0, 2.0))
+    assert "at most 1 operation types" in str(exc_info.value)
+
+
+def test_autoflush_writes_immediately(history_path):
+    """
+    Test that with autoflush every append reaches the file straight away.
+    """
+    with PersistentHistory(history_path, autoflush=True) as history:
+        history.append(AddCalculation(1.0, 2.0))
+        assert history_path.stat().st_size == HEADER.size + RECORD_SIZE
+        assert repr(history) == f"PersistentHistory(path={str(history_path)!r}, len=1)"
+
+
+def test_flush_writes_buffered_records(history_path):
+    """
+    Test that buffered records reach the file when flush is called.
+    """
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 2.0))
+        history.flush()
+        assert history_path.stat().st_size == HEADER.size + RECORD_SIZE
+
+
+def test_display_history_with_persistent_history(history_path, capsys):
+    """
+    Test that display_history prints a PersistentHistory like any other history.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(10.0, 5.0))
+
+        # Act
+        display_history(history)
+
+    # Assert
+    assert "1. AddCalculation: 10.0 Add 5.0 = 15.0" in capsys.readouterr().out
+
+
+def test_aggregates_built_from_file_then_updated(history_path):
+    """
+    Test that the aggregates are read from the existing records once, then kept up to date.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        history.append(AddCalculation(1.0, 2.0))
+        history.append(DivideCalculation(8.0, 2.0))
+
+    with PersistentHistory(history_path) as history:
+        # Act
+        aggregates = history.aggregates
+        history.append(AddCalculation(3.0, 4.0))
+
+        # Assert
+        assert history.aggregates is aggregates
+        assert aggregates.overall.count == 3
+        assert aggregates.by_operation['add'].total == 10.0
+        assert aggregates.by_operation['divide'].minimum == 4.0
+
+
+def test_search_builds_index_from_file(history_path):
+    """
+    Test that searching a reopened history file finds existing and newly appended records.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        history.append(DivideCalculation(4e6, 2.0), timestamp=10.0)
+        history.append(AddCalculation(1.0, 2.0), timestamp=20.0)
+
+    with PersistentHistory(history_path) as history:
+        # Act
+        before = history.search(Query(min_result=1.0, since=15.0))
+        history.append(AddCalculation(3.0, 4.0), timestamp=30.0)
+        after = history.search(Query(operation='add', since=15.0))
+
+        # Assert
+        assert before == [1]
+        assert after == [1, 2]
+
+
+def test_calculator_history_file(history_path, monkeypatch, capsys):
+    """
+    Test that the REPL keeps its history in the file across sessions.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('add 10 5\nexit\n'))
+    with pytest.raises(SystemExit):
+        calculator(history_file=str(history_path))
+    capsys.readouterr()
+    monkeypatch.setattr('sys.stdin', StringIO('history\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(history_file=str(history_path))
+
+    # Assert
+    assert "1. AddCalculation: 10.0 Add 5.0 = 15.0" in capsys.readouterr().out
+
+
+def test_calculator_history_file_skips_three_operand_calculations(history_path, monkeypatch, capsys, all_calculations):
+    """
+    Test that the REPL still shows a powmod result when the history file cannot store it.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('powmod 4 13 497\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(history_file=str(history_path))
+
+    # Assert
+    output = capsys.readouterr().out
+    assert "Result: PowModCalculation: 4.0 ^ 13.0 mod 497.0 = 445" in output
+    assert "Not added to the history: PowModCalculation has 3 operands; the history file only stores two." in output
+    with PersistentHistory(history_path) as history:
+        assert len(history) == 0
+
+
+@pytest.mark.usefixtures('all_calculations')
+def test_rejects_values_a_record_cannot_hold(history_path):
+    """
+    Test that a complex result is rejected with a ValueError before anything is written,
+    not even the name of an operation seen for the first time.
+    """
+    # Arrange
+    with PersistentHistory(history_path) as history:
+        # Act & Assert
+        with pytest.raises(ValueError, match="The history file cannot store PowerCalculation"):
+            history.append(PowerCalculation(-8.0, 0.5))
+        history.append(AddCalculation(1.0, 2.0))
+        assert len(history) == 1
+        assert history.record(0).operation == 'add'
+    assert history_path.with_name('calculations.log.ops').read_text() == 'add\n'
+
+
+def test_calculator_history_file_with_complex_result(history_path, monkeypatch, capsys, all_calculations):
+    """
+    Test that the REPL shows a complex result and carries on when the history file cannot store it.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('power -8 0.5\nadd 1 2\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(history_file=str(history_path))
+
+    # Assert
+    output = capsys.readouterr().out
+    assert f"Result: PowerCalculation: -8.0 Power 0.5 = {(-8.0) ** 0.5}" in output
+    assert "Not added to the history: The history file cannot store PowerCalculation" in output
+    assert "1. AddCalculation: 1.0 Add 2.0 = 3.0" in output
+
+
+@pytest.mark.parametrize("backend, line, stored", [
+    ('int', 'power 2 10', 1024.0),
+    ('fraction', 'divide 1 3', 1 / 3),
+    ('decimal', 'multiply 1e300 1e300', None),
+    ('int', 'power 10 400', None),
+])
+def test_calculator_history_file_with_numeric_backend(history_path, monkeypatch, capsys, all_calculations,
+                                                      backend, line, stored):
+    """
+    Test that with an exact backend, results are stored rounded to a float, and results
+    beyond the float range are reported as not added instead of ending the session.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO(f'{line}\nadd 1 2\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(history_file=str(history_path), backend=backend)
+
+    # Assert
+    output = capsys.readouterr().out
+    with PersistentHistory(history_path) as history:
+        results = [record.result for record in history.records()]
+        total = history.aggregates.overall.total
+    if stored is None:
+        assert "Not added to the history: The history file cannot store" in output
+        assert "too large" in output
+        assert results == [3.0]
+    else:
+        assert results == [stored, 3.0]
+        assert total == stored + 3.0
@@ -0,0 +1,214 @@
+# tests/test_plugins.py
+
+"""
+Unit tests for loading calculation types from plugins (entry points and lazy registrations).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import importlib.metadata
+import sys
+
+import pytest
+
+from app.calculation import PLUGIN_GROUP, CalculationFactory
+
+# A plugin module whose class is registered by the factory when it is loaded.
+CUBE_SOURCE = '''
+from app.calculation import Calculation
+
+LOADED = True
+
+
+class CubeCalculation(Calculation):
+    __slots__ = ()
+
+    def execute(self):
+        return self.a ** 3
+
+
+NOT_A_CALCULATION = object()
+'''
+
+# A plugin module that registers its class itself, with the decorator.
+SQUARE_SOURCE = '''
+from app.calculation import Calculation, CalculationFactory
+
+
+@CalculationFactory.register_calculation('square')
+class SquareCalculation(Calculation):
+    __slots__ = ()
+
+    def execute(self):
+        return self.a * self.a
+'''
+
+PLUGIN_MODULES = ('calculator_cube_plugin', 'calculator_square_plugin')
+
+
+@pytest.fixture
+def plugins(tmp_path, monkeypatch):
+    """
+    Fixture that puts two plugin modules on the import path, and restores the factory's
+    registrations (and forgets the plugin modules) after the test.
+    """
+    (tmp_path / 'calculator_cube_plugin.py').write_text(CUBE_SOURCE)
+    (tmp_path / 'calculator_square_plugin.py').write_text(SQUARE_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    saved = (CalculationFactory._registry, CalculationFactory._plugins, CalculationFactory._plugins_discovered)
+    # No installed package declares plugins unless a test says so.
+    monkeypatch.setattr(importlib.metadata, 'entry_points', lambda group: [])
+    yield
+    CalculationFactory._registry, CalculationFactory._plugins, CalculationFactory._plugins_discovered = saved
+    CalculationFactory.frozen = False
+    for module in PLUGIN_MODULES:
+        sys.modules.pop(module, None)
+
+
+def fake_entry_points(monkeypatch, **targets):
+    """Helper that makes `importlib.metadata.entry_points` report the given plugins."""
+    points = [importlib.metadata.EntryPoint(name, target, PLUGIN_GROUP) for name, target in targets.items()]
+    monkeypatch.setattr(importlib.metadata, 'entry_points',
+                        lambda group: points if group == PLUGIN_GROUP else [])
+
+
+def test_lazy_registration_imports_on_first_use(plugins):
+    """
+    Test that a lazily registered type's module is only imported when the type is first used.
+    """
+    # Arrange
+    CalculationFactory.register_lazy('Cube', 'calculator_cube_plugin:CubeCalculation')
+    imported_before_use = 'calculator_cube_plugin' in sys.modules
+
+    # Act
+    result = CalculationFactory.create_calculation('cube', 3.0, 0.0).execute()
+
+    # Assert
+    assert not imported_before_use
+    assert result == 27.0
+    assert 'cube' in CalculationFactory.registered_types()
+    assert 'cube' not in CalculationFactory._plugins
+    assert CalculationFactory.get_kernel('cube')(2.0, 0.0) == 8.0
+
+
+def test_entry_points_are_discovered_on_first_miss(plugins, monkeypatch):
+    """
+    Test that entry points are read (by name only) the first time a type is not found,
+    and that a plugin module may register its class itself.
+    """
+    # Arrange
+    fake_entry_points(monkeypatch, square='calculator_square_plugin:SquareCalculation',
+                      cube='calculator_cube_plugin:CubeCalculation', add='calculator_cube_plugin:CubeCalculation')
+    CalculationFactory._plugins_discovered = False
+    CalculationFactory.create_calculation('add', 1.0, 2.0)
+    discovered_by_known_type = CalculationFactory._plugins_discovered
+
+    # Act
+    result = CalculationFactory.create_calculation('square', 4.0, 0.0).execute()
+
+    # Assert
+    assert not discovered_by_known_type
+    assert result == 16.0
+    assert 'calculator_cube_plugin' not in sys.modules
+    assert CalculationFactory._plugins == {'cube': 'calculator_cube_plugin:CubeCalculation'}
+    assert CalculationFactory.create_calculation('add', 1.0, 2.0).execute() == 3.0
+
+
+def test_discover_plugins_returns_new_names(plugins, monkeypatch):
+    """
+    Test that discover_plugins records only types that are not registered yet.
+    """
+    # Arrange
+    fake_entry_points(monkeypatch, cube='calculator_cube_plugin:CubeCalculation',
+                      Add='calculator_cube_plugin:CubeCalculation')
+
+    # Act
+    first = CalculationFactory.discover_plugins()
+    second = CalculationFactory.discover_plugins()
+
+    # Assert
+    assert first == ['cube']
+    assert second == []
+
+
+def test_unsupported_type_lists_plugins(plugins):
+    """
+    Test that the unsupported-type error lists plugin types that are not loaded yet.
+    """
+    # Arrange
+    CalculationFactory.register_lazy('cube', 'calculator_cube_plugin:CubeCalculation')
+
+    # Act / Assert
+    with pytest.raises(ValueError, match=r"Unsupported calculation type: 'nope'\. Available types: .*cube"):
+        CalculationFactory.create_calculation('nope', 1.0, 2.0)
+
+
+@pytest.mark.parametrize("target, message", [
+    ('calculator_missing_plugin:Thing', "Cannot load calculation type 'broken'"),
+    ('calculator_cube_plugin:Missing', "Cannot load calculation type 'broken'"),
+    ('calculator_cube_plugin:NOT_A_CALCULATION', "is not a Calculation subclass"),
+])
+def test_broken_plugins(plugins, target, message):
+    """
+    Test that a plugin that cannot be imported, or is not a Calculation, raises ValueError.
+    """
+    # Arrange
+    CalculationFactory.register_lazy('broken', target)
+
+    # Act / Assert
+    with pytest.raises(ValueError, match=message):
+        CalculationFactory.create_calculation('broken', 1.0, 2.0)
+
+
+def test_register_lazy_duplicates_and_unregister(plugins):
+    """
+    Test that lazy registrations cannot shadow other types, can be unregistered, and
+    are replaced by an explicit registration of the same name.
+    """
+    # Arrange
+    CalculationFactory.register_lazy('cube', 'calculator_cube_plugin:CubeCalculation')
+    CalculationFactory.register_lazy('twice', 'calculator_cube_plugin:CubeCalculation')
+    add_class = CalculationFactory.registered_types()['add']
+
+    # Act
+    CalculationFactory.unregister_calculation('cube')
+    CalculationFactory.register_calculation('twice')(add_class)
+
+    # Assert
+    for name in ('add', 'twice'):
+        with pytest.raises(ValueError, match="is already registered"):
+            CalculationFactory.register_lazy(name, 'calculator_cube_plugin:CubeCalculation')
+    assert CalculationFactory._plugins == {}
+    assert CalculationFactory.create_calculation('twice', 1.0, 2.0).execute() == 3.0
+
+
+def test_freeze_loads_plugins_and_blocks_changes(plugins, monkeypatch):
+    """
+    Test that freezing loads every plugin up front and then rejects any change to the
+    registered types, while lookups keep working.
+    """
+    # Arrange
+    fake_entry_points(monkeypatch, cube='calculator_cube_plugin:CubeCalculation')
+    CalculationFactory._plugins_discovered = False
+    CalculationFactory.register_lazy('square', 'calculator_square_plugin:SquareCalculation')
+
+    # Act
+    CalculationFactory.freeze()
+
+    # Assert
+    assert CalculationFactory.frozen
+    assert CalculationFactory._plugins == {}
+    assert {'cube', 'square'} <= set(CalculationFactory.registered_types())
+    assert CalculationFactory.create_calculation('Cube', 2.0, 0.0).execute() == 8.0
+    add_class = CalculationFactory.registered_types()['add']
+    changes = [
+        lambda: CalculationFactory.register_calculation('plus')(add_class),
+        lambda: CalculationFactory.unregister_calculation('add'),
+        lambda: CalculationFactory.register_lazy('plus', 'calculator_cube_plugin:CubeCalculation'),
+        CalculationFactory.discover_plugins,
+    ]
+    for change in changes:
+        with pytest.raises(RuntimeError, match="CalculationFactory is frozen"):
+            change()
+    with pytest.raises(ValueError, match="Unsupported calculation type: 'nope'"):
+        CalculationFactory.create_calculation('nope', 1.0, 2.0)
@@ -0,0 +1,488 @@
+# test_pool.py
+
+"""
+This test module contains unit tests for the 'app/pool' module: running REPL calculations
+on worker threads and worker processes, with timeouts, cancellation and ordered history.
+Each test demonstrates good testing practices using the Arrange-Act-Assert (AAA) pattern.
+"""
+
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future
+from io import StringIO
+
+import pytest
+
+import app.pool
+from app.calculation import CalculationFactory
+from app.calculator import calculator
+from app.history import History
+from app.pool import CalculationPool, WorkerProcesses, WorkerThreads, _run_in_child
+
+
+class ManualExecutor:
+    """An executor whose Futures only finish when a test says so, in any order."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        future = Future()
+        self.submitted.append((future, function, args))
+        return future
+
+    def run(self, index):
+        """Runs the `index`-th submitted job and finishes its Future."""
+        future, function, args = self.submitted[index]
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+
+class SynchronousExecutor(ManualExecutor):
+    """An executor that runs every job as soon as it is submitted."""
+
+    def submit(self, function, *args):
+        future = super().submit(function, *args)
+        self.run(len(self.submitted) - 1)
+        return future
+
+
+def make_pool(executor=None, history=None, **options):
+    """A pool writing its messages to a list (returned along with it)."""
+    output = []
+    pool = CalculationPool(History() if history is None else history, output=output.append,
+                           executor=executor or SynchronousExecutor(), **options)
+    return pool, output
+
+
+def test_submit_reports_result_and_appends_to_history():
+    """
+    Test that a finished calculation is announced, reported with its ticket and added to the history.
+    """
+    # Arrange
+    pool, output = make_pool()
+
+    # Act
+    ticket = pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+
+    # Assert
+    assert ticket == 1
+    assert output == ["[1] Started.\n", "[1] Result: AddCalculation: 1.0 Add 2.0 = 3.0\n"]
+    assert len(pool.history) == 1
+    assert pool.jobs() == []
+
+
+def test_submit_reports_errors_without_recording_them():
+    """
+    Test that division by zero and other errors are reported, and left out of the history.
+    """
+    # Arrange
+    def execute(calculation):
+        if calculation.a < 0:
+            raise ValueError("negative")
+        return calculation.execute()
+    pool, output = make_pool(execute=execute)
+
+    # Act
+    pool.submit(CalculationFactory.create_calculation('divide', 1.0, 0.0))
+    pool.submit(CalculationFactory.create_calculation('add', -1.0, 2.0))
+    pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+
+    # Assert
+    assert "[1] Cannot divide by zero.\n" in output
+    assert "[2] An error occurred during calculation: negative\n" in output
+    assert [calculation.a for calculation in pool.history] == [1.0]
+
+
+def test_history_keeps_submission_order():
+    """
+    Test that calculations finishing out of order are reported at once but added to
+    the history in the order they were submitted.
+    """
+    # Arrange
+    executor = ManualExecutor()
+    pool, output = make_pool(executor)
+    for a in (1.0, 2.0, 3.0):
+        pool.submit(CalculationFactory.create_calculation('add', a, 0.0))
+
+    # Act
+    executor.run(2)
+    executor.run(1)
+    recorded_early = len(pool.history)
+    executor.run(0)
+
+    # Assert
+    assert recorded_early == 0
+    assert [line.split(']')[0] for line in output[3:]] == ["[3", "[2", "[1"]
+    assert [calculation.a for calculation in pool.history] == [1.0, 2.0, 3.0]
+
+
+def test_cancel_skips_the_calculation_in_the_history():
+    """
+    Test that a cancelled calculation is reported, ignored when it finishes, and does
+    not hold up the calculations submitted after it.
+    """
+    # Arrange
+    executor = ManualExecutor()
+    pool, output = make_pool(executor)
+    for a in (1.0, 2.0):
+        pool.submit(CalculationFactory.create_calculation('add', a, 0.0))
+    executor.run(1)
+
+    # Act
+    cancelled = pool.cancel(1)
+
+    # Assert
+    assert cancelled == [1]
+    assert "[1] Cancelled.\n" in output
+    assert executor.submitted[0][0].cancelled()
+    assert [calculation.a for calculation in pool.history] == [2.0]
+    assert pool.cancel(1) == []
+    assert pool.cancel() == []
+
+
+def test_cancel_all_and_jobs():
+    """
+    Test that jobs() lists the running calculations, and cancel() gives up on all of them.
+    """
+    # Arrange
+    pool, output = make_pool(ManualExecutor())
+    pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+    pool.submit(CalculationFactory.create_calculation('multiply', 3.0, 4.0))
+
+    # Act
+    jobs = pool.jobs()
+    cancelled = pool.cancel()
+
+    # Assert
+    assert jobs[0].startswith("[1] AddCalculation(a=1.0, b=2.0), running for ")
+    assert jobs[1].startswith("[2] MultiplyCalculation(a=3.0, b=4.0), running for ")
+    assert cancelled == [1, 2]
+    assert pool.jobs() == []
+    assert pool.wait(0) is True
+
+
+def test_wait_times_out_while_calculations_run():
+    """
+    Test that wait() returns False when calculations are still running after its timeout.
+    """
+    # Arrange
+    pool, _ = make_pool(ManualExecutor())
+    pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+
+    # Act
+    finished = pool.wait(0.01)
+
+    # Assert
+    assert finished is False
+
+
+def test_history_append_errors_are_reported():
+    """
+    Test that a calculation the history refuses is reported with its ticket.
+    """
+    # Arrange
+    class FullHistory(list):
+        def append(self, calculation):
+            raise ValueError("the history is full")
+    pool, output = make_pool(history=FullHistory())
+
+    # Act
+    pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+
+    # Assert
+    assert output[-1] == "[1] Not added to the history: the history is full\n"
+
+
+def test_history_errors_do_not_stop_later_results():
+    """
+    Test that a history raising something other than ValueError is reported too, and
+    that the results after it are still recorded and `wait()` still returns.
+    """
+    # Arrange
+    class PickyHistory(list):
+        def append(self, calculation):
+            if calculation.a == 1.0:
+                raise TypeError("not this one")
+            super().append(calculation)
+    executor = ManualExecutor()
+    pool, output = make_pool(executor, history=PickyHistory())
+    for a in (1.0, 2.0, 3.0):
+        pool.submit(CalculationFactory.create_calculation('add', a, 0.0))
+
+    # Act
+    executor.run(1)
+    executor.run(0)
+    executor.run(2)
+    finished = pool.wait(timeout=1.0)
+
+    # Assert
+    assert "[1] Not added to the history: not this one\n" in output
+    assert [calculation.a for calculation in pool.history] == [2.0, 3.0]
+    assert finished is True
+
+
+def test_timeout_gives_up_on_a_slow_calculation():
+    """
+    Test that a calculation running longer than the timeout is reported as timed out,
+    and its late result is ignored.
+    """
+    # Arrange
+    release = threading.Event()
+    def execute(calculation):
+        release.wait(5)
+        return calculation.execute()
+    output = []
+    pool = CalculationPool(History(), workers=1, timeout=0.05, execute=execute, output=output.append)
+
+    # Act
+    pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+    finished = pool.wait(5)
+    release.set()
+    pool.shutdown()
+    pool._executor._threads[0].join(5)
+
+    # Assert
+    assert finished is True
+    assert output == ["[1] Started.\n", "[1] Timed out after 0.05s.\n"]
+    assert len(pool.history) == 0
+
+
+def test_timeout_after_the_calculation_finished_is_ignored():
+    """
+    Test that a timer firing just after its calculation finished reports nothing more.
+    """
+    # Arrange
+    pool, output = make_pool(timeout=60)
+    pool.submit(CalculationFactory.create_calculation('add', 1.0, 2.0))
+
+    # Act
+    pool._give_up(1, "Timed out after 60s.")
+
+    # Assert
+    assert output == ["[1] Started.\n", "[1] Result: AddCalculation: 1.0 Add 2.0 = 3.0\n"]
+
+
+def test_worker_threads_run_jobs_and_skip_cancelled_ones():
+    """
+    Test that the worker threads return results and exceptions through Futures, and
+    never start a job cancelled while it was queued.
+    """
+    # Arrange
+    workers = WorkerThreads(1)
+    release = threading.Event()
+    started = []
+    blocker = workers.submit(release.wait, 5)
+    skipped = workers.submit(started.append, "skipped")
+    failing = workers.submit(int, "not a number")
+
+    # Act
+    skipped.cancel()
+    release.set()
+    workers.shutdown()
+    workers._threads[0].join(5)
+
+    # Assert
+    assert blocker.result() is True
+    assert started == []
+    with pytest.raises(ValueError):
+        failing.result()
+
+
+def test_worker_processes_return_results_and_exceptions():
+    """
+    Test that a job run in a worker process returns its result, or raises its
+    exception, through its Future, and that a job cancelled while queued never starts.
+    """
+    # Arrange
+    workers = WorkerProcesses(1)
+    blocker = workers.submit(time.sleep, 0.2)
+    skipped = workers.submit(pow, 2, 10)
+    power = workers.submit(pow, 2, 500)
+    failing = workers.submit(int, "not a number")
+
+    # Act
+    skipped.cancel()
+    workers.shutdown()
+    workers._threads[0].join(5)
+
+    # Assert
+    assert blocker.result() is None
+    assert skipped.cancelled()
+    assert power.result() == 2 ** 500
+    with pytest.raises(ValueError):
+        failing.result()
+    assert workers._processes == {}
+
+
+def test_worker_processes_kill_a_running_job():
+    """
+    Test that kill() stops the process of a running job at once, and does nothing for
+    a job that has already finished.
+    """
+    # Arrange
+    workers = WorkerProcesses(1)
+    finished = workers.submit(pow, 2, 10)
+    finished.result(5)
+    running = workers.submit(time.sleep, 60)
+    for _ in range(500):
+        if workers._processes:
+            break  # The job is running in its process.
+        time.sleep(0.01)
+    started = time.monotonic()
+
+    # Act
+    killed = workers.kill(running)
+    error = running.exception(5)
+    workers.shutdown()
+
+    # Assert
+    assert killed is True
+    assert time.monotonic() - started < 5
+    assert str(error) == "The worker process stopped with exit code -9."
+    assert workers.kill(finished) is False
+
+
+def test_worker_processes_kill_a_queued_job():
+    """
+    Test that kill() cancels a job that has not started yet.
+    """
+    # Arrange
+    workers = WorkerProcesses(1)
+    blocker = workers.submit(time.sleep, 0.2)
+    queued = workers.submit(pow, 2, 10)
+
+    # Act
+    killed = workers.kill(queued)
+    workers.shutdown()
+    workers._threads[0].join(5)
+
+    # Assert
+    assert killed is True
+    assert queued.cancelled()
+    assert blocker.result() is None
+
+
+def test_run_in_child_sends_what_cannot_be_pickled_as_an_error():
+    """
+    Test that an exception that cannot be sent back to the parent process is replaced
+    by a RuntimeError describing it.
+    """
+    # Arrange
+    class LocalError(Exception):
+        pass
+    def fail():
+        raise LocalError("local")
+    reader, writer = multiprocessing.Pipe(duplex=False)
+
+    # Act
+    _run_in_child(writer, fail, ())
+    ok, error = reader.recv()
+
+    # Assert
+    assert ok is False
+    assert isinstance(error, RuntimeError)
+    assert str(error).startswith("LocalError('local') could not be sent back: ")
+
+
+@pytest.mark.parametrize("options, message", [
+    ({'workers': 0}, "workers must be at least 1."),
+    ({'timeout': 0}, "timeout must be positive."),
+])
+def test_pool_rejects_invalid_options(options, message):
+    """
+    Test that a pool needs at least one worker and a positive timeout.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        CalculationPool(History(), **options)
+
+
+def test_calculator_with_workers(monkeypatch, capsys):
+    """
+    Test the REPL with worker threads: results arrive with their ticket, and exiting
+    waits for them.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('jobs\ncancel\nadd 1 2\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(workers=2)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "No calculations running." in captured.out
+    assert "Nothing to cancel." in captured.out
+    assert "[1] Started." in captured.out
+    assert "[1] Result: AddCalculation: 1.0 Add 2.0 = 3.0" in captured.out
+
+
+def test_calculator_jobs_and_cancel_commands(monkeypatch, capsys):
+    """
+    Test the REPL's jobs and cancel commands while a calculation is running, and that
+    the history, summary and find commands still work alongside it.
+    """
+    # Arrange
+    monkeypatch.setattr(app.pool, 'CalculationPool', functools.partial(CalculationPool, executor=ManualExecutor()))
+    monkeypatch.setattr('sys.stdin', StringIO(
+        'add 1 2\njobs\ncancel x\ncancel 7\ncancel 1\nhistory\nsummary\nfind add\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(workers=1)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "[1] AddCalculation(a=1.0, b=2.0), running for " in captured.out
+    assert "Usage: cancel [<N>]" in captured.out
+    assert "No calculation 7 is running." in captured.out
+    assert "[1] Cancelled." in captured.out
+    assert captured.out.count("No calculations performed yet.") == 2
+    assert "No matching calculations." in captured.out
+
+
+def test_calculator_cancel_without_workers(monkeypatch, capsys):
+    """
+    Test that jobs and cancel explain themselves when calculations run in line.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('jobs\ncancel\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "No calculations running." in captured.out
+    assert "Nothing to cancel: calculations only run in the background with --workers." in captured.out
+
+
+@pytest.mark.parametrize("interruption, message", [
+    (KeyboardInterrupt, "Keyboard interrupt detected."),
+    (EOFError, "EOF detected."),
+])
+def test_calculator_with_workers_stops_them_on_exit(monkeypatch, capsys, interruption, message):
+    """
+    Test that Ctrl+C and Ctrl+D stop the worker threads before exiting.
+    """
+    # Arrange
+    def mock_input(prompt):
+        raise interruption()
+    monkeypatch.setattr('builtins.input', mock_input)
+    shutdowns = []
+    monkeypatch.setattr(CalculationPool, 'shutdown', lambda pool: shutdowns.append(pool))
+
+    # Act
+    with pytest.raises(SystemExit):
+        calculator(workers=1)
+
+    # Assert
+    assert message in capsys.readouterr().out
+    assert len(shutdowns) == 1
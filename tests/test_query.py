@@ -0,0 +1,157 @@
+# tests/test_query.py
+
+"""
+Unit tests for the app/query module (history search indexes and the find query syntax).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pytest
+
+from app.query import QUERY_USAGE, HistoryIndex, Query, parse_query
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", Query()),
+    ("divide result>1e6", Query(operation='divide', min_result=1e6, include_min=False)),
+    ("POWER last 100", Query(operation='power', last=100)),
+    ("result >= 10 result < 20", Query(min_result=10.0, max_result=20.0, include_max=False)),
+    ("result<=5", Query(max_result=5.0)),
+    ("result=3", Query(min_result=3.0, max_result=3.0)),
+    ("since 90", Query(since=910.0)),
+    ("add since 5m", Query(operation='add', since=700.0)),
+])
+def test_parse_query(text, expected):
+    """
+    Test parsing the find command's query syntax.
+    """
+    # Act
+    query = parse_query(text, now=1000.0)
+
+    # Assert
+    assert query == expected
+
+
+@pytest.mark.parametrize("text", [
+    "add divide", "result", "result>", "result>big", "resultant", "last", "last 0", "last ten", "since", "since 5x",
+])
+def test_parse_query_rejects_invalid_queries(text):
+    """
+    Test that invalid queries raise ValueError with the usage message.
+    """
+    # Act / Assert
+    with pytest.raises(ValueError, match=r"Usage: find"):
+        parse_query(text)
+    assert QUERY_USAGE.startswith("Usage: find")
+
+
+def test_parse_query_since_defaults_to_now(monkeypatch):
+    """
+    Test that `since` counts back from the current time by default.
+    """
+    # Arrange
+    monkeypatch.setattr('app.query.time.time', lambda: 5000.0)
+
+    # Act
+    query = parse_query("since 1h")
+
+    # Assert
+    assert query.since == 1400.0
+
+
+def build_index(entries):
+    """Helper that indexes (operation, result, timestamp) entries with serials 0, 1, ..."""
+    index = HistoryIndex()
+    for serial, (operation, result, timestamp) in enumerate(entries):
+        index.add(serial, operation, result, timestamp)
+    return index
+
+
+ENTRIES = [
+    ('add', 3.0, 10.0),
+    ('divide', 2e6, 20.0),
+    ('add', 50.0, 30.0),
+    ('divide', 0.5, 40.0),
+    ('divide', 5e6, 50.0),
+    ('add', float('nan'), 60.0),
+]
+
+
+def search(query, entries=ENTRIES, first=0):
+    """Helper that searches an index of `entries`, keeping serials `first` and up."""
+    index = build_index(entries)
+    index.prune(first)
+    return index.search(query, first, len(entries), lambda serial: entries[serial][2])
+
+
+@pytest.mark.parametrize("query, expected", [
+    (Query(), [0, 1, 2, 3, 4, 5]),
+    (Query(operation='divide'), [1, 3, 4]),
+    (Query(operation='divide', min_result=1e6, include_min=False), [1, 4]),
+    (Query(min_result=3.0), [0, 1, 2, 4]),
+    (Query(min_result=3.0, include_min=False, max_result=2e6, include_max=False), [2]),
+    (Query(max_result=50.0), [0, 2, 3]),
+    (Query(operation='add', last=2), [2, 5]),
+    (Query(last=100), [0, 1, 2, 3, 4, 5]),
+    (Query(since=30.0), [2, 3, 4, 5]),
+    (Query(since=30.0, until=50.0), [2, 3]),
+    (Query(operation='divide', until=45.0, last=1), [3]),
+    (Query(min_result=1.0, since=25.0), [2, 4]),
+    (Query(since=100.0), []),
+    (Query(operation='subtract'), []),
+    (Query(operation='subtract', max_result=1.0), []),
+])
+def test_history_index_search(query, expected):
+    """
+    Test searching by operation, result range, time and count, alone and combined.
+    """
+    # Act / Assert
+    assert search(query) == expected
+
+
+def test_history_index_search_skips_dropped_entries():
+    """
+    Test that entries before `first` are never returned, whether or not they were pruned yet.
+    """
+    # Arrange
+    index = build_index(ENTRIES)
+
+    # Act
+    unpruned = index.search(Query(operation='divide'), 2, len(ENTRIES), lambda serial: ENTRIES[serial][2])
+    pruned = search(Query(min_result=0.0), first=4)
+
+    # Assert
+    assert unpruned == [3, 4]
+    assert pruned == [4]
+
+
+def test_history_index_time_out_of_order():
+    """
+    Test that time filters still work (by checking each candidate) once the clock went backwards.
+    """
+    # Arrange
+    entries = [('add', 1.0, 10.0), ('add', 2.0, 30.0), ('add', 3.0, 20.0), ('add', 4.0, 40.0)]
+
+    # Act
+    matches = search(Query(since=15.0, until=35.0), entries)
+
+    # Assert
+    assert matches == [1, 2]
+
+
+def test_history_index_prune_is_amortized():
+    """
+    Test that pruning only rewrites the indexes once the dropped entries outnumber the live ones.
+    """
+    # Arrange
+    index = build_index(ENTRIES)
+
+    # Act
+    index.prune(3)
+    kept = list(index._by_operation['add'])
+    index.prune(4)
+
+    # Assert
+    assert kept == [0, 2, 5]
+    assert list(index._by_operation['add']) == [5]
+    assert index._by_result['divide'] == ([5e6], [4])
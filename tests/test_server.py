@@ -0,0 +1,260 @@
+# tests/test_server.py
+
+"""
+Unit tests for the app/server module (asyncio calculation server).
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+Each test runs its own event loop with `asyncio.run` and talks to a real server
+listening on a free local port (or a Unix socket).
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from app.history import History
+from app.server import INVALID_FORMAT_MESSAGE, respond, start_server
+
+
+async def read_response(reader: asyncio.StreamReader) -> str:
+    """Reads one response (the lines up to the terminating empty line)."""
+    lines = []
+    while True:
+        line = (await reader.readline()).decode()
+        if line in ("\n", ""):
+            return "\n".join(lines)
+        lines.append(line.rstrip("\n"))
+
+
+async def talk(server, requests):
+    """Sends all `requests` at once (pipelined) and returns the responses."""
+    host, port = server.sockets[0].getsockname()[:2]
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write("".join(request + "\n" for request in requests).encode())
+    await writer.drain()
+    responses = [await read_response(reader) for request in requests if request.strip()]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def test_respond_calculation_and_errors():
+    """
+    Test that respond() answers like the REPL does.
+    """
+    # Arrange
+    history = History()
+
+    # Act
+    responses = [
+        respond(line, history)
+        for line in ("add 10 5", "divide 1 0", "add 1", "unknown 1 2", "   ")
+    ]
+
+    # Assert
+    assert responses[0] == "Result: AddCalculation: 10.0 Add 5.0 = 15.0"
+    assert responses[1] == "Cannot divide by zero."
+    assert responses[2] == INVALID_FORMAT_MESSAGE
+    assert responses[3].startswith("Unsupported calculation type: 'unknown'")
+    assert responses[4] is None
+    assert len(history) == 1
+
+
+def test_respond_complex_result_and_failed_append(all_calculations, monkeypatch):
+    """
+    Test that a complex result is answered and recorded, and that a calculation the
+    history cannot take is still answered instead of dropping the connection.
+    """
+    # Arrange
+    history = History()
+    monkeypatch.setattr('app.history.MAX_OPERATION_TYPES', 1)
+
+    # Act
+    power = respond("power -8 0.5", history)
+    add = respond("add 1 2", history)
+    listed = respond("history", history)
+
+    # Assert
+    assert power == f"Result: PowerCalculation: -8.0 Power 0.5 = {(-8.0) ** 0.5}"
+    assert add == ("Result: AddCalculation: 1.0 Add 2.0 = 3.0\n"
+                   "Not added to the history: History supports at most 1 operation types.")
+    assert len(history) == 1
+    assert "1. PowerCalculation: -8.0 Power 0.5" in listed
+
+
+def test_respond_commands(all_calculations):
+    """
+    Test the help, history, summary, find and eval commands, and unexpected calculation errors.
+    """
+    # Arrange
+    history = History()
+    respond("multiply 2 3", history)
+
+    # Act
+    help_text = respond("help", history)
+    history_text = respond("HISTORY", history)
+    history_range_text = respond("history --from 2", history)
+    history_usage_text = respond("history ten", history)
+    summary_text = respond("summary", history)
+    find_text = respond("find multiply result>5", history)
+    eval_results = [respond(line, history) for line in ("eval 1 + 2", "eval 1 +", "eval 1 / 0", "eval 0 ^ 0")]
+    power_error = respond("power 0 0", history)
+
+    # Assert
+    assert "Calculator REPL Help" in help_text
+    assert history_text == "Calculation History:\n1. MultiplyCalculation: 2.0 Multiply 3.0 = 6.0"
+    assert history_range_text == "No calculations in that range (the history has 1)."
+    assert history_usage_text.startswith("Usage: history")
+    assert find_text == "Found 1 calculations:\n1. MultiplyCalculation: 2.0 Multiply 3.0 = 6.0"
+    assert summary_text.splitlines()[1] == "all: count=1, sum=6.0, mean=6.0, min=6.0, max=6.0, variance=0.0"
+    assert eval_results[0] == "Result: 1 + 2 = 3.0"
+    assert eval_results[1].startswith("Invalid expression:")
+    assert eval_results[2] == "Cannot divide by zero."
+    assert eval_results[3] == "An error occurred during calculation: 0^0 is undefined."
+    assert power_error == "An error occurred during calculation: 0^0 is undefined."
+
+
+def test_pipelined_requests_keep_order():
+    """
+    Test that many requests sent without waiting are answered in order,
+    and that blank lines are ignored.
+    """
+    # Arrange
+    requests = [f"add {i} 1" for i in range(200)] + ["", "history"]
+
+    async def scenario():
+        server = await start_server()
+        async with server:
+            return await talk(server, requests)
+
+    # Act
+    responses = asyncio.run(scenario())
+
+    # Assert
+    assert len(responses) == 201
+    assert responses[0] == "Result: AddCalculation: 0.0 Add 1.0 = 1.0"
+    assert responses[199] == "Result: AddCalculation: 199.0 Add 1.0 = 200.0"
+    assert responses[200].splitlines()[-1] == "200. AddCalculation: 199.0 Add 1.0 = 200.0"
+
+
+def test_concurrent_connections_have_separate_histories():
+    """
+    Test that concurrent clients are served at the same time, each with its own history.
+    """
+    # Arrange
+    async def scenario():
+        server = await start_server(max_history=2)
+        async with server:
+            return await asyncio.gather(*(
+                talk(server, [f"multiply {client} {i}" for i in range(5)] + ["history"])
+                for client in range(20)
+            ))
+
+    # Act
+    results = asyncio.run(scenario())
+
+    # Assert
+    for client, responses in enumerate(results):
+        assert responses[-1].splitlines() == [
+            "Calculation History:",
+            f"1. MultiplyCalculation: {float(client)} Multiply 3.0 = {client * 3.0}",
+            f"2. MultiplyCalculation: {float(client)} Multiply 4.0 = {client * 4.0}",
+        ]
+
+
+def test_exit_closes_connection():
+    """
+    Test that 'exit' is answered with a goodbye and the connection is closed.
+    """
+    # Arrange
+    async def scenario():
+        server = await start_server()
+        async with server:
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"exit\nadd 1 2\n")
+            goodbye = await read_response(reader)
+            rest = await reader.read()
+            writer.close()
+            return goodbye, rest
+
+    # Act
+    goodbye, rest = asyncio.run(scenario())
+
+    # Assert
+    assert goodbye == "Goodbye!"
+    assert rest == b""
+
+
+def test_line_too_long_closes_connection(monkeypatch):
+    """
+    Test that a request longer than the line limit is rejected and the connection closed.
+    """
+    # Arrange
+    monkeypatch.setattr("app.server.MAX_LINE_LENGTH", 1024)
+
+    async def scenario():
+        server = await start_server()
+        async with server:
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"add " + b"1" * 4096 + b" 2\n")
+            response = await read_response(reader)
+            writer.close()
+            return response
+
+    # Act
+    response = asyncio.run(scenario())
+
+    # Assert
+    assert response == "Line too long."
+
+
+def test_client_disconnect_mid_response():
+    """
+    Test that a client that disconnects without reading its responses does not break the server.
+    """
+    # Arrange
+    async def scenario():
+        server = await start_server()
+        async with server:
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"help\n" * 2000)
+            await writer.drain()
+            writer.transport.abort()
+            await asyncio.sleep(0.1)
+            # The server keeps serving other clients.
+            return await talk(server, ["add 2 2"])
+
+    # Act
+    responses = asyncio.run(scenario())
+
+    # Assert
+    assert responses == ["Result: AddCalculation: 2.0 Add 2.0 = 4.0"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets are not available on Windows")
+def test_unix_socket(tmp_path):
+    """
+    Test serving on a Unix socket.
+    """
+    # Arrange
+    path = str(tmp_path / "calculator.sock")
+
+    async def scenario():
+        server = await start_server(unix_path=path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"subtract 10 4\n")
+            response = await read_response(reader)
+            writer.close()
+            await writer.wait_closed()
+            return response
+
+    # Act
+    response = asyncio.run(scenario())
+
+    # Assert
+    assert response == "Result: SubtractCalculation: 10.0 Subtract 4.0 = 6.0"